@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+PDF Rendering Benchmark & Regression Check
+Renders synthetic reports offline and fails when throughput, latency, memory or size regress
+
+Usage (from backend/):
+    python benchmarks/pdf_benchmark.py                    # compare against the baseline
+    python benchmarks/pdf_benchmark.py --update-baseline  # record a new baseline
+
+Timings are machine-dependent, so record the baseline on the machine that runs
+the comparison (e.g. the CI runner) and commit it from there. The comparison
+fails while no baseline exists.
+"""
+
+import argparse
+import io
+import json
+import multiprocessing
+import os
+import resource
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.logo_cache import LogoCache
+from services.pdf_generator import LOGO_MAX_HEIGHT, LOGO_MAX_WIDTH, PDFReportGenerator, ReportTheme
+from services.pdf_renderer import PDF_COMPACT, PDF_DETERMINISTIC
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "pdf_baseline.json")
+
+CHECK_TYPES = ["GST", "PAN", "BANK", "CIN", "DIN", "TAN", "UDYAM", "MCA", "TIN", "RC", "UPI", "DL", "PASSPORT", "CHALLAN", "AADHAAR"]
+
+BRANDING = {
+    "enabled": True,
+    "org_id": "00000000-0000-0000-0000-000000000001",
+    "updated_at": "2026-01-01T00:00:00+00:00",
+    "company_name": "Acme Procurement Pvt Ltd",
+    "primary_color": "#1D4ED8",
+    "accent_color": "#059669",
+    "report_title": "Acme Vendor Due Diligence Report",
+    "support_email": "compliance@acme.example",
+    "support_phone": "+91 80 0000 0000",
+    "extra_disclaimer": "This report is confidential and intended for Acme Procurement only. " * 3,
+}
+
+# name -> fixture spec; kept stable so baselines stay comparable
+SCENARIOS = {
+    "single_unbranded": {"checks": 1, "summary_words": 60, "branded": False},
+    "single_branded": {"checks": 1, "summary_words": 60, "branded": True},
+    "long_summary": {"checks": 1, "summary_words": 2500, "branded": True},
+    "many_checks": {"checks": 15, "summary_words": 200, "branded": True},
+}
+
+# Allowed relative change before a metric counts as a regression
+DEFAULT_THRESHOLDS = {
+    "renders_per_sec": 0.25,  # may drop by 25%
+    "p50_ms": 0.30,
+    "p99_ms": 0.60,
+    "peak_rss_mb": 0.20,
+    "output_bytes": 0.05,
+}
+
+# Direction in which each metric gets worse
+HIGHER_IS_WORSE = {
+    "renders_per_sec": False,
+    "p50_ms": True,
+    "p99_ms": True,
+    "peak_rss_mb": True,
+    "output_bytes": True,
+}
+
+
+def synthetic_logo() -> bytes:
+    from PIL import Image, ImageDraw
+
+    image = Image.new("RGBA", (1200, 400), (255, 255, 255, 0))
+    draw = ImageDraw.Draw(image)
+    draw.rectangle([40, 40, 1160, 360], fill=(29, 78, 216, 255))
+    draw.ellipse([80, 80, 320, 320], fill=(5, 150, 105, 255))
+
+    output = io.BytesIO()
+    image.save(output, format="PNG")
+    return output.getvalue()
+
+
+def build_fixture(spec: Dict[str, Any]) -> Dict[str, Any]:
+    vendor = {
+        "id": "00000000-0000-0000-0000-00000000000a",
+        "name": "Shree Ganesh Industrial Suppliers & Traders Pvt Ltd",
+        "gstin": "29ABCDE1234F1Z5",
+        "pan": "ABCDE1234F",
+        "created_at": "2026-01-02T09:30:00+00:00",
+    }
+    verifications = [
+        {
+            "id": f"00000000-0000-0000-0000-{i:012d}",
+            "type": CHECK_TYPES[i % len(CHECK_TYPES)],
+            "status": "failed" if i % 7 == 6 else "success",
+            "raw_response": {"status": "Active", "reference": f"REF{i:06d}"},
+            "created_at": f"2026-01-02T09:{30 + i % 30:02d}:00+00:00",
+            "upstream_fetched_at": f"2026-01-02T09:{30 + i % 30:02d}:02+00:00",
+        }
+        for i in range(spec["checks"])
+    ]
+    words = ("Registration active since 2016; filings are regular and the trade name matches "
+             "the legal name with no adverse records found. ").split()
+    summary = " ".join(words[i % len(words)] for i in range(spec["summary_words"]))
+
+    return {
+        "vendor": vendor,
+        "verifications": verifications,
+        "ai_summary": {"risk_level": "MEDIUM", "summary": summary, "created_at": "2026-01-02T10:05:00+00:00"},
+        "report_id": "00000000-0000-0000-0000-0000000000ff",
+    }
+
+
+def run_scenario(name: str, iterations: int, warmup: int, rounds: int) -> Dict[str, Any]:
+    """
+    Benchmark one scenario (runs in a fresh process so peak RSS is per scenario)
+
+    Timings come from the fastest of several rounds, which filters out noise
+    from other load on the machine.
+    """
+    spec = SCENARIOS[name]
+    fixture = build_fixture(spec)
+
+    if spec["branded"]:
+        logos = LogoCache(cache_dir="", box_width=LOGO_MAX_WIDTH, box_height=LOGO_MAX_HEIGHT)
+        theme = ReportTheme(BRANDING, logo=logos.scale(synthetic_logo()))
+    else:
+        theme = ReportTheme({})
+
+    # Warm path, as in a render worker: the theme is compiled once and reused,
+    # with the worker's output mode
+    def render() -> bytes:
+        generator = PDFReportGenerator(theme=theme, deterministic=PDF_DETERMINISTIC, compact=PDF_COMPACT)
+        if spec["checks"] == 1:
+            return generator.generate_report(
+                fixture["vendor"], fixture["verifications"][0], fixture["ai_summary"], fixture["report_id"]
+            )
+        return generator.generate_vendor_report(
+            fixture["vendor"], fixture["verifications"], fixture["ai_summary"], fixture["report_id"]
+        )
+
+    for _ in range(warmup):
+        render()
+
+    best = None
+    output = b""
+    for _ in range(rounds):
+        latencies = []
+        started = time.perf_counter()
+        for _ in range(iterations):
+            t0 = time.perf_counter()
+            output = render()
+            latencies.append((time.perf_counter() - t0) * 1000)
+        elapsed = time.perf_counter() - started
+
+        if best is None or elapsed < best[0]:
+            best = (elapsed, sorted(latencies))
+
+    elapsed, latencies = best
+    return {
+        "renders_per_sec": round(iterations / elapsed, 2),
+        "p50_ms": round(statistics.median(latencies), 2),
+        "p99_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))], 2),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),  # KiB on Linux
+        "output_bytes": len(output),
+    }
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]], thresholds: Dict[str, float]) -> List[str]:
+    """Regressions beyond threshold (and scenarios the baseline lacks), as human-readable lines"""
+    regressions = []
+    for scenario, metrics in results.items():
+        expected = baseline.get(scenario)
+        if not expected:
+            regressions.append(f"{scenario}: not in baseline; re-record it with --update-baseline")
+            continue
+        for metric, value in metrics.items():
+            reference = expected.get(metric)
+            if not reference:
+                continue
+            change = (value - reference) / reference
+            worse = change if HIGHER_IS_WORSE[metric] else -change
+            if worse > thresholds[metric]:
+                regressions.append(
+                    f"{scenario}.{metric}: {value} vs baseline {reference} "
+                    f"({change:+.1%}, limit {thresholds[metric]:.0%})"
+                )
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark PDF report rendering")
+    parser.add_argument("--iterations", type=int, default=50, help="Renders per round")
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--rounds", type=int, default=3, help="Timed rounds per scenario; the fastest is reported")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="Run only these scenarios")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--update-baseline", action="store_true", help="Write results as the new baseline")
+    parser.add_argument("--threshold-scale", type=float, default=1.0, help="Multiply every regression threshold")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON only")
+    args = parser.parse_args()
+
+    names = args.scenario or list(SCENARIOS)
+    context = multiprocessing.get_context("spawn")
+
+    results = {}
+    for name in names:
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            results[name] = executor.submit(run_scenario, name, args.iterations, args.warmup, args.rounds).result()
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print("=" * 78)
+        print("📄 PDF Rendering Benchmark")
+        print("=" * 78)
+        print(f"{'scenario':<20}{'renders/s':>11}{'p50 ms':>10}{'p99 ms':>10}{'peak RSS MB':>14}{'bytes':>10}")
+        for name, m in results.items():
+            print(f"{name:<20}{m['renders_per_sec']:>11}{m['p50_ms']:>10}{m['p99_ms']:>10}{m['peak_rss_mb']:>14}{m['output_bytes']:>10}")
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"\n✅ Baseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        # Without a baseline nothing is checked, which must not pass as "no regressions"
+        print(f"\n❌ No baseline at {args.baseline}; run with --update-baseline to record one")
+        return 1
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+
+    thresholds = {metric: limit * args.threshold_scale for metric, limit in DEFAULT_THRESHOLDS.items()}
+    regressions = compare(results, baseline, thresholds)
+    if regressions:
+        print("\n❌ Regressions:")
+        for line in regressions:
+            print(f"  • {line}")
+        return 1
+
+    print("\n✅ No regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
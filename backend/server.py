@@ -3,43 +3,176 @@ Ravono Vendor Compliance Platform - FastAPI Backend Server
 Integrated with Supabase database and external verification APIs
 """
 
-from fastapi import FastAPI, HTTPException, Depends, Header, File, UploadFile
+from fastapi import FastAPI, HTTPException, Depends, Header, Query, File, UploadFile, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, Response
-from typing import Optional, Dict, Any, List
+from starlette.background import BackgroundTask
+from fastapi.responses import FileResponse, RedirectResponse, Response, StreamingResponse
+from typing import Optional, Dict, Any, List, Tuple, Awaitable, Callable
 from pydantic import BaseModel
 from datetime import datetime, timezone, timedelta
 import os
+import re
+import json
+import hmac
+import asyncio
+import functools
 import uuid
 from uuid import uuid4
 from dotenv import load_dotenv
-from supabase import create_client, Client
 import httpx
+from postgrest.exceptions import APIError
+from contextlib import asynccontextmanager
+
+from services.database import SupabaseDatabase
+from services.http_clients import UpstreamClients
+from services.token_verifier import TokenVerifier, TokenVerificationError
+from services.cache import TTLCache
+from services.credits import CreditEngine, CreditReservation, InsufficientCreditsError
+from services.timing import StageTimer
+from services.verification_cache import VerificationCache, InMemoryBackend, RedisBackend, parse_ttls
+from services.bulk_worker import BulkJobWorker
+from services.csv_ingest import CsvStreamValidator, CsvValidationError
+from services.rate_limit import AsyncRateLimiter
+from services.summary_worker import SummaryWorker, SUMMARY_PENDING, SUMMARY_COMPLETED, SUMMARY_FAILED, SUMMARY_IN_PROGRESS
+from services.pdf_renderer import PDFRenderPool, RenderPoolBroken, RenderQueueFull, report_fingerprint, vendor_report_fingerprint
+from services.report_export import fetch_in_order, stream_zip, merge_pdfs
+from services.report_pdf_worker import ReportPdfWorker
+from services.byte_ranges import RangeNotSatisfiable, parse_byte_range, iter_byte_slices
+from services.keyset import InvalidCursor, after_filter, encode_cursor
+from services.vendor_identity import VendorDirectory, vendor_identifiers
+from services.audit_sink import AuditSink
 
 load_dotenv()
 
-# Initialize FastAPI
-app = FastAPI(
-    title="Ravono Vendor Compliance API",
-    description="Backend API for Indian vendor verification and compliance",
-    version="1.0.0"
+# Supabase data layer
+SUPABASE_URL = os.getenv("SUPABASE_URL")
+SUPABASE_SERVICE_ROLE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
+SUPABASE_ANON_KEY = os.getenv("SUPABASE_ANON_KEY")
+SUPABASE_MAX_CONNECTIONS = int(os.getenv("SUPABASE_MAX_CONNECTIONS", "100"))
+SUPABASE_MAX_KEEPALIVE = int(os.getenv("SUPABASE_MAX_KEEPALIVE", "20"))
+
+db = SupabaseDatabase(
+    SUPABASE_URL,
+    SUPABASE_SERVICE_ROLE_KEY,
+    max_connections=SUPABASE_MAX_CONNECTIONS,
+    max_keepalive_connections=SUPABASE_MAX_KEEPALIVE,
 )
 
-# CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],  # In production, specify exact origins
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+# Access token verification (local JWT checks with a validated-claims cache)
+SUPABASE_JWT_SECRET = os.getenv("SUPABASE_JWT_SECRET")
+SUPABASE_JWKS_URL = os.getenv("SUPABASE_JWKS_URL")
+AUTH_VERIFY_MODE = os.getenv("AUTH_VERIFY_MODE", "local")  # local, remote
+AUTH_TOKEN_CACHE_SIZE = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "10000"))
+AUTH_TOKEN_CACHE_TTL = float(os.getenv("AUTH_TOKEN_CACHE_TTL", "300"))
+
+async def validate_token_remote(token: str) -> Dict[str, Any]:
+    """Validate a token with Supabase Auth and return it as claims"""
+    response = await db.auth.get_user(token)
+    user = response.user
+    return {
+        "sub": user.id,
+        "email": user.email,
+        "role": user.role,
+        "user_metadata": user.user_metadata or {},
+    }
+
+token_verifier = TokenVerifier(
+    validate_token_remote,
+    jwt_secret=SUPABASE_JWT_SECRET,
+    jwks_url=SUPABASE_JWKS_URL,
+    mode=AUTH_VERIFY_MODE,
+    cache_size=AUTH_TOKEN_CACHE_SIZE,
+    cache_ttl=AUTH_TOKEN_CACHE_TTL,
 )
 
-# Supabase client
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_SERVICE_ROLE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
-SUPABASE_ANON_KEY = os.getenv("SUPABASE_ANON_KEY")
+# User -> org resolution cache
+PROFILE_CACHE_SIZE = int(os.getenv("PROFILE_CACHE_SIZE", "10000"))
+PROFILE_CACHE_TTL = float(os.getenv("PROFILE_CACHE_TTL", "60"))
+SUPABASE_WEBHOOK_SECRET = os.getenv("SUPABASE_WEBHOOK_SECRET")
+
+profile_cache = TTLCache(maxsize=PROFILE_CACHE_SIZE, ttl=PROFILE_CACHE_TTL)
+
+# AI risk summaries ("sync" blocks the verification response, "async" backfills reports)
+AI_SUMMARY_MODE = os.getenv("AI_SUMMARY_MODE", "sync")
+AI_SUMMARY_WORKERS = int(os.getenv("AI_SUMMARY_WORKERS", "4"))
+AI_SUMMARY_STREAM_INTERVAL = float(os.getenv("AI_SUMMARY_STREAM_INTERVAL", "1"))
+AI_SUMMARY_STREAM_TIMEOUT = float(os.getenv("AI_SUMMARY_STREAM_TIMEOUT", "60"))
+AI_SUMMARY_RECOVER_INTERVAL = float(os.getenv("AI_SUMMARY_RECOVER_INTERVAL", "30"))
+AI_SUMMARY_LEASE_TIMEOUT = float(os.getenv("AI_SUMMARY_LEASE_TIMEOUT", "300"))
+AI_SUMMARY_MAX_ATTEMPTS = int(os.getenv("AI_SUMMARY_MAX_ATTEMPTS", "3"))
+RISK_LEVELS = ("LOW", "MEDIUM", "HIGH")
+
+# Plan API result cache (in-process LRU, plus Redis when configured)
+VERIFICATION_CACHE_SIZE = int(os.getenv("VERIFICATION_CACHE_SIZE", "10000"))
+VERIFICATION_CACHE_TTLS = parse_ttls(os.getenv("VERIFICATION_CACHE_TTLS"))  # e.g. "GST=3600,PAN=86400"
+VERIFICATION_CACHE_REDIS_URL = os.getenv("VERIFICATION_CACHE_REDIS_URL")
+
+verification_cache_backends = [InMemoryBackend(maxsize=VERIFICATION_CACHE_SIZE)]
+if VERIFICATION_CACHE_REDIS_URL:
+    verification_cache_backends.append(RedisBackend(VERIFICATION_CACHE_REDIS_URL))
+verification_cache = VerificationCache(verification_cache_backends, ttls=VERIFICATION_CACHE_TTLS)
+
+# Bulk verification jobs
+BULK_UPLOAD_MAX_BYTES = int(os.getenv("BULK_UPLOAD_MAX_BYTES", str(50 * 1024 * 1024)))
+BULK_UPLOAD_CHUNK_SIZE = 64 * 1024
+BULK_CONCURRENCY = int(os.getenv("BULK_CONCURRENCY", "20"))
+BULK_CHUNK_SIZE = int(os.getenv("BULK_CHUNK_SIZE", "100"))
+BULK_POLL_INTERVAL = float(os.getenv("BULK_POLL_INTERVAL", "5"))
+BULK_LEASE_TIMEOUT = float(os.getenv("BULK_LEASE_TIMEOUT", "300"))
+
+# PDF rendering (CPU-bound ReportLab builds run in a process pool)
+PDF_RENDER_WORKERS = int(os.getenv("PDF_RENDER_WORKERS", "0")) or None  # 0 = one per CPU
+PDF_RENDER_MAX_QUEUE = int(os.getenv("PDF_RENDER_MAX_QUEUE", "50"))
+pdf_renderer = PDFRenderPool(workers=PDF_RENDER_WORKERS, max_queue=PDF_RENDER_MAX_QUEUE)
+
+# Rendered PDFs are stored once per content fingerprint and then served from storage
+REPORTS_BUCKET = "reports"
+PDF_DELIVERY = os.getenv("PDF_DELIVERY", "stream").lower()  # "stream" or "redirect" (signed URL)
+PDF_SIGNED_URL_TTL = int(os.getenv("PDF_SIGNED_URL_TTL", "300"))
+PDF_STREAM_CHUNK_SIZE = 64 * 1024
+
+# Batch report export
+REPORT_EXPORT_MAX_REPORTS = int(os.getenv("REPORT_EXPORT_MAX_REPORTS", "500"))
+REPORT_EXPORT_MAX_MERGED = int(os.getenv("REPORT_EXPORT_MAX_MERGED", "100"))  # Merged PDFs are built in memory
+REPORT_EXPORT_CONCURRENCY = int(os.getenv("REPORT_EXPORT_CONCURRENCY", "8"))
 
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
+# Background PDF pre-generation (per org: integrations.pregenerate_pdfs, or Drive auto-save)
+PDF_PREGEN_WORKERS = int(os.getenv("PDF_PREGEN_WORKERS", "2"))
+PDF_PREGEN_MAX_QUEUE = int(os.getenv("PDF_PREGEN_MAX_QUEUE", "1000"))
+INTEGRATION_CACHE_TTL = float(os.getenv("INTEGRATION_CACHE_TTL", "60"))
+
+integration_cache = TTLCache(maxsize=PROFILE_CACHE_SIZE, ttl=INTEGRATION_CACHE_TTL)
+
+# Reports listing (keyset-paginated on created_at, id)
+REPORTS_PAGE_SIZE = int(os.getenv("REPORTS_PAGE_SIZE", "50"))
+REPORTS_MAX_PAGE_SIZE = int(os.getenv("REPORTS_MAX_PAGE_SIZE", "200"))
+# Keep in step with the INCLUDE list of idx_reports_org_listing (index-only listing pages)
+REPORT_LIST_COLUMNS = "id, vendor_id, verification_id, risk_level, summary_status, pdf_url, drive_file_id, expires_at, created_at"
+# expand= name -> (default embed, expanded embed); raw_request/raw_response only come with expand=verification
+REPORT_LIST_EMBEDS = {
+    "vendor": ("vendors(id, name, gstin, pan)", "vendors(*)"),
+    "verification": ("verifications(id, type, status)", "verifications(*)"),
+}
+REPORT_LIST_EXPANSIONS = ("summary", *REPORT_LIST_EMBEDS)
+
+# Atomic credit reservations (public.deduct_credits / public.refund_credits)
+credit_engine = CreditEngine(db)
+
+# Vendor identity resolution (public.upsert_vendor)
+vendor_directory = VendorDirectory(db)
+
+# Audit log (spilled to local disk, inserted in batches)
+AUDIT_SPILL_DIR = os.getenv("AUDIT_SPILL_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "audit_spill"))
+AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", "200"))
+AUDIT_FLUSH_INTERVAL = float(os.getenv("AUDIT_FLUSH_INTERVAL", "1"))
+AUDIT_SPILL_FSYNC = os.getenv("AUDIT_SPILL_FSYNC", "false").lower() == "true"
+audit_sink = AuditSink(
+    db,
+    AUDIT_SPILL_DIR,
+    batch_size=AUDIT_BATCH_SIZE,
+    flush_interval=AUDIT_FLUSH_INTERVAL,
+    fsync=AUDIT_SPILL_FSYNC,
+)
 
 # Plan API credentials
 PLAN_API_BASE_URL = os.getenv("PLAN_API_BASE_URL")
@@ -50,10 +183,78 @@ PLAN_API_TOKEN = os.getenv("PLAN_API_TOKEN")
 # Perplexity API
 PERPLEXITY_API_KEY = os.getenv("PERPLEXITY_API_KEY")
 
+# Shared upstream HTTP clients (one keep-alive pool per upstream)
+upstream = UpstreamClients(
+    PLAN_API_BASE_URL,
+    plan_api_timeout=float(os.getenv("PLAN_API_TIMEOUT", "30")),
+    plan_api_max_connections=int(os.getenv("PLAN_API_MAX_CONNECTIONS", "50")),
+    perplexity_timeout=float(os.getenv("PERPLEXITY_TIMEOUT", "30")),
+    perplexity_max_connections=int(os.getenv("PERPLEXITY_MAX_CONNECTIONS", "20")),
+)
+
+# Per-upstream request rate limits shared by single and bulk verifications (0 = unlimited)
+plan_api_limiter = AsyncRateLimiter(
+    float(os.getenv("PLAN_API_RATE_LIMIT", "0")), burst=int(os.getenv("PLAN_API_BURST", "10"))
+)
+perplexity_limiter = AsyncRateLimiter(
+    float(os.getenv("PERPLEXITY_RATE_LIMIT", "0")), burst=int(os.getenv("PERPLEXITY_BURST", "5"))
+)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open pooled connections on startup and release them on shutdown"""
+    await db.connect()
+    await audit_sink.start()
+    await upstream.start()
+    pdf_renderer.start()
+    await report_pdf_worker.start()
+    await summary_worker.start()
+    await bulk_worker.start()
+    yield
+    await bulk_worker.stop()
+    await summary_worker.stop()
+    await report_pdf_worker.stop()
+    pdf_renderer.stop()
+    await upstream.close()
+    await verification_cache.close()
+    await audit_sink.stop()
+    await db.close()
+
+# Initialize FastAPI
+app = FastAPI(
+    title="Ravono Vendor Compliance API",
+    description="Backend API for Indian vendor verification and compliance",
+    version="1.0.0",
+    lifespan=lifespan
+)
+
+# CORS middleware
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],  # In production, specify exact origins
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
+)
+
 # =============================================
 # PYDANTIC MODELS
 # =============================================
 
+class AuthUser(BaseModel):
+    id: str
+    email: Optional[str] = None
+    role: Optional[str] = None
+    user_metadata: Dict[str, Any] = {}
+
+class Principal(BaseModel):
+    user: AuthUser
+    org_id: str
+    role: str = "member"
+    is_admin: bool = False
+    profile: Dict[str, Any] = {}
+
 class UserProfile(BaseModel):
     id: str
     user_id: str
@@ -67,6 +268,16 @@ class VerificationRequest(BaseModel):
     type: str  # GST, PAN, AADHAAR, BANK, etc.
     vendor_name: str
     vendor_data: Dict[str, Any]  # Contains ID numbers, etc.
+    async_summary: Optional[bool] = None  # Defaults to AI_SUMMARY_MODE
+    force_refresh: bool = False  # Bypass the verification result cache
+
+class ReportExportRequest(BaseModel):
+    report_ids: Optional[List[uuid.UUID]] = None  # Explicit selection; otherwise the filters apply
+    vendor_id: Optional[uuid.UUID] = None
+    risk_level: Optional[str] = None  # LOW, MEDIUM, HIGH
+    date_from: Optional[datetime] = None
+    date_to: Optional[datetime] = None
+    format: str = "zip"  # "zip" or "pdf" (one merged document)
 
 class VerificationResponse(BaseModel):
     verification_id: str
@@ -74,12 +285,13 @@ class VerificationResponse(BaseModel):
     status: str
     risk_level: str
     summary: str
+    summary_status: str = "completed"  # pending, completed, failed
 
 # =============================================
 # HELPER FUNCTIONS
 # =============================================
 
-def get_user_from_token(authorization: Optional[str] = Header(None)) -> Dict[str, Any]:
+async def get_user_from_token(authorization: Optional[str] = Header(None)) -> AuthUser:
     """Extract and validate user from JWT token"""
     if not authorization or not authorization.startswith("Bearer "):
         raise HTTPException(status_code=401, detail="Missing or invalid authorization header")
@@ -87,45 +299,66 @@ def get_user_from_token(authorization: Optional[str] = Header(None)) -> Dict[str
     token = authorization.replace("Bearer ", "")
     
     try:
-        # Verify token with Supabase
-        user = supabase.auth.get_user(token)
-        return user.user
-    except Exception as e:
+        # Verify signature and expiry locally (cached per token)
+        claims = await token_verifier.verify(token)
+    except TokenVerificationError as e:
         raise HTTPException(status_code=401, detail=f"Invalid token: {str(e)}")
+    
+    return AuthUser(
+        id=claims["sub"],
+        email=claims.get("email"),
+        role=claims.get("role"),
+        user_metadata=claims.get("user_metadata") or {},
+    )
 
-def get_org_id(user_id: str) -> str:
-    """Get organization ID for a user"""
+async def load_profile(user_id: str) -> Dict[str, Any]:
+    """Get a user's profile row (cached; see invalidate_profile)"""
+    profile = profile_cache.get(user_id)
+    if profile is not None:
+        return profile
+    
     try:
-        result = supabase.table("profiles").select("org_id").eq("user_id", user_id).single().execute()
-        return result.data["org_id"]
+        result = await db.table("profiles").select("*").eq("user_id", user_id).single().execute()
     except Exception as e:
         raise HTTPException(status_code=404, detail=f"User profile not found: {str(e)}")
+    
+    profile_cache.set(user_id, result.data)
+    return result.data
 
-def check_credits(org_id: str) -> bool:
-    """Check if org has sufficient credits"""
-    try:
-        result = supabase.table("credits").select("current_balance").eq("org_id", org_id).single().execute()
-        return result.data["current_balance"] > 0
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error checking credits: {str(e)}")
+def invalidate_profile(user_id: str) -> None:
+    """Drop a cached profile after it changes"""
+    profile_cache.invalidate(user_id)
 
-def deduct_credits(org_id: str, amount: int = 1) -> bool:
-    """Deduct credits from org"""
-    try:
-        # Get current balance
-        result = supabase.table("credits").select("current_balance").eq("org_id", org_id).single().execute()
-        current_balance = result.data["current_balance"]
-        
-        if current_balance < amount:
-            return False
-        
-        # Update balance
-        new_balance = current_balance - amount
-        supabase.table("credits").update({"current_balance": new_balance}).eq("org_id", org_id).execute()
-        
-        return True
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error deducting credits: {str(e)}")
+async def get_principal(authorization: Optional[str] = Header(None)) -> Principal:
+    """Resolve the authenticated user and their org once per request"""
+    user = await get_user_from_token(authorization)
+    profile = await load_profile(user.id)
+    
+    return Principal(
+        user=user,
+        org_id=profile["org_id"],
+        role=profile.get("role") or "member",
+        is_admin=bool(profile.get("is_admin")),
+        profile=profile,
+    )
+
+async def write_audit_log(
+    org_id: str,
+    actor_id: Optional[str],
+    action: str,
+    target_type: Optional[str] = None,
+    target_id: Optional[str] = None,
+    details: Optional[Dict[str, Any]] = None
+) -> None:
+    """Record an audit log entry (written to audit_logs in the next batch)"""
+    audit_sink.record({
+        "org_id": org_id,
+        "actor_id": actor_id,
+        "action": action,
+        "target_type": target_type,
+        "target_id": target_id or None,
+        "details": details or {}
+    })
 
 async def call_plan_api(verification_type: str, data: Dict[str, Any]) -> Dict[str, Any]:
     """Call Plan API for verification"""
@@ -145,8 +378,6 @@ async def call_plan_api(verification_type: str, data: Dict[str, Any]) -> Dict[st
     if not endpoint:
         raise HTTPException(status_code=400, detail=f"Unsupported verification type: {verification_type}")
     
-    url = f"{PLAN_API_BASE_URL}{endpoint}"
-    
     headers = {
         "TokenID": PLAN_API_TOKEN,
         "ApiUserID": PLAN_API_USER_ID,
@@ -155,13 +386,52 @@ async def call_plan_api(verification_type: str, data: Dict[str, Any]) -> Dict[st
     }
     
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, json=data, headers=headers, timeout=30.0)
-            response.raise_for_status()
-            return response.json()
+        async with plan_api_limiter:
+            response = await upstream.plan_api.post(endpoint, json=data, headers=headers)
+        response.raise_for_status()
+        return response.json()
     except httpx.HTTPError as e:
         raise HTTPException(status_code=502, detail=f"Plan API error: {str(e)}")
 
+async def call_plan_api_cached(
+    verification_type: str,
+    data: Dict[str, Any],
+    force_refresh: bool = False
+) -> Dict[str, Any]:
+    """
+    Call Plan API through the verification result cache
+    
+    Returns:
+        {"response": <Plan API response>, "cache_hit": bool, "cached_at": <ISO timestamp>}
+    """
+    if not force_refresh:
+        entry = await verification_cache.get(verification_type, data)
+        if entry is not None:
+            return {"response": entry["response"], "cache_hit": True, "cached_at": entry["cached_at"]}
+    
+    response = await call_plan_api(verification_type, data)
+    cached_at = datetime.now(timezone.utc).isoformat()
+    await verification_cache.set(verification_type, data, {"response": response, "cached_at": cached_at})
+    
+    return {"response": response, "cache_hit": False, "cached_at": cached_at}
+
+def parse_risk_level(ai_content: str) -> str:
+    """Read the risk level from the AI response (JSON first, then free text)"""
+    match = re.search(r"\{.*\}", ai_content, re.DOTALL)
+    if match:
+        try:
+            risk_level = str(json.loads(match.group(0)).get("risk_level", "")).upper()
+            if risk_level in RISK_LEVELS:
+                return risk_level
+        except (ValueError, AttributeError):
+            pass
+    
+    match = re.search(r"risk[\s_]*level\W*(LOW|MEDIUM|HIGH)", ai_content, re.IGNORECASE)
+    if match:
+        return match.group(1).upper()
+    
+    return "MEDIUM"
+
 async def generate_ai_risk_summary(verification_data: Dict[str, Any]) -> Dict[str, str]:
     """Generate AI risk summary using Perplexity"""
     
@@ -180,39 +450,534 @@ async def generate_ai_risk_summary(verification_data: Dict[str, Any]) -> Dict[st
     """
     
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                "https://api.perplexity.ai/chat/completions",
-                headers={
-                    "Authorization": f"Bearer {PERPLEXITY_API_KEY}",
-                    "Content-Type": "application/json"
-                },
-                json={
-                    "model": "llama-3.1-sonar-small-128k-online",
-                    "messages": [
-                        {"role": "system", "content": "You are an expert in Indian vendor compliance and risk assessment."},
-                        {"role": "user", "content": prompt}
-                    ]
-                },
-                timeout=30.0
-            )
-            response.raise_for_status()
-            result = response.json()
-            
-            # Extract content from Perplexity response
-            ai_content = result["choices"][0]["message"]["content"]
-            
-            return {
-                "risk_level": "MEDIUM",  # Parse from AI response
-                "summary": ai_content
+        await perplexity_limiter.acquire()
+        response = await upstream.perplexity.post(
+            "/chat/completions",
+            headers={
+                "Authorization": f"Bearer {PERPLEXITY_API_KEY}",
+                "Content-Type": "application/json"
+            },
+            json={
+                "model": "llama-3.1-sonar-small-128k-online",
+                "messages": [
+                    {"role": "system", "content": "You are an expert in Indian vendor compliance and risk assessment."},
+                    {"role": "user", "content": prompt}
+                ]
             }
+        )
+        response.raise_for_status()
+        result = response.json()
+        
+        # Extract content from Perplexity response
+        ai_content = result["choices"][0]["message"]["content"]
+        
+        return {
+            "risk_level": parse_risk_level(ai_content),
+            "summary": ai_content,
+            "status": SUMMARY_COMPLETED
+        }
     except Exception as e:
         # Fallback if AI fails
         return {
             "risk_level": "MEDIUM",
-            "summary": f"Verification completed. Please review the data manually. (AI summary unavailable: {str(e)})"
+            "summary": f"Verification completed. Please review the data manually. (AI summary unavailable: {str(e)})",
+            "status": SUMMARY_FAILED
         }
 
+summary_worker = SummaryWorker(
+    db,
+    generate_ai_risk_summary,
+    concurrency=AI_SUMMARY_WORKERS,
+    recover_interval=AI_SUMMARY_RECOVER_INTERVAL,
+    lease_timeout=AI_SUMMARY_LEASE_TIMEOUT,
+    max_attempts=AI_SUMMARY_MAX_ATTEMPTS,
+    # The PDF includes the summary, so pre-generation waits for it
+    on_complete=lambda report: report_pdf_worker.submit(report["org_id"], report["id"])
+)
+
+async def run_verification(
+    org_id: str,
+    user_id: str,
+    verification_type: str,
+    vendor_name: str,
+    vendor_data: Dict[str, Any],
+    reservation: CreditReservation,
+    vendor_id: Optional[str] = None,
+    async_summary: Optional[bool] = None,
+    force_refresh: bool = False,
+    timer: Optional[StageTimer] = None,
+    identifiers: Optional[Dict[str, str]] = None,
+    job_id: Optional[str] = None,
+    row_number: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Run one verification: Plan API call, vendor/verification/report records and AI summary
+    
+    Consumes one credit from the reservation once the report exists. Unless
+    vendor_id is given, the org's vendor with a matching registration number
+    (GSTIN, PAN, CIN, ...) is reused and only created when there is none.
+    identifiers overrides the ones taken from vendor_data (e.g. every
+    identifier of a bulk row). Bulk rows pass job_id and row_number so a
+    resumed job can tell which of its checks are already done.
+    """
+    timer = timer or StageTimer()
+    
+    # Stage 1: Plan API call and vendor resolution in parallel
+    resolved = vendor_id is None
+    if resolved:
+        plan_api_result, vendor_result = await asyncio.gather(
+            timer.run("plan_api", call_plan_api_cached(verification_type, vendor_data, force_refresh)),
+            timer.run("vendor_upsert", vendor_directory.resolve(
+                org_id, vendor_name, identifiers if identifiers is not None else vendor_identifiers(vendor_data)
+            )),
+            return_exceptions=True
+        )
+        
+        if isinstance(vendor_result, BaseException):
+            raise vendor_result
+        vendor_id, vendor_created = vendor_result
+        
+        if isinstance(plan_api_result, BaseException):
+            # Don't leave an unverified vendor behind (an existing one is kept)
+            if vendor_created:
+                await vendor_directory.discard(vendor_id)
+            raise plan_api_result
+    else:
+        # Existing vendor (e.g. further checks on a bulk row)
+        plan_api_result = await timer.run(
+            "plan_api", call_plan_api_cached(verification_type, vendor_data, force_refresh)
+        )
+    plan_api_response = plan_api_result["response"]
+    
+    if async_summary is None:
+        async_summary = AI_SUMMARY_MODE == "async"
+    
+    # Stage 2: Verification record and AI risk summary in parallel
+    # (in async mode the summary is backfilled into the report later)
+    verification_data = {
+        "org_id": org_id,
+        "vendor_id": vendor_id,
+        "type": verification_type,
+        "raw_request": vendor_data,
+        "raw_response": plan_api_response,
+        "status": "success",
+        "cache_hit": plan_api_result["cache_hit"],
+        "upstream_fetched_at": plan_api_result["cached_at"],
+        "performed_by": user_id,
+        "job_id": job_id,
+        "row_number": row_number
+    }
+    
+    async def insert_verification():
+        try:
+            return await db.table("verifications").insert(verification_data).execute()
+        except APIError as e:
+            # A concurrent verification that created the vendor we matched failed
+            # its Plan API call and discarded it (discard_new_vendor); resolve once more
+            if e.code != "23503" or not resolved:
+                raise
+            verification_data["vendor_id"], _ = await vendor_directory.resolve(
+                org_id, vendor_name, identifiers if identifiers is not None else vendor_identifiers(vendor_data)
+            )
+            return await db.table("verifications").insert(verification_data).execute()
+    
+    if async_summary:
+        verification_result = await timer.run("verification_insert", insert_verification())
+        ai_summary = {"risk_level": "PENDING", "summary": "", "status": SUMMARY_PENDING}
+    else:
+        summary_task = asyncio.create_task(timer.run("ai_summary", generate_ai_risk_summary(plan_api_response)))
+        try:
+            verification_result = await timer.run("verification_insert", insert_verification())
+        except BaseException:
+            # No report will be written, so don't keep paying for the LLM call
+            summary_task.cancel()
+            await asyncio.gather(summary_task, return_exceptions=True)
+            raise
+        ai_summary = await summary_task
+    verification_id = verification_result.data[0]["id"]
+    vendor_id = verification_data["vendor_id"]
+    
+    # Stage 3: Create report
+    report_data = {
+        "org_id": org_id,
+        "vendor_id": vendor_id,
+        "verification_id": verification_id,
+        "summary_text": ai_summary["summary"] or None,
+        "risk_level": ai_summary["risk_level"] if ai_summary["risk_level"] in RISK_LEVELS else None,
+        "summary_status": ai_summary["status"],
+        "expires_at": (datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0) + 
+                      timedelta(days=7)).isoformat()
+    }
+    
+    report_result = await timer.run("report_insert", db.table("reports").insert(report_data).execute())
+    report_id = report_result.data[0]["id"]
+    
+    if async_summary:
+        # A full queue leaves the report pending for the worker's next recovery pass (every AI_SUMMARY_RECOVER_INTERVAL)
+        summary_worker.submit(report_id, plan_api_response)
+    else:
+        report_pdf_worker.submit(org_id, report_id)
+    
+    # Keep the reserved credit now that the report exists
+    reservation.consume()
+    
+    return {
+        "vendor_id": vendor_id,
+        "verification_id": verification_id,
+        "report_id": report_id,
+        "risk_level": ai_summary["risk_level"],
+        "summary": ai_summary["summary"],
+        "summary_status": ai_summary["status"]
+    }
+
+bulk_worker = BulkJobWorker(
+    db,
+    credit_engine,
+    # Bulk rows compute summaries inline so the job's own concurrency bounds LLM load
+    functools.partial(run_verification, async_summary=False),
+    write_audit_log,
+    concurrency=BULK_CONCURRENCY,
+    chunk_size=BULK_CHUNK_SIZE,
+    poll_interval=BULK_POLL_INTERVAL,
+    lease_timeout=BULK_LEASE_TIMEOUT,
+)
+
+async def load_report_for_pdf(report_id: str, org_id: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Fetch a report with its vendor and verification, plus the org's branding"""
+    report, branding = await asyncio.gather(
+        db.table("reports")\
+            .select("*, vendors(*), verifications(*)")\
+            .eq("id", report_id)\
+            .eq("org_id", org_id)\
+            .maybe_single()\
+            .execute(),
+        db.table("branding_settings")\
+            .select("*")\
+            .eq("org_id", org_id)\
+            .maybe_single()\
+            .execute()
+    )
+    
+    if not report or not report.data:
+        raise HTTPException(status_code=404, detail="Report not found")
+    
+    return report.data, (branding.data if branding and branding.data else {})
+
+# Renders in progress, keyed by report and fingerprint, so concurrent requests share one
+pdf_renders_in_flight: Dict[str, asyncio.Future] = {}
+
+async def render_and_store_pdf(render: Awaitable[bytes], file_path: str, record: Callable[[str], Awaitable[Any]]) -> bytes:
+    try:
+        pdf_content = await render
+    except RenderQueueFull:
+        raise HTTPException(
+            status_code=503,
+            detail="PDF renderer is busy, please retry shortly",
+            headers={"Retry-After": "5"}
+        )
+    except RenderPoolBroken:
+        raise HTTPException(
+            status_code=503,
+            detail="PDF renderer restarted, please retry",
+            headers={"Retry-After": "1"}
+        )
+    
+    await db.storage.from_(REPORTS_BUCKET).upload(
+        file_path,
+        pdf_content,
+        {"content-type": "application/pdf", "x-upsert": "true"}
+    )
+    
+    pdf_url = await db.storage.from_(REPORTS_BUCKET).get_public_url(file_path)
+    await record(pdf_url)
+    
+    return pdf_content
+
+async def ensure_stored_pdf(
+    file_path: str,
+    fingerprint: str,
+    stored_fingerprint: Optional[str],
+    render: Callable[[], Awaitable[bytes]],
+    record: Callable[[str], Awaitable[Any]]
+) -> Optional[bytes]:
+    """
+    Render and store a PDF unless the stored object already has this fingerprint
+    
+    Returns the freshly rendered bytes, or None when the stored object is current.
+    record(pdf_url) persists the new fingerprint once the upload succeeds.
+    """
+    if stored_fingerprint == fingerprint:
+        return None
+    
+    key = f"{file_path}:{fingerprint}"
+    pending = pdf_renders_in_flight.get(key)
+    if pending is None:
+        pending = asyncio.ensure_future(render_and_store_pdf(render(), file_path, record))
+        pdf_renders_in_flight[key] = pending
+        pending.add_done_callback(lambda _: pdf_renders_in_flight.pop(key, None))
+    
+    # Shielded so a client disconnecting doesn't cancel a render others are waiting on
+    return await asyncio.shield(pending)
+
+def summary_in_progress(report: Dict[str, Any]) -> bool:
+    """Whether a report's AI summary (part of its PDF) is still being computed"""
+    return report.get("summary_status") in SUMMARY_IN_PROGRESS
+
+async def ensure_report_pdf(report: Dict[str, Any], branding_data: Dict[str, Any]) -> Tuple[str, str, Optional[bytes]]:
+    """
+    Make sure the stored PDF matches the report's current inputs
+    
+    Returns (fingerprint, storage path, freshly rendered bytes or None when the
+    stored object was already current). Raises 409 while the summary is pending,
+    so no placeholder PDF is stored.
+    """
+    if summary_in_progress(report):
+        raise HTTPException(
+            status_code=409,
+            detail="Report summary is still being generated, please retry shortly",
+            headers={"Retry-After": "5"}
+        )
+    
+    fingerprint = report_fingerprint(report, report.get("vendors"), report.get("verifications"), branding_data)
+    file_path = f"{report['org_id']}/{report['id']}.pdf"
+    
+    pdf_content = await ensure_stored_pdf(
+        file_path,
+        fingerprint,
+        report.get("pdf_hash") if report.get("pdf_url") else None,
+        lambda: pdf_renderer.render(
+            branding_data,
+            report["vendors"],
+            report["verifications"],
+            {"risk_level": report.get("risk_level") or "MEDIUM", "summary": report.get("summary_text") or "", "created_at": report.get("created_at")},
+            report["id"]
+        ),
+        lambda pdf_url: db.table("reports").update({"pdf_url": pdf_url, "pdf_hash": fingerprint}).eq("id", report["id"]).execute()
+    )
+    
+    return fingerprint, file_path, pdf_content
+
+async def load_vendor_for_pdf(vendor_id: str, org_id: str) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Fetch a vendor with all of its verifications and reports in one query, plus the org's branding"""
+    vendor, branding = await asyncio.gather(
+        db.table("vendors")\
+            .select("*, verifications(id, type, status, created_at, upstream_fetched_at), reports(risk_level, summary_text, created_at)")\
+            .eq("id", vendor_id)\
+            .eq("org_id", org_id)\
+            .order("created_at", foreign_table="verifications")\
+            .order("created_at", foreign_table="reports")\
+            .maybe_single()\
+            .execute(),
+        db.table("branding_settings")\
+            .select("*")\
+            .eq("org_id", org_id)\
+            .maybe_single()\
+            .execute()
+    )
+    
+    if not vendor or not vendor.data:
+        raise HTTPException(status_code=404, detail="Vendor not found")
+    
+    return vendor.data, (branding.data if branding and branding.data else {})
+
+def latest_checks(verifications: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Most recent verification of each check type, in the order types were first checked"""
+    latest: Dict[str, Dict[str, Any]] = {}
+    for verification in verifications:
+        latest[verification["type"]] = verification  # Input is oldest first
+    return list(latest.values())
+
+def vendor_risk_summary(reports: List[Dict[str, Any]]) -> Dict[str, str]:
+    """Overall risk for a vendor: its most severe rated check, with the newest summary"""
+    rated = [r["risk_level"] for r in reports if r.get("risk_level") in RISK_LEVELS]
+    summarized = [r for r in reports if r.get("summary_text")]
+    return {
+        "risk_level": max(rated, key=RISK_LEVELS.index) if rated else "MEDIUM",
+        "summary": summarized[-1]["summary_text"] if summarized else "",
+        "created_at": summarized[-1].get("created_at") if summarized else None
+    }
+
+async def ensure_vendor_pdf(vendor: Dict[str, Any], branding_data: Dict[str, Any]) -> Tuple[str, str, Optional[bytes]]:
+    """Consolidated equivalent of ensure_report_pdf: one stored PDF per vendor, covering every check"""
+    checks = latest_checks(vendor.get("verifications") or [])
+    if not checks:
+        raise HTTPException(status_code=404, detail="Vendor has no verifications")
+    
+    ai_summary = vendor_risk_summary(vendor.get("reports") or [])
+    vendor_data = {k: v for k, v in vendor.items() if k not in ("verifications", "reports")}
+    fingerprint = vendor_report_fingerprint(vendor_data, checks, ai_summary, branding_data)
+    file_path = f"{vendor['org_id']}/vendor_{vendor['id']}.pdf"
+    
+    pdf_content = await ensure_stored_pdf(
+        file_path,
+        fingerprint,
+        vendor.get("report_pdf_hash"),
+        lambda: pdf_renderer.render_vendor(branding_data, vendor_data, checks, ai_summary, vendor["id"]),
+        lambda _: db.table("vendors").update({"report_pdf_hash": fingerprint}).eq("id", vendor["id"]).execute()
+    )
+    
+    return fingerprint, file_path, pdf_content
+
+async def get_report_pdf_bytes(report: Dict[str, Any], branding_data: Dict[str, Any]) -> bytes:
+    """Current PDF for a report, from storage or freshly rendered"""
+    _, file_path, pdf_content = await ensure_report_pdf(report, branding_data)
+    if pdf_content is None:
+        pdf_content = await db.storage.from_(REPORTS_BUCKET).download(file_path)
+    return pdf_content
+
+async def get_integration(org_id: str) -> Dict[str, Any]:
+    """Org's integration settings (briefly cached; read on every verification)"""
+    integration = integration_cache.get(org_id)
+    if integration is None:
+        result = await db.table("integrations").select("*").eq("org_id", org_id).maybe_single().execute()
+        integration = result.data if result and result.data else {}
+        integration_cache.set(org_id, integration)
+    return integration
+
+async def push_report_to_drive(
+    report: Dict[str, Any],
+    integration: Dict[str, Any],
+    pdf_content: bytes,
+    actor_id: Optional[str]
+) -> Dict[str, Any]:
+    """Upload a report PDF to the org's Google Drive and record its file ID"""
+    from services.google_drive_service import GoogleDriveService
+    drive_service = GoogleDriveService()
+    
+    vendor_name = (report.get("vendors") or {}).get("name", "Unknown")
+    file_name = f"Ravono_Report_{vendor_name}_{report['id'][:8]}.pdf"
+    
+    # The Drive client is synchronous
+    drive_result = await asyncio.to_thread(
+        drive_service.upload_file,
+        file_content=pdf_content,
+        file_name=file_name,
+        mime_type="application/pdf",
+        access_token=integration["google_token_encrypted"],
+        refresh_token=integration.get("google_refresh_token_encrypted"),
+    )
+    
+    await db.table("reports").update({
+        "drive_file_id": drive_result["file_id"]
+    }).eq("id", report["id"]).execute()
+    
+    await write_audit_log(
+        org_id=report["org_id"],
+        actor_id=actor_id,
+        action="REPORT_SAVED_TO_DRIVE",
+        target_type="REPORT",
+        target_id=report["id"],
+        details={"file_id": drive_result["file_id"]}
+    )
+    
+    return drive_result
+
+async def pregenerate_report_pdf(org_id: str, report_id: str) -> None:
+    """Render and store a new report's PDF, then auto-save it to Drive if the org asked for that"""
+    integration = await get_integration(org_id)
+    auto_save = bool(integration.get("auto_save_reports") and integration.get("google_drive_connected"))
+    if not (integration.get("pregenerate_pdfs") or auto_save):
+        return
+    
+    report, branding_data = await load_report_for_pdf(report_id, org_id)
+    if summary_in_progress(report):
+        return  # Re-submitted by the summary worker once the summary is stored
+    
+    if auto_save and not report.get("drive_file_id"):
+        pdf_content = await get_report_pdf_bytes(report, branding_data)
+        actor_id = (report.get("verifications") or {}).get("performed_by")
+        await push_report_to_drive(report, integration, pdf_content, actor_id)
+    else:
+        await ensure_report_pdf(report, branding_data)
+
+report_pdf_worker = ReportPdfWorker(pregenerate_report_pdf, concurrency=PDF_PREGEN_WORKERS, max_queue=PDF_PREGEN_MAX_QUEUE)
+
+async def pdf_response(
+    fingerprint: str,
+    file_path: str,
+    pdf_content: Optional[bytes],
+    filename: str,
+    if_none_match: Optional[str],
+    range_header: Optional[str],
+    if_range: Optional[str]
+) -> Response:
+    """Conditional, range-aware response for a stored (or just rendered) PDF"""
+    etag = f'"{fingerprint}"'
+    headers = {
+        "ETag": etag,
+        "Accept-Ranges": "bytes",
+        "Cache-Control": "private, no-cache",
+        "Content-Disposition": f"attachment; filename={filename}"
+    }
+    
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": headers["Cache-Control"]})
+    
+    # A Range only applies to the version the client already has part of
+    if if_range and if_range != etag:
+        range_header = None
+    
+    if pdf_content is None:
+        if PDF_DELIVERY == "redirect":
+            signed = await db.storage.from_(REPORTS_BUCKET).create_signed_url(file_path, PDF_SIGNED_URL_TTL)
+            return RedirectResponse(signed["signedURL"], status_code=307, headers={"ETag": etag})
+        
+        # Relay the stored object chunk by chunk; storage applies the Range itself
+        stored = await db.open_object(REPORTS_BUCKET, file_path, {"Range": range_header} if range_header else None)
+        if stored.status_code not in (200, 206):
+            await stored.aclose()
+            if stored.status_code == 416:
+                raise HTTPException(status_code=416, detail="Requested range not satisfiable")
+            raise HTTPException(status_code=502, detail=f"Report storage returned {stored.status_code}")
+        
+        for name in ("Content-Length", "Content-Range"):
+            if name in stored.headers:
+                headers[name] = stored.headers[name]
+        
+        return StreamingResponse(
+            stored.aiter_bytes(PDF_STREAM_CHUNK_SIZE),
+            status_code=stored.status_code,
+            media_type="application/pdf",
+            headers=headers,
+            background=BackgroundTask(stored.aclose)
+        )
+    
+    # Freshly rendered: the bytes that were just uploaded are sliced for the response, not copied
+    size = len(pdf_content)
+    try:
+        byte_range = parse_byte_range(range_header, size)
+    except RangeNotSatisfiable:
+        raise HTTPException(
+            status_code=416,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"}
+        )
+    
+    status_code = 200
+    start, end = 0, size - 1
+    if byte_range is not None:
+        status_code = 206
+        start, end = byte_range
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+    headers["Content-Length"] = str(end - start + 1)
+    
+    return StreamingResponse(
+        iter_byte_slices(pdf_content, start, end, PDF_STREAM_CHUNK_SIZE),
+        status_code=status_code,
+        media_type="application/pdf",
+        headers=headers
+    )
+
+def report_file_name(report: Dict[str, Any]) -> str:
+    vendor_name = (report.get("vendors") or {}).get("name") or "Unknown"
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", f"Ravono_Report_{vendor_name}_{report['id'][:8]}") + ".pdf"
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
 # =============================================
 # API ROUTES
 # =============================================
@@ -230,6 +995,11 @@ def health_check():
     """Health check endpoint"""
     return {"status": "healthy", "timestamp": datetime.now(timezone.utc).isoformat()}
 
+@app.get("/api/metrics/pdf")
+def pdf_render_metrics():
+    """PDF render pool queue depth and throughput"""
+    return pdf_renderer.stats()
+
 # =============================================
 # AUTH ROUTES
 # =============================================
@@ -239,7 +1009,7 @@ async def signup(email: str, password: str, name: str, org_name: Optional[str] =
     """Sign up a new user"""
     try:
         # Create user in Supabase Auth
-        response = supabase.auth.sign_up({
+        response = await db.auth.sign_up({
             "email": email,
             "password": password,
             "options": {
@@ -262,7 +1032,7 @@ async def signup(email: str, password: str, name: str, org_name: Optional[str] =
 async def signin(email: str, password: str):
     """Sign in an existing user"""
     try:
-        response = supabase.auth.sign_in_with_password({
+        response = await db.auth.sign_in_with_password({
             "email": email,
             "password": password
         })
@@ -276,117 +1046,104 @@ async def signin(email: str, password: str):
         raise HTTPException(status_code=401, detail=f"Login failed: {str(e)}")
 
 @app.get("/api/auth/user")
-async def get_current_user(authorization: str = Header(None)):
+async def get_current_user(principal: Principal = Depends(get_principal)):
     """Get current authenticated user"""
-    user = get_user_from_token(authorization)
-    org_id = get_org_id(user.id)
-    
-    # Get full profile
-    profile = supabase.table("profiles").select("*").eq("user_id", user.id).single().execute()
-    
     return {
-        "user": user,
-        "profile": profile.data
+        "user": principal.user,
+        "profile": principal.profile
     }
 
+@app.post("/api/webhooks/profiles")
+async def profiles_changed_webhook(payload: Dict[str, Any], x_webhook_secret: Optional[str] = Header(None)):
+    """Supabase database webhook on profiles: drop cached org/role lookups"""
+    if not SUPABASE_WEBHOOK_SECRET or not hmac.compare_digest(x_webhook_secret or "", SUPABASE_WEBHOOK_SECRET):
+        raise HTTPException(status_code=401, detail="Invalid webhook secret")
+    
+    for record in (payload.get("record"), payload.get("old_record")):
+        if record and record.get("user_id"):
+            invalidate_profile(record["user_id"])
+    
+    return {"success": True}
+
 # =============================================
 # VERIFICATION ROUTES
 # =============================================
 
 @app.post("/api/verify/vendor", response_model=VerificationResponse)
-async def verify_vendor(request: VerificationRequest, authorization: str = Header(None)):
+async def verify_vendor(
+    request: VerificationRequest,
+    response: Response,
+    background_tasks: BackgroundTasks,
+    principal: Principal = Depends(get_principal)
+):
     """Verify a vendor using Plan API and generate AI report"""
     
     # Authenticate user
-    user = get_user_from_token(authorization)
-    org_id = get_org_id(user.id)
+    user, org_id = principal.user, principal.org_id
+    timer = StageTimer()
     
-    # Check credits
-    if not check_credits(org_id):
+    # Reserve the credit up front; it is refunded if verification fails
+    try:
+        reservation = await timer.run(
+            "credit_reserve",
+            credit_engine.reserve(org_id, 1, user_id=user.id, reason=f"VERIFY_VENDOR {request.type}")
+        )
+    except InsufficientCreditsError:
         raise HTTPException(status_code=402, detail="Insufficient credits. Please upgrade your plan.")
     
     try:
-        # Step 1: Call Plan API for verification
-        plan_api_response = await call_plan_api(request.type, request.vendor_data)
-        
-        # Step 2: Create/update vendor record
-        vendor_data = {
-            "org_id": org_id,
-            "name": request.vendor_name,
-            request.type.lower(): request.vendor_data.get(request.type.lower())
-        }
-        
-        vendor_result = supabase.table("vendors").insert(vendor_data).execute()
-        vendor_id = vendor_result.data[0]["id"]
-        
-        # Step 3: Store verification record
-        verification_data = {
-            "org_id": org_id,
-            "vendor_id": vendor_id,
-            "type": request.type,
-            "raw_request": request.vendor_data,
-            "raw_response": plan_api_response,
-            "status": "success",
-            "performed_by": user.id
-        }
-        
-        verification_result = supabase.table("verifications").insert(verification_data).execute()
-        verification_id = verification_result.data[0]["id"]
-        
-        # Step 4: Generate AI risk summary
-        ai_summary = await generate_ai_risk_summary(plan_api_response)
-        
-        # Step 5: Create report
-        report_data = {
-            "org_id": org_id,
-            "vendor_id": vendor_id,
-            "verification_id": verification_id,
-            "summary_text": ai_summary["summary"],
-            "risk_level": ai_summary["risk_level"],
-            "expires_at": (datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0) + 
-                          timedelta(days=7)).isoformat()
-        }
+        result = await run_verification(
+            org_id,
+            user.id,
+            request.type,
+            request.vendor_name,
+            request.vendor_data,
+            reservation,
+            async_summary=request.async_summary,
+            force_refresh=request.force_refresh,
+            timer=timer
+        )
         
-        report_result = supabase.table("reports").insert(report_data).execute()
-        report_id = report_result.data[0]["id"]
+        # Audit trail is written after the response is sent
+        background_tasks.add_task(
+            write_audit_log,
+            org_id=org_id,
+            actor_id=user.id,
+            action="VERIFY_VENDOR",
+            target_type="VENDOR",
+            target_id=result["vendor_id"],
+            details={"type": request.type, "vendor_name": request.vendor_name}
+        )
         
-        # Step 6: Deduct credits
-        deduct_credits(org_id, 1)
-        
-        # Step 7: Log audit trail
-        supabase.table("audit_logs").insert({
-            "org_id": org_id,
-            "actor_id": user.id,
-            "action": "VERIFY_VENDOR",
-            "target_type": "VENDOR",
-            "target_id": vendor_id,
-            "details": {"type": request.type, "vendor_name": request.vendor_name}
-        }).execute()
+        response.headers["Server-Timing"] = timer.server_timing()
         
         return VerificationResponse(
-            verification_id=verification_id,
-            report_id=report_id,
+            verification_id=result["verification_id"],
+            report_id=result["report_id"],
             status="success",
-            risk_level=ai_summary["risk_level"],
-            summary=ai_summary["summary"]
+            risk_level=result["risk_level"],
+            summary=result["summary"],
+            summary_status=result["summary_status"]
         )
         
     except HTTPException as he:
         raise he
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Verification failed: {str(e)}")
+    finally:
+        # Refunds the credit if any step above failed
+        await reservation.release()
 
 # =============================================
 # CREDIT ROUTES
 # =============================================
 
 @app.get("/api/credits/balance")
-async def get_credit_balance(authorization: str = Header(None)):
+async def get_credit_balance(principal: Principal = Depends(get_principal)):
     """Get current credit balance"""
-    user = get_user_from_token(authorization)
-    org_id = get_org_id(user.id)
+    org_id = principal.org_id
     
-    result = supabase.table("credits").select("*").eq("org_id", org_id).single().execute()
+    result = await db.table("credits").select("*").eq("org_id", org_id).single().execute()
     
     return result.data
 
@@ -395,52 +1152,201 @@ async def get_credit_balance(authorization: str = Header(None)):
 # =============================================
 
 @app.get("/api/dashboard/stats")
-async def get_dashboard_stats(authorization: str = Header(None)):
-    """Get dashboard statistics"""
-    user = get_user_from_token(authorization)
-    org_id = get_org_id(user.id)
+async def get_dashboard_stats(principal: Principal = Depends(get_principal)):
+    """Get dashboard statistics (one call over trigger-maintained counters)"""
+    org_id = principal.org_id
+    
+    result = await db.rpc("get_dashboard_stats", {"p_org_id": org_id}).execute()
     
-    # Get credits
-    credits = supabase.table("credits").select("current_balance, monthly_limit").eq("org_id", org_id).single().execute()
+    return result.data
+
+@app.get("/api/reports")
+async def get_reports(
+    response: Response,
+    limit: int = Query(REPORTS_PAGE_SIZE, ge=1, le=REPORTS_MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    risk_level: Optional[str] = None,
+    vendor_id: Optional[uuid.UUID] = None,
+    type: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    expand: Optional[str] = None,
+    principal: Principal = Depends(get_principal)
+):
+    """
+    List the organization's reports, newest first, one page at a time
     
-    # Get verifications count (this month)
-    verifications = supabase.table("verifications").select("id", count="exact").eq("org_id", org_id).execute()
+    The body is the page; when more rows follow, the X-Next-Cursor header carries
+    the cursor for the next page (sent back with the same filters). expand= is a
+    comma separated list of summary, vendor, verification (full rows, including
+    the raw API payloads).
+    """
+    org_id = principal.org_id
     
-    # Get reports count
-    reports = supabase.table("reports").select("id", count="exact").eq("org_id", org_id).execute()
+    expansions = {name.strip() for name in (expand or "").split(",") if name.strip()}
+    unknown = expansions.difference(REPORT_LIST_EXPANSIONS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown expand: {', '.join(sorted(unknown))}")
+    if risk_level and risk_level.upper() not in RISK_LEVELS:
+        raise HTTPException(status_code=400, detail=f"risk_level must be one of {', '.join(RISK_LEVELS)}")
     
-    # Get high risk vendors count
-    high_risk = supabase.table("reports").select("id", count="exact").eq("org_id", org_id).eq("risk_level", "HIGH").execute()
+    try:
+        after = after_filter(cursor)
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    return {
-        "credits_remaining": credits.data["current_balance"],
-        "credits_total": credits.data["monthly_limit"],
-        "verifications_this_month": verifications.count,
-        "total_reports": reports.count,
-        "high_risk_vendors": high_risk.count
-    }
+    columns = [REPORT_LIST_COLUMNS]
+    if "summary" in expansions:
+        columns.append("summary_text")
+    for name, (lean, full) in REPORT_LIST_EMBEDS.items():
+        embed = full if name in expansions else lean
+        if name == "verification" and type:
+            embed = embed.replace("verifications(", "verifications!inner(", 1)  # Filter reports by their check type
+        columns.append(embed)
+    
+    query = db.table("reports")\
+        .select(", ".join(columns))\
+        .eq("org_id", org_id)
+    
+    if risk_level:
+        query = query.eq("risk_level", risk_level.upper())
+    if vendor_id:
+        query = query.eq("vendor_id", str(vendor_id))
+    if type:
+        query = query.eq("verifications.type", type.upper())
+    if date_from:
+        query = query.gte("created_at", date_from.isoformat())
+    if date_to:
+        query = query.lte("created_at", date_to.isoformat())
+    if after:
+        query = query.or_(after)
+    
+    # One order parameter for both keys ("created_at.desc,id.desc"), matching idx_reports_org_listing
+    result = await query\
+        .order("created_at.desc,id", desc=True)\
+        .limit(limit + 1)\
+        .execute()
+    
+    reports = result.data or []
+    if len(reports) > limit:
+        reports = reports[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(reports[-1])
+    
+    return reports
 
-@app.get("/api/reports")
-async def get_reports(authorization: str = Header(None)):
-    """Get all reports for the organization"""
-    user = get_user_from_token(authorization)
-    org_id = get_org_id(user.id)
+@app.post("/api/reports/export")
+async def export_reports(
+    request: ReportExportRequest,
+    background_tasks: BackgroundTasks,
+    principal: Principal = Depends(get_principal)
+):
+    """Download many report PDFs at once as a streamed ZIP or a single merged PDF"""
+    org_id = principal.org_id
+    export_format = request.format.lower()
+    
+    if export_format not in ("zip", "pdf"):
+        raise HTTPException(status_code=400, detail="format must be 'zip' or 'pdf'")
     
-    result = supabase.table("reports")\
+    query = db.table("reports")\
         .select("*, vendors(*), verifications(*)")\
-        .eq("org_id", org_id)\
-        .order("created_at", desc=True)\
-        .execute()
+        .eq("org_id", org_id)
     
-    return result.data
+    if request.report_ids is not None:
+        if not request.report_ids:
+            raise HTTPException(status_code=400, detail="report_ids must not be empty; omit it to export by filters")
+        query = query.in_("id", [str(report_id) for report_id in request.report_ids])
+    if request.vendor_id:
+        query = query.eq("vendor_id", str(request.vendor_id))
+    if request.risk_level:
+        query = query.eq("risk_level", request.risk_level.upper())
+    if request.date_from:
+        query = query.gte("created_at", request.date_from.isoformat())
+    if request.date_to:
+        query = query.lte("created_at", request.date_to.isoformat())
+    
+    max_reports = REPORT_EXPORT_MAX_MERGED if export_format == "pdf" else REPORT_EXPORT_MAX_REPORTS
+    
+    reports, branding = await asyncio.gather(
+        query.order("created_at", desc=True).limit(max_reports + 1).execute(),
+        db.table("branding_settings").select("*").eq("org_id", org_id).maybe_single().execute()
+    )
+    reports = reports.data or []
+    branding_data = branding.data if branding and branding.data else {}
+    
+    if not reports:
+        raise HTTPException(status_code=404, detail="No reports match the export criteria")
+    if len(reports) > max_reports:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Export is limited to {max_reports} reports in {export_format} format; narrow the selection"
+        )
+    pending = [r["id"] for r in reports if summary_in_progress(r)]
+    if pending:
+        raise HTTPException(
+            status_code=409,
+            detail=f"Summaries are still being generated for reports: {', '.join(pending)}",
+            headers={"Retry-After": "5"}
+        )
+    
+    background_tasks.add_task(
+        write_audit_log,
+        org_id=org_id,
+        actor_id=principal.user.id,
+        action="REPORTS_EXPORTED",
+        target_type="REPORT",
+        details={"format": export_format, "count": len(reports), "report_ids": [r["id"] for r in reports]}
+    )
+    
+    fetched = fetch_in_order(reports, lambda report: get_report_pdf_bytes(report, branding_data), REPORT_EXPORT_CONCURRENCY)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
+    
+    if export_format == "pdf":
+        pdfs = []
+        async for report, result in fetched:
+            if isinstance(result, HTTPException) and result.status_code == 503:
+                raise result
+            if isinstance(result, Exception):
+                raise HTTPException(status_code=500, detail=f"PDF generation failed for report {report['id']}: {result}")
+            pdfs.append(result)
+        
+        try:
+            merged = await pdf_renderer.run(merge_pdfs, pdfs)
+        except (RenderQueueFull, RenderPoolBroken):
+            raise HTTPException(
+                status_code=503,
+                detail="PDF renderer is busy, please retry shortly",
+                headers={"Retry-After": "5"}
+            )
+        return Response(
+            content=merged,
+            media_type="application/pdf",
+            headers={"Content-Disposition": f"attachment; filename=reports_{stamp}.pdf"}
+        )
+    
+    async def entries():
+        failures = []
+        async for report, result in fetched:
+            if isinstance(result, Exception):
+                failures.append(f"{report['id']}: {getattr(result, 'detail', None) or result}")
+                continue
+            yield report_file_name(report), result
+        
+        # The response is already streaming, so failed reports are listed rather than failing it
+        if failures:
+            yield "export_errors.txt", "\n".join(failures).encode("utf-8")
+    
+    return StreamingResponse(
+        stream_zip(entries()),
+        media_type="application/zip",
+        headers={"Content-Disposition": f"attachment; filename=reports_{stamp}.zip"}
+    )
 
 @app.get("/api/reports/{report_id}")
-async def get_report_detail(report_id: str, authorization: str = Header(None)):
+async def get_report_detail(report_id: str, principal: Principal = Depends(get_principal)):
     """Get detailed report"""
-    user = get_user_from_token(authorization)
-    org_id = get_org_id(user.id)
+    org_id = principal.org_id
     
-    result = supabase.table("reports")\
+    result = await db.table("reports")\
         .select("*, vendors(*), verifications(*)")\
         .eq("id", report_id)\
         .eq("org_id", org_id)\
@@ -449,65 +1355,99 @@ async def get_report_detail(report_id: str, authorization: str = Header(None)):
     
     return result.data
 
+@app.get("/api/reports/{report_id}/summary")
+async def get_report_summary(report_id: str, principal: Principal = Depends(get_principal)):
+    """Get AI summary status for a report (poll while summary_status is pending or processing)"""
+    org_id = principal.org_id
+    
+    result = await db.table("reports")\
+        .select("id, summary_status, risk_level, summary_text")\
+        .eq("id", report_id)\
+        .eq("org_id", org_id)\
+        .single()\
+        .execute()
+    
+    return result.data
+
+@app.get("/api/reports/{report_id}/summary/stream")
+async def stream_report_summary(report_id: str, principal: Principal = Depends(get_principal)):
+    """Server-sent events: emits the report summary once it is completed or failed"""
+    org_id = principal.org_id
+    
+    async def events():
+        deadline = asyncio.get_running_loop().time() + AI_SUMMARY_STREAM_TIMEOUT
+        while True:
+            result = await db.table("reports")\
+                .select("id, summary_status, risk_level, summary_text")\
+                .eq("id", report_id)\
+                .eq("org_id", org_id)\
+                .execute()
+            
+            if not result.data:
+                yield "event: error\ndata: {\"detail\": \"Report not found\"}\n\n"
+                return
+            
+            report = result.data[0]
+            if report["summary_status"] not in SUMMARY_IN_PROGRESS:
+                yield f"event: summary\ndata: {json.dumps(report)}\n\n"
+                return
+            
+            if asyncio.get_running_loop().time() >= deadline:
+                yield f"event: timeout\ndata: {json.dumps(report)}\n\n"
+                return
+            
+            yield ": pending\n\n"
+            await asyncio.sleep(AI_SUMMARY_STREAM_INTERVAL)
+    
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
 @app.get("/api/reports/{report_id}/pdf")
-async def generate_report_pdf(report_id: str, authorization: str = Header(None)):
-    """Generate PDF for a report"""
-    user = get_user_from_token(authorization)
-    org_id = get_org_id(user.id)
+async def generate_report_pdf(
+    report_id: str,
+    if_none_match: Optional[str] = Header(None),
+    range_header: Optional[str] = Header(None, alias="Range"),
+    if_range: Optional[str] = Header(None),
+    principal: Principal = Depends(get_principal)
+):
+    """Stream a report's PDF (Range requests supported), rendering it only when its inputs have changed"""
+    org_id = principal.org_id
     
     try:
-        # Get report data
-        report = supabase.table("reports")\
-            .select("*, vendors(*), verifications(*)")\
-            .eq("id", report_id)\
-            .eq("org_id", org_id)\
-            .single()\
-            .execute()
-        
-        if not report.data:
-            raise HTTPException(status_code=404, detail="Report not found")
-        
-        # Get branding settings
-        branding = supabase.table("branding_settings")\
-            .select("*")\
-            .eq("org_id", org_id)\
-            .single()\
-            .execute()
-        
-        branding_data = branding.data if branding.data else {}
+        report, branding_data = await load_report_for_pdf(report_id, org_id)
+        fingerprint, file_path, pdf_content = await ensure_report_pdf(report, branding_data)
         
-        # Import PDF generator
-        from services.pdf_generator import PDFReportGenerator
-        
-        generator = PDFReportGenerator(branding=branding_data)
-        
-        # Generate PDF
-        pdf_content = generator.generate_report(
-            vendor_data=report.data["vendors"],
-            verification_data=report.data["verifications"],
-            ai_summary={"risk_level": report.data.get("risk_level", "MEDIUM"), "summary": report.data.get("summary_text", "")},
-            report_id=report_id
+        return await pdf_response(
+            fingerprint, file_path, pdf_content, f"report_{report_id}.pdf",
+            if_none_match, range_header, if_range
         )
         
-        # Save PDF to storage
-        file_path = f"{org_id}/{report_id}.pdf"
-        supabase.storage.from_("reports").upload(
-            file_path,
-            pdf_content,
-            {"content-type": "application/pdf"}
-        )
-        
-        # Update report with PDF URL
-        pdf_url = supabase.storage.from_("reports").get_public_url(file_path)
-        supabase.table("reports").update({"pdf_url": pdf_url}).eq("id", report_id).execute()
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"PDF generation failed: {str(e)}")
+
+@app.get("/api/vendors/{vendor_id}/report/pdf")
+async def generate_vendor_report_pdf(
+    vendor_id: str,
+    if_none_match: Optional[str] = Header(None),
+    range_header: Optional[str] = Header(None, alias="Range"),
+    if_range: Optional[str] = Header(None),
+    principal: Principal = Depends(get_principal)
+):
+    """Stream one consolidated PDF covering every check run on a vendor"""
+    org_id = principal.org_id
+    
+    try:
+        vendor, branding_data = await load_vendor_for_pdf(vendor_id, org_id)
+        fingerprint, file_path, pdf_content = await ensure_vendor_pdf(vendor, branding_data)
         
-        # Return PDF
-        return Response(
-            content=pdf_content,
-            media_type="application/pdf",
-            headers={"Content-Disposition": f"attachment; filename=report_{report_id}.pdf"}
+        return await pdf_response(
+            fingerprint, file_path, pdf_content, f"vendor_report_{vendor_id}.pdf",
+            if_none_match, range_header, if_range
         )
         
+    except HTTPException as he:
+        raise he
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"PDF generation failed: {str(e)}")
 
@@ -518,7 +1458,7 @@ async def generate_report_pdf(report_id: str, authorization: str = Header(None))
 @app.get("/api/plans")
 async def get_plans():
     """Get all subscription plans"""
-    result = supabase.table("plans").select("*").eq("is_active", True).execute()
+    result = await db.table("plans").select("*").eq("is_active", True).execute()
     return result.data
 
 # =============================================
@@ -526,22 +1466,18 @@ async def get_plans():
 # =============================================
 
 @app.post("/api/payment/create-order")
-async def create_payment_order(plan_code: str, authorization: str = Header(None)):
+async def create_payment_order(plan_code: str, principal: Principal = Depends(get_principal)):
     """Create Razorpay order for plan purchase"""
-    user = get_user_from_token(authorization)
-    org_id = get_org_id(user.id)
+    user, org_id = principal.user, principal.org_id
     
     try:
-        # Get user profile
-        profile = supabase.table("profiles").select("name").eq("user_id", user.id).single().execute()
-        
         from services.razorpay_service import RazorpayService
         razorpay_service = RazorpayService()
         
         order_data = razorpay_service.create_subscription(
             plan_id=plan_code,
             customer_email=user.email,
-            customer_name=profile.data["name"],
+            customer_name=principal.profile["name"],
             org_id=org_id
         )
         
@@ -556,11 +1492,10 @@ async def verify_payment(
     razorpay_payment_id: str,
     razorpay_signature: str,
     plan_code: str,
-    authorization: str = Header(None)
+    principal: Principal = Depends(get_principal)
 ):
     """Verify payment and update subscription"""
-    user = get_user_from_token(authorization)
-    org_id = get_org_id(user.id)
+    user, org_id = principal.user, principal.org_id
     
     try:
         from services.razorpay_service import RazorpayService
@@ -577,14 +1512,14 @@ async def verify_payment(
             raise HTTPException(status_code=400, detail="Invalid payment signature")
         
         # Get plan details
-        plan = supabase.table("plans").select("*").eq("code", plan_code).single().execute()
+        plan = await db.table("plans").select("*").eq("code", plan_code).single().execute()
         
         if not plan.data:
             raise HTTPException(status_code=404, detail="Plan not found")
         
         # Update subscription
         # First, deactivate old subscriptions
-        supabase.table("subscriptions").update({"status": "cancelled"}).eq("org_id", org_id).execute()
+        await db.table("subscriptions").update({"status": "cancelled"}).eq("org_id", org_id).execute()
         
         # Create new subscription
         new_subscription = {
@@ -597,22 +1532,22 @@ async def verify_payment(
             "razorpay_subscription_id": razorpay_payment_id,
         }
         
-        supabase.table("subscriptions").insert(new_subscription).execute()
+        await db.table("subscriptions").insert(new_subscription).execute()
         
         # Update credits
-        supabase.table("credits").update({
+        await db.table("credits").update({
             "current_balance": plan.data["monthly_credits"],
             "monthly_limit": plan.data["monthly_credits"],
         }).eq("org_id", org_id).execute()
         
         # Log audit
-        supabase.table("audit_logs").insert({
-            "org_id": org_id,
-            "actor_id": user.id,
-            "action": "PLAN_UPGRADE",
-            "target_type": "SUBSCRIPTION",
-            "details": {"plan": plan_code, "payment_id": razorpay_payment_id}
-        }).execute()
+        await write_audit_log(
+            org_id=org_id,
+            actor_id=user.id,
+            action="PLAN_UPGRADE",
+            target_type="SUBSCRIPTION",
+            details={"plan": plan_code, "payment_id": razorpay_payment_id}
+        )
         
         return {
             "success": True,
@@ -630,10 +1565,9 @@ async def verify_payment(
 # =============================================
 
 @app.get("/api/integrations/google-drive/auth-url")
-async def get_google_drive_auth_url(authorization: str = Header(None)):
+async def get_google_drive_auth_url(principal: Principal = Depends(get_principal)):
     """Get Google Drive OAuth authorization URL"""
-    user = get_user_from_token(authorization)
-    org_id = get_org_id(user.id)
+    org_id = principal.org_id
     
     try:
         from services.google_drive_service import GoogleDriveService
@@ -647,10 +1581,9 @@ async def get_google_drive_auth_url(authorization: str = Header(None)):
         raise HTTPException(status_code=500, detail=f"Failed to generate auth URL: {str(e)}")
 
 @app.post("/api/integrations/google-drive/connect")
-async def connect_google_drive(code: str, authorization: str = Header(None)):
+async def connect_google_drive(code: str, principal: Principal = Depends(get_principal)):
     """Connect Google Drive with authorization code"""
-    user = get_user_from_token(authorization)
-    org_id = get_org_id(user.id)
+    user, org_id = principal.user, principal.org_id
     
     try:
         from services.google_drive_service import GoogleDriveService
@@ -660,21 +1593,22 @@ async def connect_google_drive(code: str, authorization: str = Header(None)):
         tokens = drive_service.exchange_code_for_tokens(code)
         
         # Store tokens in integrations table (encrypted in production)
-        supabase.table("integrations").update({
+        await db.table("integrations").update({
             "google_drive_connected": True,
             "google_email": tokens["email"],
             "google_token_encrypted": tokens["access_token"],  # Should encrypt in production
             "google_refresh_token_encrypted": tokens["refresh_token"],
         }).eq("org_id", org_id).execute()
+        integration_cache.invalidate(org_id)
         
         # Log audit
-        supabase.table("audit_logs").insert({
-            "org_id": org_id,
-            "actor_id": user.id,
-            "action": "GOOGLE_DRIVE_CONNECTED",
-            "target_type": "INTEGRATION",
-            "details": {"email": tokens["email"]}
-        }).execute()
+        await write_audit_log(
+            org_id=org_id,
+            actor_id=user.id,
+            action="GOOGLE_DRIVE_CONNECTED",
+            target_type="INTEGRATION",
+            details={"email": tokens["email"]}
+        )
         
         return {
             "success": True,
@@ -685,65 +1619,25 @@ async def connect_google_drive(code: str, authorization: str = Header(None)):
         raise HTTPException(status_code=500, detail=f"Failed to connect Google Drive: {str(e)}")
 
 @app.post("/api/reports/{report_id}/save-to-drive")
-async def save_report_to_drive(report_id: str, authorization: str = Header(None)):
+async def save_report_to_drive(report_id: str, principal: Principal = Depends(get_principal)):
     """Save report PDF to Google Drive"""
-    user = get_user_from_token(authorization)
-    org_id = get_org_id(user.id)
+    user, org_id = principal.user, principal.org_id
     
     try:
-        # Get report
-        report = supabase.table("reports").select("*, vendors(*)").eq("id", report_id).eq("org_id", org_id).single().execute()
-        
-        if not report.data:
-            raise HTTPException(status_code=404, detail="Report not found")
-        
-        # Get Google Drive integration
-        integration = supabase.table("integrations").select("*").eq("org_id", org_id).single().execute()
+        # Get report and Google Drive integration
+        (report, branding_data), integration = await asyncio.gather(
+            load_report_for_pdf(report_id, org_id),
+            get_integration(org_id)
+        )
         
-        if not integration.data or not integration.data.get("google_drive_connected"):
+        if not integration.get("google_drive_connected"):
             raise HTTPException(status_code=400, detail="Google Drive not connected")
         
-        # Get PDF content
-        pdf_url = report.data.get("pdf_url")
-        if not pdf_url:
-            # Generate PDF first
-            await generate_report_pdf(report_id, authorization)
-            report = supabase.table("reports").select("*").eq("id", report_id).single().execute()
-            pdf_url = report.data.get("pdf_url")
-        
-        # Download PDF from storage
-        file_path = f"{org_id}/{report_id}.pdf"
-        pdf_content = supabase.storage.from_("reports").download(file_path)
+        # Get PDF content (a storage read unless the stored copy is missing or stale)
+        pdf_content = await get_report_pdf_bytes(report, branding_data)
         
         # Upload to Drive
-        from services.google_drive_service import GoogleDriveService
-        drive_service = GoogleDriveService()
-        
-        vendor_name = report.data.get("vendors", {}).get("name", "Unknown")
-        file_name = f"Ravono_Report_{vendor_name}_{report_id[:8]}.pdf"
-        
-        drive_result = drive_service.upload_file(
-            file_content=pdf_content,
-            file_name=file_name,
-            mime_type="application/pdf",
-            access_token=integration.data["google_token_encrypted"],
-            refresh_token=integration.data.get("google_refresh_token_encrypted"),
-        )
-        
-        # Update report with Drive file ID
-        supabase.table("reports").update({
-            "drive_file_id": drive_result["file_id"]
-        }).eq("id", report_id).execute()
-        
-        # Log audit
-        supabase.table("audit_logs").insert({
-            "org_id": org_id,
-            "actor_id": user.id,
-            "action": "REPORT_SAVED_TO_DRIVE",
-            "target_type": "REPORT",
-            "target_id": report_id,
-            "details": {"file_id": drive_result["file_id"]}
-        }).execute()
+        drive_result = await push_report_to_drive(report, integration, pdf_content, user.id)
         
         return {
             "success": True,
@@ -764,37 +1658,44 @@ async def save_report_to_drive(report_id: str, authorization: str = Header(None)
 async def create_bulk_upload_job(
     file: UploadFile = File(...),
     job_name: str = "",
-    authorization: str = Header(None)
+    principal: Principal = Depends(get_principal)
 ):
     """Create bulk verification job from CSV"""
-    user = get_user_from_token(authorization)
-    org_id = get_org_id(user.id)
+    user, org_id = principal.user, principal.org_id
     
     try:
         # Validate file type
         if not file.filename.endswith('.csv'):
             raise HTTPException(status_code=400, detail="Only CSV files are allowed")
         
-        # Read CSV content
-        csv_content = await file.read()
+        # Validate and count rows while streaming the file to storage in chunks
+        validator = CsvStreamValidator()
+        
+        async def validated_chunks():
+            while True:
+                chunk = await file.read(BULK_UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                validator.feed(chunk)
+                if validator.bytes_read > BULK_UPLOAD_MAX_BYTES:
+                    raise CsvValidationError(f"File exceeds the {BULK_UPLOAD_MAX_BYTES // (1024 * 1024)} MB limit")
+                yield chunk
+            validator.close()
+            if validator.row_count == 0:
+                raise CsvValidationError("CSV has no data rows")
         
-        # Upload to storage
         file_path = f"{org_id}/{uuid.uuid4()}.csv"
-        supabase.storage.from_("bulk-uploads").upload(
-            file_path,
-            csv_content,
-            {"content-type": "text/csv"}
-        )
-        
-        file_url = supabase.storage.from_("bulk-uploads").get_public_url(file_path)
-        
-        # Parse CSV to count rows
-        import csv
-        from io import StringIO
-        
-        csv_string = csv_content.decode('utf-8')
-        csv_reader = csv.DictReader(StringIO(csv_string))
-        rows = list(csv_reader)
+        try:
+            await db.upload_stream("bulk-uploads", file_path, validated_chunks(), "text/csv")
+        except CsvValidationError as e:
+            # The aborted upload should not be stored, but make sure
+            try:
+                await db.storage.from_("bulk-uploads").remove([file_path])
+            except Exception:
+                pass
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        file_url = await db.storage.from_("bulk-uploads").get_public_url(file_path)
         
         # Create job record
         job_data = {
@@ -803,28 +1704,33 @@ async def create_bulk_upload_job(
             "type": "BULK_VERIFY",
             "job_name": job_name or file.filename,
             "file_url": file_url,
+            "file_path": file_path,
             "status": "pending",
-            "total_count": len(rows),
+            "total_count": validator.row_count,
+            "processed_count": 0,
             "success_count": 0,
             "error_count": 0,
         }
         
-        job = supabase.table("jobs").insert(job_data).execute()
+        job = await db.table("jobs").insert(job_data).execute()
+        bulk_worker.wake()
         
         # Log audit
-        supabase.table("audit_logs").insert({
-            "org_id": org_id,
-            "actor_id": user.id,
-            "action": "BULK_UPLOAD_CREATED",
-            "target_type": "JOB",
-            "target_id": job.data[0]["id"],
-            "details": {"total_rows": len(rows)}
-        }).execute()
+        await write_audit_log(
+            org_id=org_id,
+            actor_id=user.id,
+            action="BULK_UPLOAD_CREATED",
+            target_type="JOB",
+            target_id=job.data[0]["id"],
+            details={"total_rows": validator.row_count}
+        )
         
         return {
             "success": True,
             "job_id": job.data[0]["id"],
-            "total_rows": len(rows)
+            "total_rows": validator.row_count,
+            "invalid_rows": validator.invalid_row_count,
+            "row_errors": validator.row_errors
         }
         
     except HTTPException as he:
@@ -833,22 +1739,20 @@ async def create_bulk_upload_job(
         raise HTTPException(status_code=500, detail=f"Bulk upload failed: {str(e)}")
 
 @app.get("/api/bulk-upload/jobs")
-async def get_bulk_jobs(authorization: str = Header(None)):
+async def get_bulk_jobs(principal: Principal = Depends(get_principal)):
     """Get all bulk upload jobs for organization"""
-    user = get_user_from_token(authorization)
-    org_id = get_org_id(user.id)
+    org_id = principal.org_id
     
-    result = supabase.table("jobs").select("*").eq("org_id", org_id).order("created_at", desc=True).execute()
+    result = await db.table("jobs").select("*").eq("org_id", org_id).order("created_at", desc=True).execute()
     
     return result.data
 
 @app.get("/api/bulk-upload/jobs/{job_id}")
-async def get_bulk_job_detail(job_id: str, authorization: str = Header(None)):
+async def get_bulk_job_detail(job_id: str, principal: Principal = Depends(get_principal)):
     """Get bulk job details"""
-    user = get_user_from_token(authorization)
-    org_id = get_org_id(user.id)
+    org_id = principal.org_id
     
-    result = supabase.table("jobs").select("*").eq("id", job_id).eq("org_id", org_id).single().execute()
+    result = await db.table("jobs").select("*").eq("id", job_id).eq("org_id", org_id).single().execute()
     
     return result.data
 
@@ -0,0 +1,231 @@
+"""
+Audit Log Sink
+Buffers audit events in a local spill file and writes them to audit_logs in batches, off the request path
+"""
+
+import asyncio
+import fcntl
+import json
+import os
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import uuid4
+
+from postgrest.exceptions import APIError
+from postgrest.types import ReturnMethod
+
+from services.database import SupabaseDatabase
+
+SEGMENT_SUFFIX = ".jsonl"
+MAX_RETRY_DELAY = 60.0
+
+
+class AuditSink:
+    def __init__(
+        self,
+        db: SupabaseDatabase,
+        spill_dir: str,
+        batch_size: int = 200,
+        flush_interval: float = 1.0,
+        fsync: bool = False,
+    ):
+        """
+        Initialize sink
+
+        Events are appended to a segment file in spill_dir as they are recorded
+        and the segment is deleted once its rows are in audit_logs, so events
+        survive a crash or a database outage and are replayed on the next start.
+
+        Args:
+            db: Data layer audit rows are inserted through
+            spill_dir: Directory for spill segments; should be on persistent storage
+                and may be shared by the processes of one deployment
+            batch_size: Rows per insert; this many unflushed events trigger a flush
+            flush_interval: Seconds between flushes otherwise
+            fsync: fsync every event (survives power loss, not only a process crash)
+        """
+        self.db = db
+        self.spill_dir = spill_dir
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self._active: Optional[Tuple[str, int]] = None  # (path, fd) of the segment being appended to
+        self._active_count = 0
+        self._sealed: List[Tuple[str, int]] = []  # Segments waiting to be inserted, oldest first
+        self._lock = asyncio.Lock()
+        self._wake = asyncio.Event()
+        self._retrying = False
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """Start flushing, beginning with events spilled by a previous process"""
+        if self._task is not None:
+            return
+
+        os.makedirs(self.spill_dir, exist_ok=True)
+        self._task = asyncio.create_task(self._run())
+        self._wake.set()
+
+    async def stop(self) -> None:
+        """Stop flushing and write out what is buffered; events that can't be written stay spilled"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+        try:
+            await self.flush()
+        except Exception:
+            pass
+
+        self._seal()
+        for _, fd in self._sealed:
+            os.close(fd)  # Releases the lock so the next process adopts the segment
+        self._sealed = []
+
+    def record(self, entry: Dict[str, Any]) -> None:
+        """
+        Buffer an audit_logs row; returns once it is in the spill file
+
+        An id and created_at are assigned here, so a replayed row is inserted
+        once and keeps the time of the event rather than of the flush.
+        """
+        row = {"id": str(uuid4()), "created_at": datetime.now(timezone.utc).isoformat(), **entry}
+        line = json.dumps(row, separators=(",", ":"), default=str) + "\n"
+
+        _, fd = self._active_segment()
+        os.write(fd, line.encode("utf-8"))
+        if self.fsync:
+            os.fsync(fd)
+
+        self._active_count += 1
+        if self._active_count >= self.batch_size and not self._retrying:
+            self._wake.set()
+
+    async def flush(self) -> int:
+        """Insert every spilled event; returns the number of rows written"""
+        async with self._lock:
+            self._seal()
+            self._adopt()
+
+            written = 0
+            while self._sealed:
+                path, fd = self._sealed[0]
+                rows = read_segment(path)
+                for start in range(0, len(rows), self.batch_size):
+                    written += await self._insert(rows[start:start + self.batch_size])
+
+                os.unlink(path)
+                os.close(fd)
+                self._sealed.pop(0)
+
+            return written
+
+    async def _run(self) -> None:
+        delay = self.flush_interval
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+            try:
+                await self.flush()
+                self._retrying = False
+                delay = self.flush_interval
+            except Exception:
+                # Database unreachable; segments stay on disk and are retried with backoff
+                self._retrying = True
+                delay = min(delay * 2, MAX_RETRY_DELAY)
+
+    async def _insert(self, rows: List[Dict[str, Any]]) -> int:
+        """Upsert rows, ignoring ids already written by an interrupted flush"""
+        try:
+            await self._upsert(rows)
+            return len(rows)
+        except APIError as e:
+            # Data and integrity errors (SQLSTATE 22xxx / 23xxx, e.g. the org was
+            # deleted) won't succeed on retry; anything else is retried later
+            if str(e.code or "")[:2] not in ("22", "23"):
+                raise
+            if len(rows) == 1:
+                return 0
+
+        # One bad row fails the whole statement; write the rest one by one
+        written = 0
+        for row in rows:
+            written += await self._insert([row])
+        return written
+
+    async def _upsert(self, rows: List[Dict[str, Any]]) -> None:
+        await self.db.table("audit_logs")\
+            .upsert(rows, on_conflict="id", ignore_duplicates=True, returning=ReturnMethod.minimal)\
+            .execute()
+
+    def _active_segment(self) -> Tuple[str, int]:
+        if self._active is None:
+            os.makedirs(self.spill_dir, exist_ok=True)
+            # Names sort by creation time, so segments are replayed in order
+            path = os.path.join(self.spill_dir, f"{time.time_ns():020d}-{os.getpid()}{SEGMENT_SUFFIX}")
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o600)
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            self._active = (path, fd)
+            self._active_count = 0
+        return self._active
+
+    def _seal(self) -> None:
+        """Stop appending to the active segment and queue it for insertion"""
+        if self._active is None:
+            return
+
+        path, fd = self._active
+        if self._active_count:
+            self._sealed.append((path, fd))
+        else:
+            os.unlink(path)
+            os.close(fd)
+        self._active = None
+        self._active_count = 0
+
+    def _adopt(self) -> None:
+        """Take over segments left by a process that crashed or couldn't flush before exiting"""
+        owned = {path for path, _ in self._sealed}
+        for name in sorted(os.listdir(self.spill_dir)):
+            path = os.path.join(self.spill_dir, name)
+            if not name.endswith(SEGMENT_SUFFIX) or path in owned:
+                continue
+
+            try:
+                fd = os.open(path, os.O_RDONLY)
+            except FileNotFoundError:
+                continue
+
+            try:
+                # Locked segments belong to a live process
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                os.close(fd)
+                continue
+
+            if os.fstat(fd).st_nlink == 0:
+                # Flushed and deleted by its owner between listdir() and flock()
+                os.close(fd)
+                continue
+
+            self._sealed.append((path, fd))
+
+        self._sealed.sort()
+
+
+def read_segment(path: str) -> List[Dict[str, Any]]:
+    """Rows in a spill segment; a line cut short by a crash is skipped"""
+    rows = []
+    with open(path, "rb") as f:
+        for line in f:
+            try:
+                rows.append(json.loads(line))
+            except ValueError:
+                continue
+    return rows
@@ -0,0 +1,449 @@
+"""
+Bulk Verification Worker
+Picks up pending bulk-upload jobs, streams their CSV from storage and runs
+verifications through a bounded-concurrency pool with resumable checkpoints
+"""
+
+import asyncio
+import csv
+import io
+import tempfile
+import uuid
+import httpx
+from datetime import datetime, timezone, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from services.credits import CreditEngine, CreditReservation, InsufficientCreditsError
+from services.database import SupabaseDatabase
+from services.vendor_identity import vendor_identifiers
+
+BULK_UPLOADS_BUCKET = "bulk-uploads"
+
+# CSV column aliases (case-insensitive) -> canonical field
+COLUMN_ALIASES = {
+    "vendorname": "vendor_name",
+    "vendor_name": "vendor_name",
+    "name": "vendor_name",
+    "gstin": "gstin",
+    "gst": "gstin",
+    "pan": "pan",
+    "bankaccount": "account_number",
+    "bank_account": "account_number",
+    "account_number": "account_number",
+    "ifsc": "ifsc",
+    "cin": "cin",
+    "din": "din",
+    "tan": "tan",
+    "udyam": "udyam",
+}
+
+
+def normalize_row(row: Dict[str, Any]) -> Dict[str, str]:
+    """Map CSV headers onto canonical field names and trim values"""
+    normalized = {}
+    for header, value in row.items():
+        if header is None or value is None:
+            continue
+        field = COLUMN_ALIASES.get(header.strip().lower())
+        if field and str(value).strip():
+            normalized[field] = str(value).strip()
+    return normalized
+
+
+def row_checks(row: Dict[str, str]) -> List[Tuple[str, Dict[str, Any]]]:
+    """Verifications implied by a normalized row, as (type, Plan API payload) pairs"""
+    checks = []
+    if row.get("gstin"):
+        checks.append(("GST", {"gstin": row["gstin"]}))
+    if row.get("pan"):
+        checks.append(("PAN", {"pan": row["pan"]}))
+    if row.get("account_number") and row.get("ifsc"):
+        checks.append(("BANK", {"account_number": row["account_number"], "ifsc": row["ifsc"]}))
+    if row.get("cin"):
+        checks.append(("CIN", {"cin": row["cin"]}))
+    if row.get("din"):
+        checks.append(("DIN", {"din": row["din"]}))
+    return checks
+
+
+def storage_path_from_url(file_url: str) -> Optional[str]:
+    """Recover the object path from a bulk-uploads public URL"""
+    marker = f"/{BULK_UPLOADS_BUCKET}/"
+    if not file_url or marker not in file_url:
+        return None
+    return file_url.split(marker, 1)[1].split("?", 1)[0]
+
+
+def error_message(error: Exception) -> str:
+    return str(getattr(error, "detail", None) or error) or error.__class__.__name__
+
+
+class LeaseLost(Exception):
+    """Raised when another worker has claimed the job (our lease expired)"""
+
+
+class BulkJobWorker:
+    def __init__(
+        self,
+        db: SupabaseDatabase,
+        credit_engine: CreditEngine,
+        verify: Callable[..., Awaitable[Dict[str, Any]]],
+        audit: Callable[..., Awaitable[None]],
+        concurrency: int = 20,
+        chunk_size: int = 100,
+        poll_interval: float = 5.0,
+        lease_timeout: float = 300.0,
+        max_error_details: int = 1000,
+    ):
+        """
+        Initialize worker
+
+        Args:
+            db: Data layer for jobs and storage
+            credit_engine: Used to reserve credits for each chunk of rows
+            verify: Coroutine (org_id, user_id, verification_type, vendor_name, vendor_data,
+                reservation, vendor_id=None, identifiers=None, job_id=None, row_number=None)
+                -> {"vendor_id", ...}; consumes one credit from the reservation on success
+                and records job_id/row_number on the verification
+            audit: Coroutine with write_audit_log's signature
+            concurrency: Rows verified at once per job
+            chunk_size: Rows per checkpoint (progress and resume granularity)
+            poll_interval: Seconds between checks for new jobs
+            lease_timeout: A processing job with no heartbeat for this long is
+                assumed orphaned by a crashed worker and resumed; the worker
+                holding a job heartbeats every third of this
+            max_error_details: Cap on per-row errors stored in jobs.error_details
+        """
+        self.db = db
+        self.credit_engine = credit_engine
+        self.verify = verify
+        self.audit = audit
+        self.concurrency = concurrency
+        self.chunk_size = max(chunk_size, concurrency)
+        self.poll_interval = poll_interval
+        self.lease_timeout = lease_timeout
+        self.max_error_details = max_error_details
+
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._http: Optional[httpx.AsyncClient] = None
+
+    async def start(self) -> None:
+        """Start polling for jobs (called from the app lifespan)"""
+        if self._task is not None:
+            return
+
+        self._http = httpx.AsyncClient(headers=self.db.headers, timeout=httpx.Timeout(60.0, connect=5.0))
+        self._task = asyncio.create_task(self._poll_loop())
+
+    async def stop(self) -> None:
+        """Stop the worker; an interrupted job resumes from its last checkpoint"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    def wake(self) -> None:
+        """Check for jobs now instead of waiting for the next poll"""
+        self._wakeup.set()
+
+    async def _poll_loop(self) -> None:
+        while True:
+            try:
+                job = await self._claim_next_job()
+                if job is not None:
+                    await self._process_job(job)
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # Transient database/storage failure; retry on the next poll
+                pass
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def _claim_next_job(self) -> Optional[Dict[str, Any]]:
+        """Atomically move one pending (or orphaned) job to processing"""
+        pending = await self.db.table("jobs")\
+            .select("*")\
+            .eq("type", "BULK_VERIFY")\
+            .eq("status", "pending")\
+            .order("created_at")\
+            .limit(1)\
+            .execute()
+
+        candidates = pending.data or []
+        if not candidates:
+            cutoff = datetime.now(timezone.utc) - timedelta(seconds=self.lease_timeout)
+            orphaned = await self.db.table("jobs")\
+                .select("*")\
+                .eq("type", "BULK_VERIFY")\
+                .eq("status", "processing")\
+                .lt("updated_at", cutoff.isoformat())\
+                .order("updated_at")\
+                .limit(1)\
+                .execute()
+            candidates = orphaned.data or []
+
+        for job in candidates:
+            # Matching on status and updated_at makes the claim a compare-and-set.
+            # A fresh lease token fences off the previous holder's writes.
+            claimed = await self.db.table("jobs")\
+                .update({"status": "processing", "lease_token": str(uuid.uuid4())})\
+                .eq("id", job["id"])\
+                .eq("status", job["status"])\
+                .eq("updated_at", job["updated_at"])\
+                .execute()
+            if claimed.data:
+                return claimed.data[0]
+
+        return None
+
+    async def _process_job(self, job: Dict[str, Any]) -> None:
+        """Run a claimed job while a heartbeat keeps its lease; stops if the lease is lost"""
+        lost = asyncio.Event()
+        work = asyncio.create_task(self._run_job(job))
+        heartbeat = asyncio.create_task(self._heartbeat(job, work, lost))
+        try:
+            await work
+        except LeaseLost:
+            pass
+        except asyncio.CancelledError:
+            if not lost.is_set():
+                raise
+        finally:
+            heartbeat.cancel()
+            await asyncio.gather(heartbeat, return_exceptions=True)
+
+    async def _heartbeat(self, job: Dict[str, Any], work: asyncio.Task, lost: asyncio.Event) -> None:
+        """Refresh the job's updated_at (its lease) independently of chunk progress"""
+        while True:
+            await asyncio.sleep(self.lease_timeout / 3)
+            try:
+                await self._update_job(job, {"lease_token": job["lease_token"]})
+            except LeaseLost:
+                # Another worker resumed the job; stop before duplicating its rows
+                lost.set()
+                work.cancel()
+                return
+            except Exception:
+                # Transient failure; the next beat retries well within the lease
+                pass
+
+    async def _run_job(self, job: Dict[str, Any]) -> None:
+        progress = {
+            "processed_count": job.get("processed_count") or 0,
+            "success_count": job.get("success_count") or 0,
+            "error_count": job.get("error_count") or 0,
+            "error_details": list(job.get("error_details") or []),
+        }
+
+        try:
+            csv_file = await self._download(job)
+        except Exception as e:
+            await self._update_job(job, {"status": "failed", "error_details": [{"error": f"Could not read CSV: {error_message(e)}"}]})
+            return
+
+        # Refund credits a previous holder reserved but never used or refunded (it crashed)
+        await self.credit_engine.refund_job(job["id"])
+
+        # A job that reserved credits before may have verified rows past its
+        # last checkpoint; those rows' checks are skipped rather than charged again
+        resuming = bool(job.get("credits_reserved"))
+
+        with csv_file:
+            reader = csv.DictReader(io.TextIOWrapper(csv_file, encoding="utf-8-sig", newline=""))
+            chunk: List[Tuple[int, Dict[str, str]]] = []
+
+            for row_number, row in enumerate(reader, start=1):
+                if row_number <= progress["processed_count"]:
+                    continue  # Done before a restart
+
+                chunk.append((row_number, normalize_row(row)))
+                if len(chunk) >= self.chunk_size:
+                    resuming = await self._run_chunk(job, chunk, progress, resuming)
+                    chunk = []
+
+            if chunk:
+                await self._run_chunk(job, chunk, progress, resuming)
+
+        await self._update_job(job, {"status": "completed", "total_count": progress["processed_count"]})
+
+    async def _download(self, job: Dict[str, Any]):
+        """Stream the job's CSV into a spooled temp file (memory stays bounded)"""
+        path = job.get("file_path") or storage_path_from_url(job.get("file_url"))
+        if not path:
+            raise ValueError("Job has no file path")
+
+        spool = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+        url = f"{self.db.url}/storage/v1/object/{BULK_UPLOADS_BUCKET}/{path}"
+        try:
+            async with self._http.stream("GET", url) as response:
+                response.raise_for_status()
+                async for chunk in response.aiter_bytes():
+                    spool.write(chunk)
+        except Exception:
+            spool.close()
+            raise
+
+        spool.seek(0)
+        return spool
+
+    async def _run_chunk(
+        self,
+        job: Dict[str, Any],
+        chunk: List[Tuple[int, Dict[str, str]]],
+        progress: Dict[str, Any],
+        resuming: bool = False,
+    ) -> bool:
+        """Verify and checkpoint a chunk; returns whether the next chunk may hold verified rows too"""
+        done = await self._verified_checks(job, chunk[0][0], chunk[-1][0]) if resuming else {}
+        checks = [row_checks(row) for _, row in chunk]
+        total_checks = sum(
+            len([t for t, _ in row_checks_ if t not in done.get(row_number, {})])
+            for (row_number, _), row_checks_ in zip(chunk, checks)
+        )
+
+        # One reservation for the whole chunk; fall back to per-row when the
+        # balance can't cover it so the remaining credits are still used
+        reservation = None
+        if total_checks:
+            try:
+                reservation = await self.credit_engine.reserve(
+                    job["org_id"], total_checks, user_id=job["user_id"], reason=f"BULK_VERIFY {job['id']}",
+                    job_id=job["id"]
+                )
+            except InsufficientCreditsError:
+                reservation = None
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def run(row_number, row, row_checks_):
+            async with semaphore:
+                return await self._process_row(job, row_number, row, row_checks_, done.get(row_number, {}), reservation)
+
+        try:
+            results = await asyncio.gather(*[
+                run(row_number, row, row_checks_) for (row_number, row), row_checks_ in zip(chunk, checks)
+            ])
+        finally:
+            if reservation is not None:
+                await reservation.release()
+
+        for row_number, vendor_name, error in results:
+            progress["processed_count"] = max(progress["processed_count"], row_number)
+            if error is None:
+                progress["success_count"] += 1
+            else:
+                progress["error_count"] += 1
+                if len(progress["error_details"]) < self.max_error_details:
+                    progress["error_details"].append({"row": row_number, "vendor": vendor_name, "error": error})
+
+        # Checkpoint (fails with LeaseLost if another worker has taken the job over)
+        await self._update_job(job, dict(progress))
+        return bool(done)
+
+    async def _verified_checks(self, job: Dict[str, Any], first_row: int, last_row: int) -> Dict[int, Dict[str, str]]:
+        """Checks of rows in a range that a previous run verified and charged: row -> {type: vendor_id}"""
+        result = await self.db.table("verifications")\
+            .select("row_number, type, vendor_id, reports(id)")\
+            .eq("job_id", job["id"])\
+            .gte("row_number", first_row)\
+            .lte("row_number", last_row)\
+            .execute()
+
+        done: Dict[int, Dict[str, str]] = {}
+        for verification in result.data or []:
+            # Without a report the check failed half-way and was never charged
+            if verification.get("reports"):
+                done.setdefault(verification["row_number"], {})[verification["type"]] = verification["vendor_id"]
+        return done
+
+    async def _process_row(
+        self,
+        job: Dict[str, Any],
+        row_number: int,
+        row: Dict[str, str],
+        checks: List[Tuple[str, Dict[str, Any]]],
+        done: Dict[str, str],
+        reservation: Optional[CreditReservation],
+    ) -> Tuple[int, str, Optional[str]]:
+        vendor_name = row.get("vendor_name") or ""
+        if not vendor_name:
+            return row_number, vendor_name, "Missing vendor name"
+        if not checks:
+            return row_number, vendor_name, "No verifiable identifiers (gstin, pan, bankAccount+ifsc, cin, din)"
+
+        # Checks verified before a crash keep their result and attach new ones to the same vendor
+        pending = [(t, data) for t, data in checks if t not in done]
+        if not pending:
+            return row_number, vendor_name, None
+        vendor_id = next(iter(done.values()), None)
+
+        if reservation is None:
+            try:
+                reservation = await self.credit_engine.reserve(
+                    job["org_id"], len(pending), user_id=job["user_id"], reason=f"BULK_VERIFY {job['id']}",
+                    job_id=job["id"]
+                )
+            except InsufficientCreditsError:
+                return row_number, vendor_name, "Insufficient credits"
+            async with reservation:
+                return await self._verify_row(job, row_number, vendor_name, vendor_identifiers(row), pending, reservation, vendor_id)
+
+        return await self._verify_row(job, row_number, vendor_name, vendor_identifiers(row), pending, reservation, vendor_id)
+
+    async def _verify_row(
+        self,
+        job: Dict[str, Any],
+        row_number: int,
+        vendor_name: str,
+        identifiers: Dict[str, str],
+        checks: List[Tuple[str, Dict[str, Any]]],
+        reservation: CreditReservation,
+        vendor_id: Optional[str] = None,
+    ) -> Tuple[int, str, Optional[str]]:
+        failures = []
+
+        # Sequential within a row: the first check resolves the vendor the others attach to.
+        # It is matched on any of the row's registration numbers, so re-uploaded rows reuse their vendor.
+        for verification_type, vendor_data in checks:
+            try:
+                result = await self.verify(
+                    job["org_id"], job["user_id"], verification_type, vendor_name, vendor_data,
+                    reservation, vendor_id=vendor_id, identifiers=identifiers,
+                    job_id=job["id"], row_number=row_number
+                )
+                vendor_id = result["vendor_id"]
+            except Exception as e:
+                failures.append(f"{verification_type}: {error_message(e)}")
+
+        if vendor_id is not None:
+            await self.audit(
+                org_id=job["org_id"],
+                actor_id=job["user_id"],
+                action="VERIFY_VENDOR",
+                target_type="VENDOR",
+                target_id=vendor_id,
+                details={"job_id": job["id"], "row": row_number, "vendor_name": vendor_name,
+                         "types": [t for t, _ in checks]}
+            )
+
+        return row_number, vendor_name, "; ".join(failures) or None
+
+    async def _update_job(self, job: Dict[str, Any], values: Dict[str, Any]) -> None:
+        """Update a job we hold the lease on (the update trigger also refreshes updated_at)"""
+        result = await self.db.table("jobs")\
+            .update(values)\
+            .eq("id", job["id"])\
+            .eq("lease_token", job["lease_token"])\
+            .execute()
+        if not result.data:
+            raise LeaseLost(job["id"])
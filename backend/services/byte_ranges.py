@@ -0,0 +1,49 @@
+"""
+HTTP Byte Ranges
+Parses single-range Range headers and streams byte slices in bounded chunks
+"""
+
+from typing import AsyncIterator, Optional, Tuple
+
+
+class RangeNotSatisfiable(Exception):
+    """Raised when a Range header lies entirely outside the resource"""
+
+
+def parse_byte_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Resolve a Range header against a resource size
+
+    Returns (start, end) with an inclusive end, or None to send the whole
+    resource (no header, or a form we don't serve such as multiple ranges)
+    """
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+
+    start_text, _, end_text = header[len("bytes="):].strip().partition("-")
+    try:
+        if start_text:
+            start = int(start_text)
+            end = int(end_text) if end_text else size - 1
+        else:
+            # Suffix range: the last N bytes
+            length = int(end_text)
+            if length <= 0:
+                raise RangeNotSatisfiable(header)
+            start, end = max(size - length, 0), size - 1
+    except ValueError:
+        return None
+
+    if start > end:
+        return None  # Syntactically invalid, so the header is ignored
+    if start >= size:
+        raise RangeNotSatisfiable(header)
+
+    return start, min(end, size - 1)
+
+
+async def iter_byte_slices(data: bytes, start: int, end: int, chunk_size: int = 64 * 1024) -> AsyncIterator[bytes]:
+    """Yield data[start:end + 1] in chunks without copying the whole slice"""
+    view = memoryview(data)
+    for offset in range(start, end + 1, chunk_size):
+        yield bytes(view[offset:min(offset + chunk_size, end + 1)])
@@ -0,0 +1,130 @@
+"""
+Credit Reservation Engine
+Reserves credits atomically (one RPC) before paid work and refunds whatever goes unused
+"""
+
+from typing import Optional
+
+from services.database import SupabaseDatabase
+
+
+class InsufficientCreditsError(Exception):
+    """Raised when an org cannot cover a reservation"""
+
+
+class CreditReservation:
+    def __init__(
+        self,
+        engine: "CreditEngine",
+        org_id: str,
+        amount: int,
+        user_id: Optional[str],
+        reason: str,
+        job_id: Optional[str] = None,
+    ):
+        self.engine = engine
+        self.org_id = org_id
+        self.amount = amount
+        self.user_id = user_id
+        self.reason = reason
+        self.job_id = job_id
+        self.consumed = 0
+        self.released = False
+
+    @property
+    def remaining(self) -> int:
+        return self.amount - self.consumed
+
+    def consume(self, amount: int = 1) -> None:
+        """Mark reserved credits as spent (they will not be refunded)"""
+        if amount > self.remaining:
+            raise ValueError(f"Cannot consume {amount} credits, only {self.remaining} reserved")
+        self.consumed += amount
+
+    async def release(self) -> None:
+        """Refund every reserved credit that was not consumed"""
+        if self.released:
+            return
+        self.released = True
+
+        if self.remaining <= 0:
+            return
+        if self.job_id is not None:
+            await self.engine.refund_job(self.job_id, self.remaining, f"{self.reason} (refund)")
+        else:
+            await self.engine.refund(self.org_id, self.remaining, self.user_id, f"{self.reason} (refund)")
+
+    async def __aenter__(self) -> "CreditReservation":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.release()
+
+
+class CreditEngine:
+    def __init__(self, db: SupabaseDatabase):
+        self.db = db
+
+    async def reserve(
+        self,
+        org_id: str,
+        amount: int = 1,
+        user_id: Optional[str] = None,
+        reason: str = "",
+        job_id: Optional[str] = None,
+    ) -> CreditReservation:
+        """
+        Atomically deduct credits up front
+
+        Use the returned reservation as an async context manager: credits that
+        were not consume()d are refunded on exit, including when the block raises.
+        With a job_id the reservation is recorded on the bulk job, so credits a
+        crashed worker never refunded can be recovered with refund_job().
+
+        Raises:
+            InsufficientCreditsError: if the balance cannot cover amount
+        """
+        if job_id is not None:
+            result = await self.db.rpc("reserve_job_credits", {
+                "p_job_id": job_id,
+                "p_amount": amount,
+                "p_reason": reason,
+            }).execute()
+        else:
+            result = await self.db.rpc("deduct_credits", {
+                "p_org_id": org_id,
+                "p_amount": amount,
+                "p_user_id": user_id,
+                "p_reason": reason,
+            }).execute()
+
+        if not result.data:
+            raise InsufficientCreditsError(f"Insufficient credits to reserve {amount}")
+
+        return CreditReservation(self, org_id, amount, user_id, reason, job_id=job_id)
+
+    async def refund(self, org_id: str, amount: int, user_id: Optional[str] = None, reason: str = "") -> int:
+        """Return credits to an org; returns the new balance"""
+        result = await self.db.rpc("refund_credits", {
+            "p_org_id": org_id,
+            "p_amount": amount,
+            "p_user_id": user_id,
+            "p_reason": reason,
+        }).execute()
+
+        return result.data
+
+    async def refund_job(self, job_id: str, amount: Optional[int] = None, reason: Optional[str] = None) -> int:
+        """
+        Return a bulk job's reserved but unused credits (at most amount; all when None)
+
+        Used means a verification of the job that got a report, so this never
+        refunds a credit twice or one that was spent. Returns the amount refunded.
+        """
+        result = await self.db.rpc("refund_job_credits", {
+            "p_job_id": job_id,
+            "p_amount": amount,
+            "p_reason": reason,
+        }).execute()
+
+        return result.data or 0
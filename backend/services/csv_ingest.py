@@ -0,0 +1,130 @@
+"""
+Streaming CSV Ingestion
+Incrementally decodes, validates and counts bulk-upload CSVs chunk by chunk
+"""
+
+import codecs
+import csv
+from typing import Any, Dict, List, Optional
+
+from services.bulk_worker import COLUMN_ALIASES, normalize_row, row_checks
+
+
+class CsvValidationError(Exception):
+    """Raised when the file is not a usable bulk-upload CSV"""
+
+
+class CsvStreamValidator:
+    def __init__(self, max_row_errors: int = 20):
+        """
+        Initialize validator
+
+        Args:
+            max_row_errors: Number of per-row problems kept for the response
+        """
+        self.max_row_errors = max_row_errors
+        self.header: Optional[List[str]] = None
+        self.row_count = 0
+        self.invalid_row_count = 0
+        self.row_errors: List[Dict[str, Any]] = []
+        self.bytes_read = 0
+
+        self._decoder = codecs.getincrementaldecoder("utf-8-sig")()
+        self._pending = ""  # Text after the last complete line
+        self._record = ""  # Lines of a record whose quoted field spans newlines
+        self._in_quotes = False
+
+    def feed(self, chunk: bytes) -> None:
+        """Consume the next chunk of raw bytes"""
+        self.bytes_read += len(chunk)
+        try:
+            text = self._decoder.decode(chunk)
+        except UnicodeDecodeError:
+            raise CsvValidationError("File must be UTF-8 encoded")
+
+        self._pending += text
+        *lines, self._pending = self._pending.split("\n")
+        for line in lines:
+            self._feed_line(line + "\n")
+
+    def close(self) -> None:
+        """Flush the final (unterminated) line and check the file was not empty"""
+        try:
+            self._pending += self._decoder.decode(b"", final=True)
+        except UnicodeDecodeError:
+            raise CsvValidationError("File must be UTF-8 encoded")
+
+        if self._pending:
+            self._feed_line(self._pending)
+            self._pending = ""
+        if self._record:
+            raise CsvValidationError("Unterminated quoted field at end of file")
+        if self.header is None:
+            raise CsvValidationError("CSV file is empty")
+
+    def _feed_line(self, line: str) -> None:
+        # A record is complete once a line ends outside a quoted field
+        self._record += line
+        if '"' in line:
+            self._in_quotes = ends_in_quotes(line, self._in_quotes)
+        if self._in_quotes:
+            return
+
+        record, self._record = self._record, ""
+        if not record.strip():
+            return
+
+        fields = next(csv.reader([record]))
+        if self.header is None:
+            self._set_header(fields)
+        else:
+            self._check_row(fields)
+
+    def _set_header(self, fields: List[str]) -> None:
+        canonical = {COLUMN_ALIASES.get(f.strip().lower()) for f in fields}
+        if "vendor_name" not in canonical:
+            raise CsvValidationError("CSV must include a vendorName column")
+        if not canonical & {"gstin", "pan", "account_number", "cin", "din"}:
+            raise CsvValidationError("CSV must include at least one of: gstin, pan, bankAccount, cin, din")
+        self.header = fields
+
+    def _check_row(self, fields: List[str]) -> None:
+        self.row_count += 1
+
+        error = None
+        if len(fields) > len(self.header):
+            error = f"Expected {len(self.header)} columns, found {len(fields)}"
+        else:
+            row = normalize_row(dict(zip(self.header, fields)))
+            if not row.get("vendor_name"):
+                error = "Missing vendor name"
+            elif not row_checks(row):
+                error = "No verifiable identifiers"
+
+        if error:
+            self.invalid_row_count += 1
+            if len(self.row_errors) < self.max_row_errors:
+                self.row_errors.append({"row": self.row_count, "error": error})
+
+
+def ends_in_quotes(line: str, in_quotes: bool) -> bool:
+    """
+    Whether a line ends inside a quoted field, given whether it started in one
+
+    Follows the csv module: a quote opens a quoted field only as the field's
+    first character (elsewhere it is literal, e.g. `Acme 5" pipes`), and ""
+    inside a quoted field is an escaped quote.
+    """
+    start = 0
+    while True:
+        index = line.find('"', start)
+        if index < 0:
+            return in_quotes
+        if in_quotes:
+            if line.startswith('"', index + 1):
+                index += 1  # Escaped quote
+            else:
+                in_quotes = False
+        elif index == 0 or line[index - 1] == ",":
+            in_quotes = True
+        start = index + 1
@@ -0,0 +1,151 @@
+"""
+Async Supabase Data Layer
+Non-blocking PostgREST, Storage and Auth clients backed by pooled HTTP connections
+"""
+
+import httpx
+from postgrest import AsyncPostgrestClient
+from storage3 import AsyncStorageClient
+from gotrue import AsyncGoTrueClient
+from typing import Any, AsyncIterator, Dict, Optional
+
+
+class _PooledPostgrestClient(AsyncPostgrestClient):
+    """AsyncPostgrestClient whose session uses explicit connection pool limits"""
+
+    def __init__(self, base_url: str, *, limits: httpx.Limits, **kwargs):
+        self._limits = limits
+        super().__init__(base_url, **kwargs)
+
+    def create_session(self, base_url, headers, timeout, verify: bool = True) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            base_url=base_url,
+            headers=headers,
+            timeout=timeout,
+            verify=verify,
+            limits=self._limits,
+            follow_redirects=True,
+        )
+
+
+class SupabaseDatabase:
+    def __init__(
+        self,
+        url: str,
+        service_role_key: str,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        timeout: float = 30.0,
+    ):
+        """
+        Initialize the data layer (clients are created on connect())
+
+        Args:
+            url: Supabase project URL
+            service_role_key: Service role key used for all server-side queries
+            max_connections: Upper bound on concurrent PostgREST connections
+            max_keepalive_connections: Idle connections kept open for reuse
+            timeout: Per-request timeout in seconds
+        """
+        self.url = url
+        self.headers = {
+            "apiKey": service_role_key,
+            "Authorization": f"Bearer {service_role_key}",
+        }
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+        )
+        self.timeout = timeout
+
+        self._postgrest: Optional[AsyncPostgrestClient] = None
+        self._storage: Optional[AsyncStorageClient] = None
+        self._auth: Optional[AsyncGoTrueClient] = None
+        self._http: Optional[httpx.AsyncClient] = None
+
+    async def connect(self) -> None:
+        """Create the async clients (called once from the app lifespan)"""
+        if self._postgrest is not None:
+            return
+
+        self._postgrest = _PooledPostgrestClient(
+            f"{self.url}/rest/v1",
+            limits=self.limits,
+            headers=self.headers,
+            timeout=self.timeout,
+        )
+        self._storage = AsyncStorageClient(f"{self.url}/storage/v1", self.headers)
+        # Sessions are never persisted server-side, so signing a user in cannot
+        # swap the service-role credentials used by the PostgREST client
+        self._auth = AsyncGoTrueClient(
+            url=f"{self.url}/auth/v1",
+            headers=self.headers,
+            auto_refresh_token=False,
+            persist_session=False,
+        )
+        # Raw transport for streaming storage transfers the storage client can't do
+        self._http = httpx.AsyncClient(headers=self.headers, timeout=self.timeout, limits=self.limits)
+
+    async def close(self) -> None:
+        """Close all pooled connections"""
+        if self._postgrest is not None:
+            await self._postgrest.aclose()
+        if self._storage is not None:
+            await self._storage.aclose()
+        if self._auth is not None:
+            await self._auth.close()
+        if self._http is not None:
+            await self._http.aclose()
+
+        self._postgrest = None
+        self._storage = None
+        self._auth = None
+        self._http = None
+
+    def _require(self, client):
+        if client is None:
+            raise RuntimeError("Database is not connected; call connect() first")
+        return client
+
+    def table(self, name: str):
+        """Start an async query on a table (await .execute() on the builder)"""
+        return self._require(self._postgrest).from_(name)
+
+    def rpc(self, function: str, params: Optional[Dict[str, Any]] = None):
+        """Call a Postgres function (await .execute() on the builder)"""
+        return self._require(self._postgrest).rpc(function, params or {})
+
+    @property
+    def storage(self) -> AsyncStorageClient:
+        return self._require(self._storage)
+
+    @property
+    def auth(self) -> AsyncGoTrueClient:
+        return self._require(self._auth)
+
+    async def upload_stream(
+        self,
+        bucket: str,
+        path: str,
+        chunks: AsyncIterator[bytes],
+        content_type: str,
+        upsert: bool = False,
+    ) -> None:
+        """Upload an object from an async byte stream (chunked transfer, no full buffering)"""
+        response = await self._require(self._http).post(
+            f"{self.url}/storage/v1/object/{bucket}/{path}",
+            content=chunks,
+            headers={"content-type": content_type, "x-upsert": "true" if upsert else "false"},
+        )
+        response.raise_for_status()
+
+    async def open_object(self, bucket: str, path: str, headers: Optional[Dict[str, str]] = None) -> httpx.Response:
+        """
+        Start downloading an object without reading its body
+
+        The caller iterates response.aiter_bytes() and must aclose() the
+        response. Request headers such as Range are passed through.
+        """
+        client = self._require(self._http)
+        request = client.build_request("GET", f"{self.url}/storage/v1/object/{bucket}/{path}", headers=headers)
+        return await client.send(request, stream=True)
@@ -0,0 +1,94 @@
+"""
+Shared Upstream HTTP Clients
+Long-lived, pooled httpx clients for the Plan API and Perplexity
+"""
+
+import importlib.util
+import httpx
+from typing import Optional
+
+# HTTP/2 needs the optional `h2` package (installed via httpx[http2])
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+PERPLEXITY_BASE_URL = "https://api.perplexity.ai"
+
+
+class UpstreamClients:
+    def __init__(
+        self,
+        plan_api_base_url: str,
+        plan_api_timeout: float = 30.0,
+        plan_api_max_connections: int = 50,
+        perplexity_timeout: float = 30.0,
+        perplexity_max_connections: int = 20,
+        connect_timeout: float = 5.0,
+        keepalive_expiry: float = 30.0,
+    ):
+        """
+        Initialize client settings (connections are opened on start())
+
+        Args:
+            plan_api_base_url: Base URL of the Plan API
+            plan_api_timeout: Read/write timeout for Plan API calls in seconds
+            plan_api_max_connections: Connection pool size for the Plan API
+            perplexity_timeout: Read/write timeout for Perplexity calls in seconds
+            perplexity_max_connections: Connection pool size for Perplexity
+            connect_timeout: TCP/TLS connect timeout shared by both upstreams
+            keepalive_expiry: Seconds an idle connection is kept for reuse
+        """
+        self.plan_api_base_url = plan_api_base_url or ""
+        self.plan_api_timeout = httpx.Timeout(plan_api_timeout, connect=connect_timeout)
+        self.plan_api_limits = httpx.Limits(
+            max_connections=plan_api_max_connections,
+            max_keepalive_connections=plan_api_max_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.perplexity_timeout = httpx.Timeout(perplexity_timeout, connect=connect_timeout)
+        self.perplexity_limits = httpx.Limits(
+            max_connections=perplexity_max_connections,
+            max_keepalive_connections=perplexity_max_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+
+        self._plan_api: Optional[httpx.AsyncClient] = None
+        self._perplexity: Optional[httpx.AsyncClient] = None
+
+    async def start(self) -> None:
+        """Open both connection pools (called once from the app lifespan)"""
+        if self._plan_api is not None:
+            return
+
+        self._plan_api = httpx.AsyncClient(
+            base_url=self.plan_api_base_url,
+            timeout=self.plan_api_timeout,
+            limits=self.plan_api_limits,
+            http2=HTTP2_AVAILABLE,
+        )
+        self._perplexity = httpx.AsyncClient(
+            base_url=PERPLEXITY_BASE_URL,
+            timeout=self.perplexity_timeout,
+            limits=self.perplexity_limits,
+            http2=HTTP2_AVAILABLE,
+        )
+
+    async def close(self) -> None:
+        """Close both connection pools"""
+        if self._plan_api is not None:
+            await self._plan_api.aclose()
+        if self._perplexity is not None:
+            await self._perplexity.aclose()
+
+        self._plan_api = None
+        self._perplexity = None
+
+    @property
+    def plan_api(self) -> httpx.AsyncClient:
+        if self._plan_api is None:
+            raise RuntimeError("Upstream clients are not started; call start() first")
+        return self._plan_api
+
+    @property
+    def perplexity(self) -> httpx.AsyncClient:
+        if self._perplexity is None:
+            raise RuntimeError("Upstream clients are not started; call start() first")
+        return self._perplexity
@@ -0,0 +1,48 @@
+"""
+Keyset Pagination
+Opaque (created_at, id) cursors for newest-first listings that cost the same on every page
+"""
+
+import base64
+import json
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+
+class InvalidCursor(ValueError):
+    """Raised when a cursor was not produced by encode_cursor (or was tampered with)"""
+
+
+def encode_cursor(row: Dict[str, Any]) -> str:
+    """Cursor pointing just past a row (the last row of the current page)"""
+    payload = json.dumps([row["created_at"], row["id"]], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(payload).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """(created_at, id) of the row a cursor points past"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        # Both values end up in a filter expression, so only well-formed ones pass
+        datetime.fromisoformat(created_at)
+        uuid.UUID(row_id)
+    except (ValueError, TypeError, AttributeError, UnicodeError):
+        raise InvalidCursor("Malformed cursor")
+
+    return created_at, row_id
+
+
+def after_filter(cursor: Optional[str]) -> Optional[str]:
+    """
+    PostgREST or= expression selecting rows after a cursor in
+    (created_at DESC, id DESC) order, or None for the first page
+
+    Values are double-quoted so timestamp punctuation can't break the expression.
+    """
+    if not cursor:
+        return None
+
+    created_at, row_id = decode_cursor(cursor)
+    return f'created_at.lt."{created_at}",and(created_at.eq."{created_at}",id.lt."{row_id}")'
@@ -0,0 +1,157 @@
+"""
+Branding Logo Cache
+Fetches white-label logos once, downscales them to their printed size and keeps them in memory and on disk
+"""
+
+import hashlib
+import io
+import json
+import os
+import tempfile
+from typing import Any, Dict, Optional
+
+import httpx
+from PIL import Image
+
+from services.cache import TTLCache
+
+
+class LogoCache:
+    def __init__(
+        self,
+        cache_dir: str,
+        box_width: float,
+        box_height: float,
+        dpi: int = 150,
+        maxsize: int = 256,
+        ttl: float = 3600.0,
+        negative_ttl: float = 300.0,
+        timeout: float = 5.0,
+    ):
+        """
+        Initialize cache
+
+        Args:
+            cache_dir: Directory for scaled logos, shared by all render processes
+            box_width: Width of the box the logo is drawn into, in points
+            box_height: Height of that box, in points
+            dpi: Print resolution logos are scaled to
+            maxsize: Logos kept in memory
+            ttl: Seconds before a logo is revalidated against its URL (If-None-Match)
+            negative_ttl: Seconds before retrying a logo that could not be fetched or decoded
+            timeout: Fetch timeout in seconds
+        """
+        self.cache_dir = cache_dir
+        self.box_width = box_width
+        self.box_height = box_height
+        self.dpi = dpi
+        self.negative_ttl = negative_ttl
+        self.timeout = timeout
+        self._memory = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def get(self, url: Optional[str]) -> Optional[bytes]:
+        """Scaled JPEG for a logo URL, or None if there is no usable logo"""
+        if not url:
+            return None
+
+        cached = self._memory.get(url)
+        if cached is not None:
+            return cached or None
+
+        logo = self._load(url)
+        # Failures are cached as b"" for a shorter time so a broken logo isn't refetched per render
+        self._memory.set(url, logo or b"", None if logo else self.negative_ttl)
+        return logo
+
+    def _load(self, url: str) -> Optional[bytes]:
+        meta = self._read_meta(url)
+        stored = self._read_file(meta)
+
+        headers = {"If-None-Match": meta["etag"]} if stored is not None else {}
+        try:
+            response = httpx.get(url, headers=headers, timeout=self.timeout, follow_redirects=True)
+        except httpx.HTTPError:
+            return stored  # A stale logo beats none while storage is unreachable
+
+        if response.status_code == 304:
+            return stored
+        if response.status_code != 200:
+            return None
+
+        scaled = self.scale(response.content)
+        if scaled is not None:
+            etag = response.headers.get("etag") or hashlib.sha256(response.content).hexdigest()
+            self._write(url, etag, scaled, meta)
+        return scaled
+
+    def scale(self, data: bytes) -> Optional[bytes]:
+        """
+        Downscale to the pixel size the logo is printed at (never upscales)
+
+        The result is flattened onto white and stored as JPEG: the cover page is
+        white, and ReportLab embeds JPEG data as-is instead of re-encoding the
+        pixels into every document as it does for PNG.
+        """
+        try:
+            with Image.open(io.BytesIO(data)) as image:
+                image.load()
+
+                ratio = min(self.box_width / image.width, self.box_height / image.height)
+                size = (
+                    max(1, round(image.width * ratio * self.dpi / 72)),
+                    max(1, round(image.height * ratio * self.dpi / 72)),
+                )
+                image = image.convert("RGBA")
+                if size[0] < image.width:
+                    image = image.resize(size, Image.LANCZOS)
+
+                flattened = Image.new("RGB", image.size, (255, 255, 255))
+                flattened.paste(image, mask=image.getchannel("A"))
+
+                output = io.BytesIO()
+                flattened.save(output, format="JPEG", quality=90, optimize=True)
+                return output.getvalue()
+        except (OSError, ValueError, Image.DecompressionBombError):
+            return None  # Unsupported (e.g. SVG) or corrupt image
+
+    def _key(self, url: str) -> str:
+        return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+    def _read_meta(self, url: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(os.path.join(self.cache_dir, f"{self._key(url)}.json")) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _read_file(self, meta: Optional[Dict[str, Any]]) -> Optional[bytes]:
+        if not meta:
+            return None
+        try:
+            with open(os.path.join(self.cache_dir, meta["file"]), "rb") as f:
+                return f.read()
+        except (OSError, KeyError):
+            return None
+
+    def _write(self, url: str, etag: str, scaled: bytes, previous: Optional[Dict[str, Any]]) -> None:
+        key = self._key(url)
+        file_name = f"{key}-{hashlib.sha256(etag.encode('utf-8')).hexdigest()[:16]}.jpg"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # Image first, then the metadata pointing at it; both via atomic renames
+            self._atomic_write(file_name, scaled)
+            self._atomic_write(f"{key}.json", json.dumps({"url": url, "etag": etag, "file": file_name}).encode("utf-8"))
+            if previous and previous.get("file") not in (None, file_name):
+                os.unlink(os.path.join(self.cache_dir, previous["file"]))
+        except OSError:
+            pass  # The disk layer is an optimisation; memory still holds the logo
+
+    def _atomic_write(self, name: str, data: bytes) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, os.path.join(self.cache_dir, name))
+        except OSError:
+            os.unlink(tmp_path)
+            raise
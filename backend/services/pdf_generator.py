@@ -9,42 +9,226 @@ from reportlab.lib.units import mm
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak, Image
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 import io
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 
-class PDFReportGenerator:
-    def __init__(self, branding: Optional[Dict[str, Any]] = None):
+IST = timezone(timedelta(hours=5, minutes=30))
+
+LOGO_MAX_WIDTH = 60*mm
+LOGO_MAX_HEIGHT = 20*mm
+
+RISK_COLORS = {
+    'LOW': colors.green,
+    'MEDIUM': colors.orange,
+    'HIGH': colors.red
+}
+
+CHECK_DETAILS = {
+    'success': 'Verification completed successfully',
+    'failed': 'Verification failed',
+    'pending': 'Awaiting verification result'
+}
+
+DISCLAIMER_TEXT = """
+        <b>Important Notice:</b><br/><br/>
+        This automated verification report is provided for informational purposes only.
+        The data is sourced from government registries and third-party APIs. While we strive for accuracy,
+        we do not guarantee the completeness or timeliness of the information.<br/><br/>
+
+        <b>Users must:</b><br/>
+        • Manually review all verification results<br/>
+        • Conduct independent due diligence<br/>
+        • Not rely solely on this report for business decisions<br/><br/>
+
+        The platform and its operators are not liable for any losses or damages arising from the use of this report.
+        This report is valid for 7 days from generation date.
         """
-        Initialize PDF generator with optional white-label branding
+
+
+def hex_to_rgb(hex_color: str) -> tuple:
+    """Convert hex color to RGB tuple"""
+    hex_color = hex_color.lstrip('#')
+    return tuple(int(hex_color[i:i+2], 16)/255.0 for i in (0, 2, 4))
+
+
+def parse_timestamp(value: Any) -> Optional[datetime]:
+    """Parse a stored timestamptz (ISO 8601 string or datetime) into IST, None if missing or invalid"""
+    if isinstance(value, datetime):
+        parsed = value
+    elif isinstance(value, str) and value:
+        try:
+            parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    else:
+        return None
+    
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(IST)
+
+
+class ReportTheme:
+    def __init__(self, branding: Optional[Dict[str, Any]] = None, logo: Optional[bytes] = None):
+        """
+        Compile branding into reusable styles and static flowables
+        
+        A theme depends only on branding_settings, so one instance is shared by
+        every report an org renders until its branding changes.
         
         Args:
             branding: Dict containing white-label settings
                 - enabled: bool
                 - company_name: str
-                - logo_url: str (optional)
+                - logo_light_url: str (optional; fetched and scaled by the caller)
                 - primary_color: str (hex)
+                - accent_color: str (hex)
                 - report_title: str
-                - footer_text: str
+                - extra_disclaimer: str
                 - support_email: str
                 - support_phone: str
                 - hide_ravono_brand: bool
+            logo: Encoded logo image (PNG/JPEG), ideally pre-scaled to the logo box;
+                drawn on the cover when branding is enabled
         """
         self.branding = branding or {}
         self.enabled = self.branding.get('enabled', False)
         
         # Colors
-        self.primary_color = self._hex_to_rgb(
-            self.branding.get('primary_color', '#F97316')
+        self.primary_color = colors.Color(*hex_to_rgb(self.branding.get('primary_color') or '#F97316'))
+        self.accent_color = colors.Color(*hex_to_rgb(self.branding.get('accent_color') or '#10B981'))
+        
+        # Paragraph styles
+        self.styles = getSampleStyleSheet()
+        self.normal_style = self.styles['Normal']
+        self.title_style = ParagraphStyle(
+            'CustomTitle',
+            parent=self.styles['Heading1'],
+            fontSize=24,
+            textColor=self.primary_color,
+            spaceAfter=12,
+            alignment=TA_CENTER
         )
-        self.accent_color = self._hex_to_rgb(
-            self.branding.get('accent_color', '#10B981')
+        self.heading_style = ParagraphStyle(
+            'CustomHeading',
+            parent=self.styles['Heading2'],
+            fontSize=14,
+            textColor=self.primary_color,
+            spaceBefore=12,
+            spaceAfter=6
         )
         
-    def _hex_to_rgb(self, hex_color: str) -> tuple:
-        """Convert hex color to RGB tuple"""
-        hex_color = hex_color.lstrip('#')
-        return tuple(int(hex_color[i:i+2], 16)/255.0 for i in (0, 2, 4))
+        # Table styles
+        self.detail_table_style = TableStyle([
+            ('BACKGROUND', (0, 0), (0, -1), colors.Color(self.primary_color.red, self.primary_color.green, self.primary_color.blue, alpha=0.1)),
+            ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 10),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+            ('TOPPADDING', (0, 0), (-1, -1), 8),
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+        ])
+        self.header_table_style = TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), self.primary_color),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), 9),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+            ('TOPPADDING', (0, 0), (-1, -1), 6),
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+        ])
+        self.risk_box_styles = {
+            level: TableStyle([
+                ('BACKGROUND', (0, 0), (-1, -1), risk_color),
+                ('TEXTCOLOR', (0, 0), (-1, -1), colors.white),
+                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+                ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
+                ('FONTSIZE', (0, 0), (-1, -1), 16),
+                ('TOPPADDING', (0, 0), (-1, -1), 15),
+                ('BOTTOMPADDING', (0, 0), (-1, -1), 15),
+            ])
+            for level, risk_color in RISK_COLORS.items()
+        }
+        
+        # Decoded once; the Image flowable is redrawn for every report
+        self.logo = None
+        if self.enabled and logo:
+            self.logo = Image(io.BytesIO(logo), width=LOGO_MAX_WIDTH, height=LOGO_MAX_HEIGHT, kind='proportional')
+        
+        # Document metadata (fixed, so identical inputs produce identical files)
+        self.title = self.branding.get('report_title') or 'Vendor Compliance Verification Report'
+        self.author = 'Ravono Vendor Compliance'
+        if self.enabled and self.branding.get('company_name'):
+            self.author = self.branding['company_name']
+        
+        # Static flowables (parsed once, identical in every report)
+        self.report_title = Paragraph(self.title, self.title_style)
+        self.brand_line = None
+        if self.enabled and not self.branding.get('hide_ravono_brand', False):
+            company = self.branding.get('company_name') or 'Ravono Vendor Compliance'
+            self.brand_line = Paragraph(f"<i>Issued by: {company}</i>", self.normal_style)
+        elif not self.enabled:
+            self.brand_line = Paragraph("<i>Powered by Ravono Vendor Compliance</i>", self.normal_style)
+        
+        self.recommendations = [
+            Paragraph("<b>Recommended Actions:</b>", self.normal_style),
+            Paragraph("• Review all verification details carefully", self.normal_style),
+            Paragraph("• Conduct manual due diligence if risk level is HIGH", self.normal_style),
+            Paragraph("• Request additional documentation if needed", self.normal_style),
+        ]
+        self.supporting_docs = [
+            self.heading("7. Supporting Documents"),
+            Paragraph("All submitted verification data has been recorded and is available in the system.", self.normal_style),
+        ]
+        self.disclaimer = self._compile_disclaimer()
+    
+    def heading(self, text: str) -> Paragraph:
+        return Paragraph(text, self.heading_style)
+    
+    def _compile_disclaimer(self):
+        content = [self.heading("9. Legal Disclaimer & Terms")]
+        
+        disclaimer_text = DISCLAIMER_TEXT
+        if self.enabled and self.branding.get('extra_disclaimer'):
+            disclaimer_text += f"<br/><br/>{self.branding.get('extra_disclaimer')}"
+        
+        content.append(Paragraph(disclaimer_text, self.normal_style))
+        
+        # Footer
+        if self.enabled:
+            footer = f"<br/><br/>For support, contact: {self.branding.get('support_email') or 'support@company.com'} | {self.branding.get('support_phone') or 'N/A'}"
+            content.append(Paragraph(footer, self.normal_style))
+        
+        return content
+
+
+class PDFReportGenerator:
+    def __init__(
+        self,
+        branding: Optional[Dict[str, Any]] = None,
+        theme: Optional[ReportTheme] = None,
+        deterministic: bool = False,
+        compact: bool = False
+    ):
+        """
+        Initialize PDF generator with optional white-label branding
+        
+        Args:
+            branding: Dict containing white-label settings (see ReportTheme)
+            theme: Precompiled theme for this branding; compiled on the fly when omitted
+            deterministic: Take every timestamp from the stored rows (the report is
+                dated by its newest input) and pin the PDF's creation date and
+                document ID, so identical inputs render byte-identical files
+            compact: Compress page content streams
+        """
+        self.theme = theme or ReportTheme(branding)
+        self.branding = self.theme.branding
+        self.enabled = self.theme.enabled
+        self.deterministic = deterministic
+        self.compact = compact
     
     def generate_report(
         self,
@@ -56,6 +240,27 @@ class PDFReportGenerator:
         """
         Generate complete PDF report
         
+        Returns:
+            bytes: PDF file content
+        """
+        return self.generate_vendor_report(vendor_data, [verification_data], ai_summary, report_id)
+    
+    def generate_vendor_report(
+        self,
+        vendor_data: Dict[str, Any],
+        verifications: List[Dict[str, Any]],
+        ai_summary: Dict[str, Any],
+        report_id: str
+    ) -> bytes:
+        """
+        Generate one consolidated report covering every check run on a vendor
+        
+        Args:
+            vendor_data: Vendor row
+            verifications: Verification rows, one table row each in Detailed Check Results
+            ai_summary: Overall {"risk_level", "summary"} for the vendor
+            report_id: Identifier printed on the cover
+        
         Returns:
             bytes: PDF file content
         """
@@ -68,66 +273,54 @@ class PDFReportGenerator:
             rightMargin=20*mm,
             leftMargin=20*mm,
             topMargin=25*mm,
-            bottomMargin=25*mm
+            bottomMargin=25*mm,
+            title=self.theme.title,
+            author=self.theme.author,
+            creator='Ravono Vendor Compliance',
+            subject=f"Report {report_id}",
+            invariant=1 if self.deterministic else 0,
+            pageCompression=1 if self.compact else 0
         )
         
+        generated_at = self._generated_at(verifications, ai_summary)
+        
         # Build content
         story = []
-        styles = getSampleStyleSheet()
-        
-        # Custom styles
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=24,
-            textColor=colors.Color(*self.primary_color),
-            spaceAfter=12,
-            alignment=TA_CENTER
-        )
-        
-        heading_style = ParagraphStyle(
-            'CustomHeading',
-            parent=styles['Heading2'],
-            fontSize=14,
-            textColor=colors.Color(*self.primary_color),
-            spaceBefore=12,
-            spaceAfter=6
-        )
         
         # 1. COVER PAGE
-        story.extend(self._generate_cover_page(report_id, vendor_data, title_style, styles))
+        story.extend(self._generate_cover_page(report_id, vendor_data, generated_at))
         story.append(PageBreak())
         
         # 2. VENDOR OVERVIEW & SUMMARY
-        story.extend(self._generate_vendor_overview(vendor_data, verification_data, heading_style, styles))
+        story.extend(self._generate_vendor_overview(vendor_data, verifications))
         story.append(Spacer(1, 20))
         
         # 3. RISK SCORE DASHBOARD
-        story.extend(self._generate_risk_dashboard(ai_summary, heading_style, styles))
+        story.extend(self._generate_risk_dashboard(ai_summary))
         story.append(Spacer(1, 20))
         
         # 4. DATA SOURCES & VERIFICATION LOGIC
-        story.extend(self._generate_data_sources(verification_data, heading_style, styles))
+        story.extend(self._generate_data_sources(verifications, ai_summary))
         story.append(PageBreak())
         
         # 5. DETAILED CHECK RESULTS
-        story.extend(self._generate_check_results(verification_data, heading_style, styles))
+        story.extend(self._generate_check_results(verifications))
         story.append(PageBreak())
         
         # 6. RISK ANALYSIS & RECOMMENDATIONS
-        story.extend(self._generate_risk_analysis(ai_summary, heading_style, styles))
+        story.extend(self._generate_risk_analysis(ai_summary))
         story.append(Spacer(1, 20))
         
         # 7. SUPPORTING DOCUMENTS
-        story.extend(self._generate_supporting_docs(verification_data, heading_style, styles))
+        story.extend(self.theme.supporting_docs)
         story.append(Spacer(1, 20))
         
         # 8. COMPLIANCE & AUDIT TRAIL
-        story.extend(self._generate_audit_trail(report_id, verification_data, heading_style, styles))
+        story.extend(self._generate_audit_trail(report_id, verifications, ai_summary, generated_at))
         story.append(Spacer(1, 20))
         
         # 9. LEGAL & DISCLAIMER
-        story.extend(self._generate_disclaimer(heading_style, styles))
+        story.extend(self.theme.disclaimer)
         
         # Build PDF
         doc.build(story)
@@ -137,248 +330,192 @@ class PDFReportGenerator:
         
         return pdf_content
     
-    def _generate_cover_page(self, report_id, vendor_data, title_style, styles):
+    def _generated_at(self, verifications, ai_summary) -> Optional[datetime]:
+        """Report date: now, or in deterministic mode the newest timestamp among its inputs"""
+        if not self.deterministic:
+            return datetime.now(IST)
+        
+        stamps = [parse_timestamp(ai_summary.get('created_at'))]
+        for verification in verifications:
+            stamps.append(parse_timestamp(verification.get('created_at')))
+            stamps.append(parse_timestamp(verification.get('upstream_fetched_at')))
+        stamps = [stamp for stamp in stamps if stamp is not None]
+        return max(stamps) if stamps else None
+    
+    def _timestamp(self, *values, fmt: str = '%d-%m-%Y %H:%M') -> str:
+        """Format the first stored timestamp present (outside deterministic mode, falls back to now)"""
+        for value in values:
+            stamp = value if isinstance(value, datetime) else parse_timestamp(value)
+            if stamp is not None:
+                return stamp.strftime(fmt)
+        return datetime.now(IST).strftime(fmt) if not self.deterministic else 'N/A'
+    
+    def _generate_cover_page(self, report_id, vendor_data, generated_at):
         """Generate cover page"""
+        theme = self.theme
         content = []
         
         # Logo (if white-label enabled and logo provided)
-        if self.enabled and self.branding.get('logo_url'):
-            # TODO: Add logo image
-            pass
+        if theme.logo is not None:
+            content.append(theme.logo)
+            content.append(Spacer(1, 10))
         
         # Title
-        report_title = self.branding.get('report_title', 'Vendor Compliance Verification Report')
-        content.append(Paragraph(report_title, title_style))
+        content.append(theme.report_title)
         content.append(Spacer(1, 30))
         
         # Report ID and Date
-        content.append(Paragraph(f"<b>Report ID:</b> {report_id}", styles['Normal']))
-        content.append(Paragraph(f"<b>Generated:</b> {datetime.now().strftime('%d %B %Y, %H:%M IST')}", styles['Normal']))
+        content.append(Paragraph(f"<b>Report ID:</b> {report_id}", theme.normal_style))
+        content.append(Paragraph(f"<b>Generated:</b> {self._timestamp(generated_at, fmt='%d %B %Y, %H:%M IST')}", theme.normal_style))
         content.append(Spacer(1, 20))
         
         # Vendor Name
-        content.append(Paragraph(f"<b>Vendor:</b> {vendor_data.get('name', 'Unknown')}", styles['Heading2']))
+        content.append(Paragraph(f"<b>Vendor:</b> {vendor_data.get('name', 'Unknown')}", theme.styles['Heading2']))
         content.append(Spacer(1, 40))
         
         # Company branding or Ravono
-        if self.enabled and not self.branding.get('hide_ravono_brand', False):
-            company = self.branding.get('company_name', 'Ravono Vendor Compliance')
-            content.append(Paragraph(f"<i>Issued by: {company}</i>", styles['Normal']))
-        elif not self.enabled:
-            content.append(Paragraph("<i>Powered by Ravono Vendor Compliance</i>", styles['Normal']))
+        if theme.brand_line is not None:
+            content.append(theme.brand_line)
         
         return content
     
-    def _generate_vendor_overview(self, vendor_data, verification_data, heading_style, styles):
+    def _generate_vendor_overview(self, vendor_data, verifications):
         """Generate vendor overview section"""
         content = []
         
-        content.append(Paragraph("2. Vendor Overview & Summary", heading_style))
+        content.append(self.theme.heading("2. Vendor Overview & Summary"))
+        
+        if len(verifications) == 1:
+            verification_type = verifications[0].get('type', 'N/A')
+            status = verifications[0].get('status', 'Pending')
+        else:
+            verification_type = ', '.join(v.get('type', 'N/A') for v in verifications) or 'N/A'
+            passed = sum(1 for v in verifications if v.get('status') == 'success')
+            status = f"{passed} of {len(verifications)} checks passed"
         
         # Vendor details table
         data = [
             ['Business Name', vendor_data.get('name', 'N/A')],
             ['GSTIN', vendor_data.get('gstin', 'N/A')],
             ['PAN', vendor_data.get('pan', 'N/A')],
-            ['Verification Type', verification_data.get('type', 'N/A')],
-            ['Status', verification_data.get('status', 'Pending')],
+            ['Verification Type', verification_type],
+            ['Status', status],
         ]
         
         table = Table(data, colWidths=[80*mm, 80*mm])
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (0, -1), colors.Color(*self.primary_color, alpha=0.1)),
-            ('TEXTCOLOR', (0, 0), (-1, -1), colors.black),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-            ('TOPPADDING', (0, 0), (-1, -1), 8),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-        ]))
+        table.setStyle(self.theme.detail_table_style)
         
         content.append(table)
         
         return content
     
-    def _generate_risk_dashboard(self, ai_summary, heading_style, styles):
+    def _generate_risk_dashboard(self, ai_summary):
         """Generate risk score dashboard"""
+        theme = self.theme
         content = []
         
-        content.append(Paragraph("3. Risk Assessment Dashboard", heading_style))
+        content.append(theme.heading("3. Risk Assessment Dashboard"))
         
-        risk_level = ai_summary.get('risk_level', 'MEDIUM')
-        risk_color = {
-            'LOW': colors.green,
-            'MEDIUM': colors.orange,
-            'HIGH': colors.red
-        }.get(risk_level, colors.orange)
+        risk_level = ai_summary.get('risk_level') or 'MEDIUM'
         
         # Risk score box
         data = [[f"RISK LEVEL: {risk_level}"]]
         table = Table(data, colWidths=[160*mm])
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, -1), risk_color),
-            ('TEXTCOLOR', (0, 0), (-1, -1), colors.white),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 16),
-            ('TOPPADDING', (0, 0), (-1, -1), 15),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 15),
-        ]))
+        table.setStyle(theme.risk_box_styles.get(risk_level, theme.risk_box_styles['MEDIUM']))
         
         content.append(table)
         content.append(Spacer(1, 10))
         
         # Summary text
-        summary = ai_summary.get('summary', 'No summary available')
-        content.append(Paragraph(f"<b>AI Summary:</b>", styles['Normal']))
-        content.append(Paragraph(summary[:500], styles['Normal']))
+        summary = ai_summary.get('summary') or 'No summary available'
+        content.append(Paragraph(f"<b>AI Summary:</b>", theme.normal_style))
+        content.append(Paragraph(summary[:500], theme.normal_style))
         
         return content
     
-    def _generate_data_sources(self, verification_data, heading_style, styles):
+    def _generate_data_sources(self, verifications, ai_summary):
         """Generate data sources section"""
         content = []
         
-        content.append(Paragraph("4. Data Sources & Verification Logic", heading_style))
+        content.append(self.theme.heading("4. Data Sources & Verification Logic"))
+        
+        # Newest upstream fetch across the checks
+        fetched = [
+            parse_timestamp(v.get('upstream_fetched_at')) or parse_timestamp(v.get('created_at'))
+            for v in verifications
+        ]
+        fetched_at = max((stamp for stamp in fetched if stamp is not None), default=None)
         
         sources = [
             ['Data Source', 'Status', 'Timestamp'],
-            ['Government Registry (GSTN/MCA)', 'Verified', datetime.now().strftime('%d-%m-%Y %H:%M')],
-            ['Plan API', 'Connected', datetime.now().strftime('%d-%m-%Y %H:%M')],
-            ['AI Risk Analysis', 'Completed', datetime.now().strftime('%d-%m-%Y %H:%M')],
+            ['Government Registry (GSTN/MCA)', 'Verified', self._timestamp(fetched_at)],
+            ['Plan API', 'Connected', self._timestamp(fetched_at)],
+            ['AI Risk Analysis', 'Completed', self._timestamp(ai_summary.get('created_at'))],
         ]
         
         table = Table(sources, colWidths=[60*mm, 50*mm, 50*mm])
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.Color(*self.primary_color)),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 9),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-            ('TOPPADDING', (0, 0), (-1, -1), 6),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-        ]))
+        table.setStyle(self.theme.header_table_style)
         
         content.append(table)
         
         return content
     
-    def _generate_check_results(self, verification_data, heading_style, styles):
+    def _generate_check_results(self, verifications):
         """Generate detailed check results"""
         content = []
         
-        content.append(Paragraph("5. Detailed Check Results", heading_style))
-        
-        # Parse verification response
-        raw_response = verification_data.get('raw_response', {})
+        content.append(self.theme.heading("5. Detailed Check Results"))
         
-        results = [
-            ['Check Type', 'Result', 'Details'],
-            [verification_data.get('type', 'N/A'), verification_data.get('status', 'Pending'), 'Verification completed successfully'],
-        ]
+        # One row per check
+        results = [['Check Type', 'Result', 'Details']]
+        for verification in verifications:
+            status = verification.get('status', 'Pending')
+            results.append([
+                verification.get('type', 'N/A'),
+                status,
+                CHECK_DETAILS.get(status, CHECK_DETAILS['success'])
+            ])
         
         table = Table(results, colWidths=[50*mm, 50*mm, 60*mm])
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.Color(*self.primary_color)),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 9),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-            ('TOPPADDING', (0, 0), (-1, -1), 6),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-        ]))
+        table.setStyle(self.theme.header_table_style)
         
         content.append(table)
         
         return content
     
-    def _generate_risk_analysis(self, ai_summary, heading_style, styles):
+    def _generate_risk_analysis(self, ai_summary):
         """Generate risk analysis and recommendations"""
+        theme = self.theme
         content = []
         
-        content.append(Paragraph("6. Risk Analysis & Recommendations", heading_style))
+        content.append(theme.heading("6. Risk Analysis & Recommendations"))
         
-        content.append(Paragraph("<b>Automated Risk Assessment:</b>", styles['Normal']))
-        content.append(Paragraph(ai_summary.get('summary', 'No analysis available'), styles['Normal']))
+        content.append(Paragraph("<b>Automated Risk Assessment:</b>", theme.normal_style))
+        content.append(Paragraph(ai_summary.get('summary') or 'No analysis available', theme.normal_style))
         content.append(Spacer(1, 10))
         
-        content.append(Paragraph("<b>Recommended Actions:</b>", styles['Normal']))
-        content.append(Paragraph("• Review all verification details carefully", styles['Normal']))
-        content.append(Paragraph("• Conduct manual due diligence if risk level is HIGH", styles['Normal']))
-        content.append(Paragraph("• Request additional documentation if needed", styles['Normal']))
+        content.extend(theme.recommendations)
         
         return content
     
-    def _generate_supporting_docs(self, verification_data, heading_style, styles):
-        """Generate supporting documents section"""
-        content = []
-        
-        content.append(Paragraph("7. Supporting Documents", heading_style))
-        content.append(Paragraph("All submitted verification data has been recorded and is available in the system.", styles['Normal']))
-        
-        return content
-    
-    def _generate_audit_trail(self, report_id, verification_data, heading_style, styles):
+    def _generate_audit_trail(self, report_id, verifications, ai_summary, generated_at):
         """Generate compliance and audit trail"""
         content = []
         
-        content.append(Paragraph("8. Compliance & Audit Trail", heading_style))
+        content.append(self.theme.heading("8. Compliance & Audit Trail"))
         
-        timeline = [
-            ['Action', 'Timestamp', 'Status'],
-            ['Verification Initiated', datetime.now().strftime('%d-%m-%Y %H:%M'), 'Complete'],
-            ['Data Fetched', datetime.now().strftime('%d-%m-%Y %H:%M'), 'Complete'],
-            ['AI Analysis', datetime.now().strftime('%d-%m-%Y %H:%M'), 'Complete'],
-            ['Report Generated', datetime.now().strftime('%d-%m-%Y %H:%M'), 'Complete'],
-        ]
+        timeline = [['Action', 'Timestamp', 'Status']]
+        for verification in verifications:
+            prefix = f"{verification.get('type', 'N/A')}: " if len(verifications) > 1 else ''
+            initiated = verification.get('created_at')
+            timeline.append([f'{prefix}Verification Initiated', self._timestamp(initiated), 'Complete'])
+            timeline.append([f'{prefix}Data Fetched', self._timestamp(verification.get('upstream_fetched_at'), initiated), 'Complete'])
+        timeline.append(['AI Analysis', self._timestamp(ai_summary.get('created_at')), 'Complete'])
+        timeline.append(['Report Generated', self._timestamp(generated_at), 'Complete'])
         
         table = Table(timeline, colWidths=[60*mm, 50*mm, 50*mm])
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.Color(*self.primary_color)),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, -1), 9),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-            ('TOPPADDING', (0, 0), (-1, -1), 6),
-        ]))
+        table.setStyle(self.theme.header_table_style)
         
         content.append(table)
         
         return content
-    
-    def _generate_disclaimer(self, heading_style, styles):
-        """Generate legal disclaimer"""
-        content = []
-        
-        content.append(Paragraph("9. Legal Disclaimer & Terms", heading_style))
-        
-        disclaimer_text = """
-        <b>Important Notice:</b><br/><br/>
-        This automated verification report is provided for informational purposes only. 
-        The data is sourced from government registries and third-party APIs. While we strive for accuracy, 
-        we do not guarantee the completeness or timeliness of the information.<br/><br/>
-        
-        <b>Users must:</b><br/>
-        • Manually review all verification results<br/>
-        • Conduct independent due diligence<br/>
-        • Not rely solely on this report for business decisions<br/><br/>
-        
-        The platform and its operators are not liable for any losses or damages arising from the use of this report.
-        This report is valid for 7 days from generation date.
-        """
-        
-        if self.enabled and self.branding.get('extra_disclaimer'):
-            disclaimer_text += f"<br/><br/>{self.branding.get('extra_disclaimer')}"
-        
-        content.append(Paragraph(disclaimer_text, styles['Normal']))
-        
-        # Footer
-        if self.enabled:
-            footer = f"<br/><br/>For support, contact: {self.branding.get('support_email', 'support@company.com')} | {self.branding.get('support_phone', 'N/A')}"
-            content.append(Paragraph(footer, styles['Normal']))
-        
-        return content
@@ -0,0 +1,272 @@
+"""
+PDF Render Pool
+Runs ReportLab rendering in a bounded process pool so report builds never block the event loop
+"""
+
+import asyncio
+import hashlib
+import json
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional
+
+from services.cache import TTLCache
+from services.logo_cache import LogoCache
+from services.pdf_generator import LOGO_MAX_HEIGHT, LOGO_MAX_WIDTH, PDFReportGenerator, ReportTheme
+
+
+# Bump whenever generator output changes so previously stored PDFs are re-rendered
+RENDERER_VERSION = "4"
+
+# Columns that appear in the PDF; bookkeeping columns (pdf_url, pdf_hash,
+# updated_at, ...) are left out so writing them doesn't invalidate the PDF
+REPORT_RENDER_FIELDS = ("id", "risk_level", "summary_text", "summary_status", "created_at")
+VENDOR_RENDER_FIELDS = ("id", "name", "gstin", "pan", "created_at")
+
+# Output mode: deterministic dates every PDF from its stored rows and pins the
+# file's metadata, so identical inputs give identical bytes; compact compresses
+# page streams. Both are part of the fingerprint, so toggling them re-renders.
+PDF_DETERMINISTIC = os.getenv("PDF_DETERMINISTIC", "true").lower() == "true"
+PDF_COMPACT = os.getenv("PDF_COMPACT", "true").lower() == "true"
+
+
+# Compiled themes per worker process, keyed by (org_id, branding updated_at): a
+# branding update changes the key, so stale themes are never reused and age out
+_themes = TTLCache(
+    maxsize=int(os.getenv("PDF_THEME_CACHE_SIZE", "256")),
+    ttl=float(os.getenv("PDF_THEME_CACHE_TTL", "3600")),
+)
+
+
+# Branding logos, scaled to the size they're printed at
+_logos = LogoCache(
+    cache_dir=os.getenv("PDF_LOGO_CACHE_DIR") or os.path.join(tempfile.gettempdir(), "ravono-logo-cache"),
+    box_width=LOGO_MAX_WIDTH,
+    box_height=LOGO_MAX_HEIGHT,
+    dpi=int(os.getenv("PDF_LOGO_DPI", "150")),
+)
+
+
+class RenderQueueFull(Exception):
+    """Raised when too many renders are already waiting (callers should retry later)"""
+
+
+class RenderPoolBroken(Exception):
+    """Raised when a worker process died mid-render; the pool has been restarted (callers should retry)"""
+
+
+def compile_theme(branding: Dict[str, Any]) -> ReportTheme:
+    logo = _logos.get(branding.get("logo_light_url")) if branding.get("enabled") else None
+    return ReportTheme(branding, logo=logo)
+
+
+def get_theme(branding: Dict[str, Any]) -> ReportTheme:
+    """Compiled theme for an org's branding, built on first use"""
+    if not branding.get("org_id"):
+        return compile_theme(branding)
+
+    key = (branding["org_id"], branding.get("updated_at"))
+    theme = _themes.get(key)
+    if theme is None:
+        theme = compile_theme(branding)
+        _themes.set(key, theme)
+    return theme
+
+
+def render_report(
+    branding: Dict[str, Any],
+    vendor_data: Dict[str, Any],
+    verification_data: Dict[str, Any],
+    ai_summary: Dict[str, Any],
+    report_id: str,
+) -> bytes:
+    """Render one report (runs inside a pool worker process)"""
+    generator = PDFReportGenerator(theme=get_theme(branding), deterministic=PDF_DETERMINISTIC, compact=PDF_COMPACT)
+    return generator.generate_report(
+        vendor_data=vendor_data,
+        verification_data=verification_data,
+        ai_summary=ai_summary,
+        report_id=report_id,
+    )
+
+
+def render_vendor_report(
+    branding: Dict[str, Any],
+    vendor_data: Dict[str, Any],
+    verifications: List[Dict[str, Any]],
+    ai_summary: Dict[str, Any],
+    report_id: str,
+) -> bytes:
+    """Render a consolidated vendor report (runs inside a pool worker process)"""
+    generator = PDFReportGenerator(theme=get_theme(branding), deterministic=PDF_DETERMINISTIC, compact=PDF_COMPACT)
+    return generator.generate_vendor_report(
+        vendor_data=vendor_data,
+        verifications=verifications,
+        ai_summary=ai_summary,
+        report_id=report_id,
+    )
+
+
+def _pick(row: Optional[Dict[str, Any]], fields) -> Optional[Dict[str, Any]]:
+    return {field: row.get(field) for field in fields} if row is not None else None
+
+
+def _fingerprint(payload: Dict[str, Any]) -> str:
+    encoded = json.dumps(payload, sort_keys=True, default=str, separators=(",", ":")).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def report_fingerprint(
+    report: Dict[str, Any],
+    vendor_data: Optional[Dict[str, Any]],
+    verification_data: Optional[Dict[str, Any]],
+    branding: Optional[Dict[str, Any]],
+) -> str:
+    """Content hash of everything a rendered PDF depends on (used as its ETag)"""
+    payload = {
+        "renderer": RENDERER_VERSION,
+        "mode": {"deterministic": PDF_DETERMINISTIC, "compact": PDF_COMPACT},
+        "report": _pick(report, REPORT_RENDER_FIELDS),
+        "vendor": _pick(vendor_data, VENDOR_RENDER_FIELDS),
+        "verification": verification_data,
+        "branding_updated_at": (branding or {}).get("updated_at"),
+    }
+    return _fingerprint(payload)
+
+
+def vendor_report_fingerprint(
+    vendor_data: Dict[str, Any],
+    verifications: List[Dict[str, Any]],
+    ai_summary: Dict[str, Any],
+    branding: Optional[Dict[str, Any]],
+) -> str:
+    """Content hash of a consolidated vendor report's inputs"""
+    payload = {
+        "renderer": RENDERER_VERSION,
+        "mode": {"deterministic": PDF_DETERMINISTIC, "compact": PDF_COMPACT},
+        "vendor": _pick(vendor_data, VENDOR_RENDER_FIELDS),
+        "verifications": verifications,
+        "ai_summary": ai_summary,
+        "branding_updated_at": (branding or {}).get("updated_at"),
+    }
+    return _fingerprint(payload)
+
+
+class PDFRenderPool:
+    def __init__(self, workers: Optional[int] = None, max_queue: int = 100):
+        """
+        Initialize pool settings (processes are started on start())
+
+        Args:
+            workers: Renderer processes (defaults to the CPU count)
+            max_queue: Renders allowed to wait for a free worker before new
+                requests are rejected with RenderQueueFull
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.in_flight = 0
+        self.queued = 0
+        self.rendered = 0
+        self.rejected = 0
+        self.restarts = 0
+
+    def start(self) -> None:
+        """Start worker processes (called from the app lifespan)"""
+        if self._executor is not None:
+            return
+
+        self._executor = self._create_executor()
+        self._slots = asyncio.Semaphore(self.workers)
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        # spawn: forking a process that runs an event loop and open sockets is unsafe
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
+    def _restart(self, broken: ProcessPoolExecutor) -> None:
+        """Replace an executor whose worker died (an OOM kill or segfault breaks every later submit)"""
+        # Renders that failed together all report the same executor; replace it once
+        if self._executor is not broken:
+            return
+
+        broken.shutdown(wait=False, cancel_futures=True)
+        self._executor = self._create_executor()
+        self.restarts += 1
+
+    def stop(self) -> None:
+        """Shut down worker processes, cancelling renders that have not started"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def run(self, func, *args) -> Any:
+        """Run a picklable function in the pool with backpressure"""
+        if self._executor is None:
+            raise RuntimeError("PDF render pool is not started; call start() first")
+
+        if self.queued >= self.max_queue:
+            self.rejected += 1
+            raise RenderQueueFull(f"{self.queued} renders already queued")
+
+        self.queued += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.queued -= 1
+
+        self.in_flight += 1
+        executor = self._executor
+        try:
+            loop = asyncio.get_running_loop()
+            try:
+                result = await loop.run_in_executor(executor, func, *args)
+            except BrokenProcessPool as e:
+                self._restart(executor)
+                raise RenderPoolBroken(str(e) or "PDF renderer process died") from e
+            self.rendered += 1
+            return result
+        finally:
+            self.in_flight -= 1
+            self._slots.release()
+
+    async def render(
+        self,
+        branding: Dict[str, Any],
+        vendor_data: Dict[str, Any],
+        verification_data: Dict[str, Any],
+        ai_summary: Dict[str, Any],
+        report_id: str,
+    ) -> bytes:
+        """Render a report PDF off the event loop"""
+        return await self.run(render_report, branding, vendor_data, verification_data, ai_summary, report_id)
+
+    async def render_vendor(
+        self,
+        branding: Dict[str, Any],
+        vendor_data: Dict[str, Any],
+        verifications: List[Dict[str, Any]],
+        ai_summary: Dict[str, Any],
+        report_id: str,
+    ) -> bytes:
+        """Render a consolidated vendor report off the event loop"""
+        return await self.run(render_vendor_report, branding, vendor_data, verifications, ai_summary, report_id)
+
+    def stats(self) -> Dict[str, int]:
+        """Queue-depth and throughput counters"""
+        return {
+            "workers": self.workers,
+            "in_flight": self.in_flight,
+            "queue_depth": self.queued,
+            "max_queue": self.max_queue,
+            "rendered": self.rendered,
+            "rejected": self.rejected,
+            "restarts": self.restarts,
+        }
@@ -0,0 +1,47 @@
+"""
+Async Rate Limiting
+Token-bucket limiter shared by every caller of an upstream API
+"""
+
+import asyncio
+import time
+
+
+class AsyncRateLimiter:
+    def __init__(self, rate: float, burst: int = 1):
+        """
+        Initialize limiter
+
+        Args:
+            rate: Sustained requests per second (0 disables limiting)
+            burst: Requests allowed back-to-back before throttling starts
+        """
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Wait until a request may be sent"""
+        if self.rate <= 0:
+            return
+
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    async def __aenter__(self) -> "AsyncRateLimiter":
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        pass
@@ -0,0 +1,101 @@
+"""
+Report Export
+Fetches report PDFs with bounded concurrency and streams them out as a ZIP archive or one merged PDF
+"""
+
+import asyncio
+import io
+import zipfile
+from collections import deque
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, List, Tuple
+
+from PyPDF2 import PdfMerger
+
+
+async def fetch_in_order(
+    items: Iterable[Any],
+    fetch: Callable[[Any], Awaitable[Any]],
+    concurrency: int,
+) -> AsyncIterator[Tuple[Any, Any]]:
+    """
+    Run fetch() over items with at most `concurrency` in flight, yielding
+    (item, result) in input order; a failed fetch yields its exception as the
+    result so one bad item doesn't abort the rest
+
+    Only the in-flight window is held in memory, however many items there are.
+    """
+    async def run(item):
+        try:
+            return await fetch(item)
+        except Exception as e:
+            return e
+
+    iterator = iter(items)
+    window: deque = deque()
+
+    try:
+        for item in iterator:
+            window.append((item, asyncio.ensure_future(run(item))))
+            if len(window) >= concurrency:
+                break
+
+        while window:
+            item, task = window.popleft()
+            result = await task
+
+            next_item = next(iterator, None)
+            if next_item is not None:
+                window.append((next_item, asyncio.ensure_future(run(next_item))))
+
+            yield item, result
+    finally:
+        # Client went away mid-download
+        for _, task in window:
+            task.cancel()
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only, non-seekable sink that zipfile writes into and we drain between entries"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+async def stream_zip(entries: AsyncIterator[Tuple[str, bytes]]) -> AsyncIterator[bytes]:
+    """Build a ZIP incrementally, yielding its bytes after each entry"""
+    sink = _ChunkSink()
+    # Unseekable output makes zipfile write data descriptors instead of seeking back
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+        async for name, content in entries:
+            archive.writestr(name, content)
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+
+    chunk = sink.drain()  # Central directory
+    if chunk:
+        yield chunk
+
+
+def merge_pdfs(pdfs: List[bytes]) -> bytes:
+    """Concatenate PDFs into one document (picklable, runs in the render pool)"""
+    merger = PdfMerger()
+    for pdf in pdfs:
+        merger.append(io.BytesIO(pdf))
+
+    buffer = io.BytesIO()
+    merger.write(buffer)
+    merger.close()
+    return buffer.getvalue()
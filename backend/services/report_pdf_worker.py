@@ -0,0 +1,64 @@
+"""
+Background Report PDF Worker
+Renders and stores report PDFs right after verification so downloads and Drive saves read from storage
+"""
+
+import asyncio
+from typing import Awaitable, Callable, List
+
+
+class ReportPdfWorker:
+    def __init__(
+        self,
+        prepare: Callable[[str, str], Awaitable[None]],
+        concurrency: int = 2,
+        max_queue: int = 1000,
+    ):
+        """
+        Initialize worker
+
+        Args:
+            prepare: Coroutine (org_id, report_id) that renders/stores the PDF and
+                applies the org's follow-up actions (e.g. Drive auto-save)
+            concurrency: Reports prepared at once (rendering itself is bounded by
+                the PDF render pool)
+            max_queue: Reports beyond this are skipped; their PDF is rendered on
+                first download instead
+        """
+        self.prepare = prepare
+        self.concurrency = concurrency
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self) -> None:
+        """Start worker tasks"""
+        if self._tasks:
+            return
+
+        self._tasks = [asyncio.create_task(self._run()) for _ in range(self.concurrency)]
+
+    async def stop(self) -> None:
+        """Stop workers; queued reports fall back to rendering on first download"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(self, org_id: str, report_id: str) -> bool:
+        """Queue a report; returns False if the queue is full"""
+        try:
+            self.queue.put_nowait((org_id, report_id))
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    async def _run(self) -> None:
+        while True:
+            org_id, report_id = await self.queue.get()
+            try:
+                await self.prepare(org_id, report_id)
+            except Exception:
+                # Best effort: the PDF is still rendered lazily when requested
+                pass
+            finally:
+                self.queue.task_done()
@@ -0,0 +1,194 @@
+"""
+Background AI Summary Worker
+Computes AI risk summaries off the request path and backfills them into reports
+"""
+
+import asyncio
+from datetime import datetime, timezone, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from services.database import SupabaseDatabase
+
+SUMMARY_PENDING = "pending"
+SUMMARY_PROCESSING = "processing"
+SUMMARY_COMPLETED = "completed"
+SUMMARY_FAILED = "failed"
+
+# Statuses whose summary is not final yet
+SUMMARY_IN_PROGRESS = (SUMMARY_PENDING, SUMMARY_PROCESSING)
+
+
+class SummaryWorker:
+    def __init__(
+        self,
+        db: SupabaseDatabase,
+        summarize: Callable[[Dict[str, Any]], Awaitable[Dict[str, str]]],
+        concurrency: int = 4,
+        max_queue: int = 1000,
+        recover_interval: float = 30.0,
+        lease_timeout: float = 300.0,
+        max_attempts: int = 3,
+        on_complete: Optional[Callable[[Dict[str, Any]], Any]] = None,
+    ):
+        """
+        Initialize worker
+
+        Args:
+            db: Data layer used to backfill reports
+            summarize: Coroutine returning {"risk_level", "summary", "status"} for
+                a Plan API response
+            concurrency: Number of summaries computed at once
+            max_queue: Queued reports beyond this stay pending until the next recovery
+            recover_interval: Seconds between recovery passes over pending reports
+            lease_timeout: A report claimed longer ago than this (its process died)
+                is claimed again
+            max_attempts: Claims per report before it is marked failed
+            on_complete: Called with the updated report row once its summary is stored
+        """
+        self.db = db
+        self.summarize = summarize
+        self.concurrency = concurrency
+        self.recover_interval = recover_interval
+        self.lease_timeout = lease_timeout
+        self.max_attempts = max_attempts
+        self.on_complete = on_complete
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._queued: Set[str] = set()
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self) -> None:
+        """Start worker tasks and the recovery loop (which first picks up reports left by other processes)"""
+        if self._tasks:
+            return
+
+        self._tasks = [asyncio.create_task(self._run()) for _ in range(self.concurrency)]
+        self._tasks.append(asyncio.create_task(self._recover_loop()))
+
+    async def stop(self) -> None:
+        """Stop workers; claimed reports are reclaimed once their lease expires"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(self, report_id: str, verification_data: Dict[str, Any], attempts: int = 0) -> bool:
+        """Queue a pending report for summarization; returns False if the queue is full"""
+        if report_id in self._queued:
+            return True
+
+        try:
+            self.queue.put_nowait((report_id, verification_data, attempts))
+        except asyncio.QueueFull:
+            return False
+
+        self._queued.add(report_id)
+        return True
+
+    async def recover(self, limit: Optional[int] = None) -> int:
+        """
+        Queue pending reports and reports whose claim has expired; returns the number queued
+
+        Expired reports that used up their attempts are marked failed instead.
+        """
+        room = self.queue.maxsize - self.queue.qsize()
+        if room <= 0:
+            return 0
+
+        cutoff = (datetime.now(timezone.utc) - timedelta(seconds=self.lease_timeout)).isoformat()
+        result = await self.db.table("reports")\
+            .select("id, summary_status, summary_attempts, verifications(raw_response)")\
+            .or_(f'summary_status.eq.{SUMMARY_PENDING},and(summary_status.eq.{SUMMARY_PROCESSING},summary_claimed_at.lt."{cutoff}")')\
+            .order("created_at")\
+            .limit(min(limit or room, room))\
+            .execute()
+
+        queued = 0
+        for report in result.data or []:
+            attempts = report.get("summary_attempts") or 0
+            if attempts >= self.max_attempts:
+                await self._finish(report["id"], report["summary_status"], attempts, {"summary_status": SUMMARY_FAILED})
+                continue
+
+            if report["summary_status"] == SUMMARY_PROCESSING:
+                # Release the expired claim so it can be claimed like any pending report
+                released = await self._finish(report["id"], SUMMARY_PROCESSING, attempts, {"summary_status": SUMMARY_PENDING})
+                if released is None:
+                    continue
+
+            verification = report.get("verifications") or {}
+            if self.submit(report["id"], verification.get("raw_response") or {}, attempts):
+                queued += 1
+        return queued
+
+    async def _recover_loop(self) -> None:
+        while True:
+            try:
+                await self.recover()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # Transient database failure; retry on the next pass
+                pass
+            await asyncio.sleep(self.recover_interval)
+
+    async def _run(self) -> None:
+        while True:
+            report_id, verification_data, attempts = await self.queue.get()
+            self._queued.discard(report_id)
+            try:
+                await self._process(report_id, verification_data, attempts)
+            except Exception:
+                # Left processing; recover() reclaims it once the lease expires
+                pass
+            finally:
+                self.queue.task_done()
+
+    async def _process(self, report_id: str, verification_data: Dict[str, Any], attempts: int) -> None:
+        # Matching on status and attempts makes the claim a compare-and-set, so
+        # one process summarizes a report even when several recover it
+        claimed = await self.db.table("reports")\
+            .update({
+                "summary_status": SUMMARY_PROCESSING,
+                "summary_attempts": attempts + 1,
+                "summary_claimed_at": datetime.now(timezone.utc).isoformat(),
+            })\
+            .eq("id", report_id)\
+            .eq("summary_status", SUMMARY_PENDING)\
+            .eq("summary_attempts", attempts)\
+            .execute()
+        if not claimed.data:
+            return
+
+        attempts += 1
+        try:
+            ai_summary = await self.summarize(verification_data)
+        except Exception:
+            ai_summary = None
+
+        if ai_summary is None or ai_summary.get("status") == SUMMARY_FAILED:
+            if attempts < self.max_attempts:
+                # Back to pending; a later recovery pass retries it
+                await self._finish(report_id, SUMMARY_PROCESSING, attempts, {"summary_status": SUMMARY_PENDING})
+                return
+            if ai_summary is None:
+                await self._finish(report_id, SUMMARY_PROCESSING, attempts, {"summary_status": SUMMARY_FAILED})
+                return
+
+        report = await self._finish(report_id, SUMMARY_PROCESSING, attempts, {
+            "summary_text": ai_summary["summary"],
+            "risk_level": ai_summary["risk_level"],
+            "summary_status": ai_summary.get("status", SUMMARY_COMPLETED),
+        })
+
+        if self.on_complete is not None and report is not None:
+            self.on_complete(report)
+
+    async def _finish(self, report_id: str, status: str, attempts: int, values: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Update a report only if it is still in the state we saw; returns the updated row"""
+        result = await self.db.table("reports")\
+            .update(values)\
+            .eq("id", report_id)\
+            .eq("summary_status", status)\
+            .eq("summary_attempts", attempts)\
+            .execute()
+        return result.data[0] if result.data else None
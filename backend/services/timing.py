@@ -0,0 +1,31 @@
+"""
+Request Stage Timing
+Records per-stage durations and renders them as a Server-Timing header
+"""
+
+import time
+from typing import Any, Awaitable, Dict
+
+
+class StageTimer:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.timings: Dict[str, float] = {}
+
+    async def run(self, name: str, awaitable: Awaitable[Any]) -> Any:
+        """Await a stage and record its duration in milliseconds"""
+        start = time.perf_counter()
+        try:
+            return await awaitable
+        finally:
+            self.timings[name] = (time.perf_counter() - start) * 1000
+
+    def total(self) -> float:
+        """Milliseconds since the timer was created"""
+        return (time.perf_counter() - self.started) * 1000
+
+    def server_timing(self) -> str:
+        """Format timings for the Server-Timing response header"""
+        entries = [f"{name};dur={ms:.1f}" for name, ms in self.timings.items()]
+        entries.append(f"total;dur={self.total():.1f}")
+        return ", ".join(entries)
@@ -0,0 +1,150 @@
+"""
+Access Token Verification
+Verifies Supabase JWTs locally (shared secret or JWKS) with a cache of validated claims
+"""
+
+import asyncio
+import hashlib
+import time
+import jwt
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from services.cache import TTLCache
+
+VERIFY_MODE_LOCAL = "local"
+VERIFY_MODE_REMOTE = "remote"
+
+# Asymmetric algorithms accepted for JWKS keys, by key type
+JWKS_ALGORITHMS = {"RSA": "RS256", "EC": "ES256"}
+
+
+class TokenVerificationError(Exception):
+    """Raised when a token is missing, malformed, expired or has a bad signature"""
+
+
+class TokenVerifier:
+    def __init__(
+        self,
+        remote_validator: Callable[[str], Awaitable[Dict[str, Any]]],
+        jwt_secret: Optional[str] = None,
+        jwks_url: Optional[str] = None,
+        mode: str = VERIFY_MODE_LOCAL,
+        audience: str = "authenticated",
+        cache_size: int = 10000,
+        cache_ttl: float = 300.0,
+        leeway: float = 10.0,
+    ):
+        """
+        Initialize verifier
+
+        Args:
+            remote_validator: Coroutine that validates a token against Supabase Auth
+                and returns its claims (used in remote mode and as fallback)
+            jwt_secret: Project JWT secret for HS256 tokens
+            jwks_url: JWKS endpoint for asymmetrically signed tokens
+            mode: "local" verifies signatures in-process, "remote" always asks Supabase Auth
+            audience: Expected `aud` claim
+            cache_size: Maximum number of cached tokens
+            cache_ttl: Upper bound in seconds on how long validated claims are reused
+            leeway: Clock skew tolerance in seconds for `exp`/`nbf`
+        """
+        if mode not in (VERIFY_MODE_LOCAL, VERIFY_MODE_REMOTE):
+            raise ValueError(f"Invalid token verification mode: {mode}")
+
+        self.remote_validator = remote_validator
+        self.jwt_secret = jwt_secret
+        self.jwks_client = jwt.PyJWKClient(jwks_url) if jwks_url else None
+        self.audience = audience
+        self.leeway = leeway
+        self.cache = TTLCache(maxsize=cache_size, ttl=cache_ttl)
+
+        # Without key material local verification is impossible, so fall back to remote
+        if mode == VERIFY_MODE_LOCAL and not (jwt_secret or jwks_url):
+            mode = VERIFY_MODE_REMOTE
+        self.mode = mode
+
+    @staticmethod
+    def _cache_key(token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    async def verify(self, token: str) -> Dict[str, Any]:
+        """
+        Validate a bearer token
+
+        Returns:
+            Dict of JWT claims (sub, email, role, exp, ...)
+        """
+        key = self._cache_key(token)
+        claims = self.cache.get(key)
+        if claims is not None:
+            return claims
+
+        if self.mode == VERIFY_MODE_LOCAL:
+            claims = await self._verify_local(token)
+        else:
+            claims = await self._verify_remote(token)
+
+        # Never serve a cached token past its own expiry
+        exp = claims.get("exp")
+        if exp is not None:
+            self.cache.set(key, claims, ttl=float(exp) - time.time())
+
+        return claims
+
+    def invalidate(self, token: str) -> None:
+        """Forget a token (e.g. on sign-out)"""
+        self.cache.invalidate(self._cache_key(token))
+
+    async def _verify_local(self, token: str) -> Dict[str, Any]:
+        try:
+            header = jwt.get_unverified_header(token)
+        except jwt.PyJWTError as e:
+            raise TokenVerificationError(str(e))
+
+        # The accepted algorithm comes from the key, never from the unverified
+        # header, so a forged alg can't pair a key with the wrong algorithm
+        algorithm = header.get("alg")
+        if algorithm == "HS256" and self.jwt_secret:
+            signing_key, key_algorithm = self.jwt_secret, "HS256"
+        elif algorithm in JWKS_ALGORITHMS.values() and self.jwks_client is not None:
+            try:
+                # PyJWKClient fetches with urllib; keep the (rare) key refresh off the loop
+                jwk = await asyncio.to_thread(self.jwks_client.get_signing_key_from_jwt, token)
+            except jwt.PyJWKClientError:
+                return await self._verify_remote(token)
+            except jwt.PyJWTError as e:
+                raise TokenVerificationError(str(e))
+            signing_key, key_algorithm = jwk.key, JWKS_ALGORITHMS.get(jwk.key_type)
+            if key_algorithm is None:
+                raise TokenVerificationError(f"Unsupported signing key type: {jwk.key_type}")
+        else:
+            # No key for this algorithm; let Supabase Auth decide
+            return await self._verify_remote(token)
+
+        try:
+            return jwt.decode(
+                token,
+                signing_key,
+                algorithms=[key_algorithm],
+                audience=self.audience,
+                leeway=self.leeway,
+                options={"require": ["exp", "sub"]},
+            )
+        except jwt.PyJWTError as e:
+            raise TokenVerificationError(str(e))
+
+    async def _verify_remote(self, token: str) -> Dict[str, Any]:
+        try:
+            claims = await self.remote_validator(token)
+        except Exception as e:
+            raise TokenVerificationError(str(e))
+
+        if "exp" not in claims:
+            # The remote call proved the signature; exp is only read for cache lifetime
+            try:
+                unverified = jwt.decode(token, options={"verify_signature": False})
+                claims = {**claims, "exp": unverified.get("exp")}
+            except jwt.PyJWTError:
+                pass
+
+        return claims
@@ -0,0 +1,54 @@
+"""
+Vendor Identity
+Resolves verifications onto one vendor per business using its registration numbers (one RPC)
+"""
+
+from typing import Any, Dict, Tuple
+
+from services.database import SupabaseDatabase
+
+# Vendor columns that identify a business; a vendor is unique per org on each
+# of these (normalized), see public.upsert_vendor
+MATCH_IDENTIFIERS = ("gstin", "pan", "cin", "tan", "udyam")
+
+# Further identifiers stored on the vendor but shared across businesses (a
+# director's DIN, a vehicle's RC, ...), so never used to match
+EXTRA_IDENTIFIERS = ("din", "tin", "rc", "upi", "dl")
+
+
+def vendor_identifiers(data: Dict[str, Any]) -> Dict[str, str]:
+    """Identifier columns present in a verification payload or bulk row"""
+    identifiers = {}
+    for field in MATCH_IDENTIFIERS + EXTRA_IDENTIFIERS:
+        value = data.get(field)
+        if value is not None and str(value).strip():
+            identifiers[field] = str(value).strip()
+    return identifiers
+
+
+class VendorDirectory:
+    def __init__(self, db: SupabaseDatabase):
+        self.db = db
+
+    async def resolve(self, org_id: str, name: str, identifiers: Dict[str, str]) -> Tuple[str, bool]:
+        """
+        Find the org's vendor for these identifiers, or create it
+
+        Missing identifiers are filled in on an existing vendor; its name is kept.
+
+        Returns:
+            (vendor_id, created)
+        """
+        result = await self.db.rpc("upsert_vendor", {
+            "p_org_id": org_id,
+            "p_name": name,
+            "p_identifiers": identifiers,
+        }).execute()
+
+        row = result.data[0]
+        return row["vendor_id"], row["created"]
+
+    async def discard(self, vendor_id: str) -> bool:
+        """Delete a vendor created by resolve() unless a verification has attached to it since"""
+        result = await self.db.rpc("discard_new_vendor", {"p_vendor_id": vendor_id}).execute()
+        return bool(result.data)
@@ -0,0 +1,179 @@
+"""
+Verification Result Cache
+Content-addressed cache of Plan API responses keyed by verification type and normalized identifiers
+
+Backends are layered: an in-process LRU in front of an optional shared store
+(Redis, via the optional `redis` package) so repeat checks across workers skip
+the paid upstream call.
+"""
+
+import hashlib
+import json
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+from services.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Seconds a result may be reused, per verification type
+DEFAULT_TTLS = {
+    "GST": 24 * 3600,
+    "PAN": 7 * 24 * 3600,
+    "CIN": 24 * 3600,
+    "DIN": 24 * 3600,
+    "BANK": 24 * 3600,
+    "AADHAAR": 0,  # OTP-backed, never cached
+}
+
+
+def normalize_identifiers(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Canonical form of a verification payload (trimmed, upper-cased, no blanks)"""
+    normalized = {}
+    for key, value in data.items():
+        if value is None:
+            continue
+        if isinstance(value, str):
+            value = "".join(value.split()).upper()
+            if not value:
+                continue
+        normalized[key.strip().lower()] = value
+    return normalized
+
+
+def cache_key(verification_type: str, data: Dict[str, Any]) -> str:
+    """SHA-256 over the verification type and its normalized payload"""
+    canonical = json.dumps(
+        {"type": verification_type.upper(), "data": normalize_identifiers(data)},
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return "verification:" + hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class InMemoryBackend:
+    """Process-local LRU backend (also the stand-in for the shared store in tests)"""
+
+    def __init__(self, maxsize: int = 10000, max_ttl: float = 7 * 24 * 3600):
+        self.cache = TTLCache(maxsize=maxsize, ttl=max_ttl)
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        return self.cache.get(key)
+
+    async def set(self, key: str, value: Dict[str, Any], ttl: float) -> None:
+        self.cache.set(key, value, ttl=ttl)
+
+    async def delete(self, key: str) -> None:
+        self.cache.invalidate(key)
+
+    async def close(self) -> None:
+        pass
+
+
+class RedisBackend:
+    """Shared backend so cached results survive restarts and are reused across workers"""
+
+    def __init__(self, url: str):
+        try:
+            import redis.asyncio as redis
+            from redis.exceptions import RedisError
+        except ImportError:
+            raise RuntimeError("VERIFICATION_CACHE_REDIS_URL is set but the `redis` package is not installed")
+
+        self.client = redis.from_url(url)
+        # An unreachable or slow Redis degrades to a cache miss instead of failing the verification
+        self.errors = (RedisError, OSError)
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            value = await self.client.get(key)
+        except self.errors as e:
+            logger.warning("Verification cache read failed, treating as a miss: %s", e)
+            return None
+        return json.loads(value) if value is not None else None
+
+    async def set(self, key: str, value: Dict[str, Any], ttl: float) -> None:
+        try:
+            await self.client.set(key, json.dumps(value, default=str), ex=max(int(ttl), 1))
+        except self.errors as e:
+            logger.warning("Verification cache write skipped: %s", e)
+
+    async def delete(self, key: str) -> None:
+        try:
+            await self.client.delete(key)
+        except self.errors as e:
+            logger.warning("Verification cache delete failed: %s", e)
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+
+class VerificationCache:
+    def __init__(self, backends: List[Any], ttls: Optional[Dict[str, float]] = None):
+        """
+        Initialize cache
+
+        Args:
+            backends: Backends checked in order (fastest first); hits are copied
+                into the faster layers
+            ttls: Per-type TTL overrides in seconds (0 disables caching for a type)
+        """
+        self.backends = backends
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+
+    def ttl_for(self, verification_type: str) -> float:
+        return self.ttls.get(verification_type.upper(), 0)
+
+    async def get(self, verification_type: str, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached result
+
+        Returns:
+            {"response": <Plan API response>, "cached_at": <ISO timestamp>,
+             "expires_at": <epoch seconds>} or None
+        """
+        if self.ttl_for(verification_type) <= 0:
+            return None
+
+        key = cache_key(verification_type, data)
+        for index, backend in enumerate(self.backends):
+            entry = await backend.get(key)
+            if entry is not None:
+                # Backfill faster layers for the remainder of the entry's lifetime
+                remaining = entry.get("expires_at", 0) - time.time()
+                for faster in self.backends[:index]:
+                    await faster.set(key, entry, remaining)
+                return entry
+
+        return None
+
+    async def set(self, verification_type: str, data: Dict[str, Any], entry: Dict[str, Any]) -> None:
+        ttl = self.ttl_for(verification_type)
+        if ttl <= 0:
+            return
+
+        key = cache_key(verification_type, data)
+        entry = {**entry, "expires_at": time.time() + ttl}
+        for backend in self.backends:
+            await backend.set(key, entry, ttl)
+
+    async def invalidate(self, verification_type: str, data: Dict[str, Any]) -> None:
+        key = cache_key(verification_type, data)
+        for backend in self.backends:
+            await backend.delete(key)
+
+    async def close(self) -> None:
+        for backend in self.backends:
+            await backend.close()
+
+
+def parse_ttls(value: Optional[str]) -> Dict[str, float]:
+    """Parse "GST=3600,PAN=86400" into a TTL override mapping"""
+    ttls = {}
+    for item in (value or "").split(","):
+        if "=" in item:
+            name, seconds = item.split("=", 1)
+            ttls[name.strip().upper()] = float(seconds)
+    return ttls
@@ -154,7 +154,7 @@ def setup_storage_buckets():
             "id": "bulk-uploads",
             "name": "bulk-uploads",
             "public": False,
-            "file_size_limit": 5242880,  # 5 MB
+            "file_size_limit": 52428800,  # 50 MB
             "allowed_mime_types": ["text/csv", "application/vnd.ms-excel"]
         }
     ]
@@ -0,0 +1,101 @@
+-- =============================================
+-- MIGRATION 000: Atomic credit reservations
+-- deduct_credits() becomes a single conditional UPDATE that takes the acting
+-- user and a reason and logs its own credit_logs entry; refund_credits()
+-- returns unused reservations. log_credit_change() skips the changes these
+-- functions already logged. Required by services/credits.py, so it is
+-- numbered to run before every other migration.
+-- Safe to re-run
+-- =============================================
+
+-- Generic trigger log (skips changes logged by deduct_credits/refund_credits)
+CREATE OR REPLACE FUNCTION public.log_credit_change()
+RETURNS TRIGGER AS $$
+BEGIN
+    -- deduct_credits/refund_credits log their own entries
+    IF current_setting('ravono.credit_logged', true) = 'on' THEN
+        RETURN NEW;
+    END IF;
+
+    IF (TG_OP = 'UPDATE' AND OLD.current_balance != NEW.current_balance) THEN
+        INSERT INTO public.credit_logs (org_id, type, amount, balance_after, reason)
+        VALUES (
+            NEW.org_id,
+            CASE 
+                WHEN NEW.current_balance > OLD.current_balance THEN 'ADD'
+                ELSE 'DEDUCT'
+            END,
+            ABS(NEW.current_balance - OLD.current_balance),
+            NEW.current_balance,
+            'System automatic log'
+        );
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- Function: Deduct credits (atomic reservation; logs the change in the same transaction)
+DROP FUNCTION IF EXISTS public.deduct_credits(UUID, INTEGER);
+CREATE OR REPLACE FUNCTION public.deduct_credits(
+    p_org_id UUID,
+    p_amount INTEGER DEFAULT 1,
+    p_user_id UUID DEFAULT NULL,
+    p_reason TEXT DEFAULT NULL
+)
+RETURNS BOOLEAN AS $$
+DECLARE
+    new_balance INTEGER;
+BEGIN
+    -- Skip the generic on_credit_change log; this function writes a richer entry
+    PERFORM set_config('ravono.credit_logged', 'on', true);
+
+    UPDATE public.credits
+    SET current_balance = current_balance - p_amount
+    WHERE org_id = p_org_id
+        AND current_balance >= p_amount
+    RETURNING current_balance INTO new_balance;
+    
+    IF NOT FOUND THEN
+        PERFORM set_config('ravono.credit_logged', 'off', true);
+        RETURN FALSE;
+    END IF;
+
+    INSERT INTO public.credit_logs (org_id, user_id, type, amount, balance_after, reason)
+    VALUES (p_org_id, p_user_id, 'DEDUCT', p_amount, new_balance, COALESCE(p_reason, 'Credit deduction'));
+
+    PERFORM set_config('ravono.credit_logged', 'off', true);
+    RETURN TRUE;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- Function: Refund credits (returns unused reservations)
+CREATE OR REPLACE FUNCTION public.refund_credits(
+    p_org_id UUID,
+    p_amount INTEGER,
+    p_user_id UUID DEFAULT NULL,
+    p_reason TEXT DEFAULT NULL
+)
+RETURNS INTEGER AS $$
+DECLARE
+    new_balance INTEGER;
+BEGIN
+    PERFORM set_config('ravono.credit_logged', 'on', true);
+
+    UPDATE public.credits
+    SET current_balance = current_balance + p_amount
+    WHERE org_id = p_org_id
+    RETURNING current_balance INTO new_balance;
+
+    IF FOUND THEN
+        INSERT INTO public.credit_logs (org_id, user_id, type, amount, balance_after, reason)
+        VALUES (p_org_id, p_user_id, 'REFUND', p_amount, new_balance, COALESCE(p_reason, 'Credit refund'));
+    END IF;
+
+    PERFORM set_config('ravono.credit_logged', 'off', true);
+    RETURN new_balance;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- Balances only change through the backend (service role)
+REVOKE ALL ON FUNCTION public.deduct_credits(UUID, INTEGER, UUID, TEXT) FROM PUBLIC, anon, authenticated;
+REVOKE ALL ON FUNCTION public.refund_credits(UUID, INTEGER, UUID, TEXT) FROM PUBLIC, anon, authenticated;
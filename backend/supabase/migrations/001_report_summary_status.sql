@@ -0,0 +1,14 @@
+-- =============================================
+-- MIGRATION 001: Asynchronous AI summaries
+-- Adds reports.summary_status so summaries can be backfilled after the
+-- verification response (AI_SUMMARY_MODE=async)
+-- Safe to re-run
+-- =============================================
+
+ALTER TABLE public.reports
+    ADD COLUMN IF NOT EXISTS summary_status TEXT DEFAULT 'completed'; -- pending, completed, failed
+
+-- Lets the summary worker find pending reports on startup without scanning
+CREATE INDEX IF NOT EXISTS idx_reports_summary_pending
+    ON public.reports(created_at)
+    WHERE summary_status = 'pending';
@@ -0,0 +1,12 @@
+-- =============================================
+-- MIGRATION 002: Verification result cache audit columns
+-- Records whether a verification was served from the result cache and when
+-- the underlying Plan API response was fetched
+-- Safe to re-run
+-- =============================================
+
+ALTER TABLE public.verifications
+    ADD COLUMN IF NOT EXISTS cache_hit BOOLEAN DEFAULT FALSE;
+
+ALTER TABLE public.verifications
+    ADD COLUMN IF NOT EXISTS upstream_fetched_at TIMESTAMPTZ;
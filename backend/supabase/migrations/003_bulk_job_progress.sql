@@ -0,0 +1,11 @@
+-- =============================================
+-- MIGRATION 003: Bulk job execution
+-- Stores the CSV object path and the bulk worker's resume checkpoint
+-- Safe to re-run
+-- =============================================
+
+ALTER TABLE public.jobs
+    ADD COLUMN IF NOT EXISTS file_path TEXT;
+
+ALTER TABLE public.jobs
+    ADD COLUMN IF NOT EXISTS processed_count INTEGER DEFAULT 0;
@@ -0,0 +1,9 @@
+-- =============================================
+-- MIGRATION 004: Render-once report PDFs
+-- Stores the content fingerprint of each report's stored PDF so it is only
+-- re-rendered when the report, vendor, verification or branding changes
+-- Safe to re-run
+-- =============================================
+
+ALTER TABLE public.reports
+    ADD COLUMN IF NOT EXISTS pdf_hash TEXT;
@@ -0,0 +1,9 @@
+-- =============================================
+-- MIGRATION 005: Background report PDF pre-generation
+-- Per-org opt-in for rendering report PDFs right after verification
+-- (orgs with auto_save_reports and Drive connected are pre-generated too)
+-- Safe to re-run
+-- =============================================
+
+ALTER TABLE public.integrations
+    ADD COLUMN IF NOT EXISTS pregenerate_pdfs BOOLEAN DEFAULT FALSE;
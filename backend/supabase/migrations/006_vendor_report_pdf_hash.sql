@@ -0,0 +1,9 @@
+-- =============================================
+-- MIGRATION 006: Consolidated vendor report PDFs
+-- One stored PDF per vendor covering all of its checks; the fingerprint
+-- decides when it has to be re-rendered
+-- Safe to re-run
+-- =============================================
+
+ALTER TABLE public.vendors
+    ADD COLUMN IF NOT EXISTS report_pdf_hash TEXT;
@@ -0,0 +1,166 @@
+-- =============================================
+-- MIGRATION 007: Dashboard counters
+-- Per-org totals and per-org, per-month (IST) counters maintained by triggers
+-- on verifications/reports, read by get_dashboard_stats() in one call
+-- Safe to re-run (counters are rebuilt from the source tables)
+-- =============================================
+
+CREATE TABLE IF NOT EXISTS public.org_stats (
+    org_id UUID PRIMARY KEY REFERENCES public.orgs(id) ON DELETE CASCADE,
+    verifications BIGINT NOT NULL DEFAULT 0,
+    reports BIGINT NOT NULL DEFAULT 0,
+    high_risk_reports BIGINT NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS public.org_monthly_stats (
+    org_id UUID REFERENCES public.orgs(id) ON DELETE CASCADE NOT NULL,
+    month DATE NOT NULL, -- First day of the month, IST (credits reset on the same boundary)
+    verifications BIGINT NOT NULL DEFAULT 0,
+    reports BIGINT NOT NULL DEFAULT 0,
+    high_risk_reports BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (org_id, month)
+);
+
+ALTER TABLE public.org_stats ENABLE ROW LEVEL SECURITY;
+ALTER TABLE public.org_monthly_stats ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Org members can view stats" ON public.org_stats;
+CREATE POLICY "Org members can view stats" ON public.org_stats FOR SELECT USING (
+    org_id IN (SELECT org_id FROM public.profiles WHERE user_id = auth.uid())
+);
+
+DROP POLICY IF EXISTS "Org members can view monthly stats" ON public.org_monthly_stats;
+CREATE POLICY "Org members can view monthly stats" ON public.org_monthly_stats FOR SELECT USING (
+    org_id IN (SELECT org_id FROM public.profiles WHERE user_id = auth.uid())
+);
+
+-- Month bucket for a timestamp
+CREATE OR REPLACE FUNCTION public.stats_month(p_at TIMESTAMPTZ)
+RETURNS DATE AS $$
+    SELECT date_trunc('month', COALESCE(p_at, NOW()) AT TIME ZONE 'Asia/Kolkata')::date;
+$$ LANGUAGE sql STABLE;
+
+-- Apply deltas to an org's totals and one month
+CREATE OR REPLACE FUNCTION public.bump_org_stats(
+    p_org_id UUID,
+    p_month DATE,
+    p_verifications INTEGER,
+    p_reports INTEGER,
+    p_high_risk INTEGER
+)
+RETURNS void AS $$
+BEGIN
+    -- Rows removed by an org delete cascade; the counters go with the org
+    IF NOT EXISTS (SELECT 1 FROM public.orgs WHERE id = p_org_id) THEN
+        RETURN;
+    END IF;
+
+    INSERT INTO public.org_stats AS s (org_id, verifications, reports, high_risk_reports)
+    VALUES (p_org_id, p_verifications, p_reports, p_high_risk)
+    ON CONFLICT (org_id) DO UPDATE SET
+        verifications = s.verifications + EXCLUDED.verifications,
+        reports = s.reports + EXCLUDED.reports,
+        high_risk_reports = s.high_risk_reports + EXCLUDED.high_risk_reports;
+
+    INSERT INTO public.org_monthly_stats AS s (org_id, month, verifications, reports, high_risk_reports)
+    VALUES (p_org_id, p_month, p_verifications, p_reports, p_high_risk)
+    ON CONFLICT (org_id, month) DO UPDATE SET
+        verifications = s.verifications + EXCLUDED.verifications,
+        reports = s.reports + EXCLUDED.reports,
+        high_risk_reports = s.high_risk_reports + EXCLUDED.high_risk_reports;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+CREATE OR REPLACE FUNCTION public.count_verification()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM public.bump_org_stats(NEW.org_id, public.stats_month(NEW.created_at), 1, 0, 0);
+    ELSE
+        PERFORM public.bump_org_stats(OLD.org_id, public.stats_month(OLD.created_at), -1, 0, 0);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- Reports also move in and out of the high-risk count when a backfilled
+-- summary sets risk_level
+CREATE OR REPLACE FUNCTION public.count_report()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM public.bump_org_stats(NEW.org_id, public.stats_month(NEW.created_at), 0, 1,
+            CASE WHEN NEW.risk_level = 'HIGH' THEN 1 ELSE 0 END);
+    ELSIF TG_OP = 'DELETE' THEN
+        PERFORM public.bump_org_stats(OLD.org_id, public.stats_month(OLD.created_at), 0, -1,
+            CASE WHEN OLD.risk_level = 'HIGH' THEN -1 ELSE 0 END);
+    ELSIF (NEW.risk_level = 'HIGH') IS DISTINCT FROM (OLD.risk_level = 'HIGH') THEN
+        PERFORM public.bump_org_stats(NEW.org_id, public.stats_month(NEW.created_at), 0, 0,
+            CASE WHEN NEW.risk_level = 'HIGH' THEN 1 ELSE -1 END);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+DROP TRIGGER IF EXISTS on_verification_counted ON public.verifications;
+CREATE TRIGGER on_verification_counted
+    AFTER INSERT OR DELETE ON public.verifications
+    FOR EACH ROW EXECUTE FUNCTION public.count_verification();
+
+DROP TRIGGER IF EXISTS on_report_counted ON public.reports;
+CREATE TRIGGER on_report_counted
+    AFTER INSERT OR DELETE OR UPDATE OF risk_level ON public.reports
+    FOR EACH ROW EXECUTE FUNCTION public.count_report();
+
+-- Recompute all counters from the source tables (backfill / drift repair).
+-- Writes are blocked while it runs so no trigger delta is lost or double counted.
+CREATE OR REPLACE FUNCTION public.rebuild_org_stats()
+RETURNS void AS $$
+BEGIN
+    LOCK TABLE public.verifications, public.reports IN SHARE MODE;
+
+    DELETE FROM public.org_monthly_stats;
+    DELETE FROM public.org_stats;
+
+    INSERT INTO public.org_monthly_stats (org_id, month, verifications, reports, high_risk_reports)
+    SELECT org_id, month, SUM(verifications), SUM(reports), SUM(high_risk_reports)
+    FROM (
+        SELECT org_id, public.stats_month(created_at) AS month,
+            1 AS verifications, 0 AS reports, 0 AS high_risk_reports
+        FROM public.verifications
+        UNION ALL
+        SELECT org_id, public.stats_month(created_at),
+            0, 1, CASE WHEN risk_level = 'HIGH' THEN 1 ELSE 0 END
+        FROM public.reports
+    ) counted
+    GROUP BY org_id, month;
+
+    INSERT INTO public.org_stats (org_id, verifications, reports, high_risk_reports)
+    SELECT org_id, SUM(verifications), SUM(reports), SUM(high_risk_reports)
+    FROM public.org_monthly_stats
+    GROUP BY org_id;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+SELECT public.rebuild_org_stats();
+
+-- Dashboard stats: credits plus counters, three primary-key lookups
+CREATE OR REPLACE FUNCTION public.get_dashboard_stats(p_org_id UUID)
+RETURNS JSONB AS $$
+    SELECT jsonb_build_object(
+        'credits_remaining', c.current_balance,
+        'credits_total', c.monthly_limit,
+        'verifications_this_month', COALESCE(m.verifications, 0),
+        'total_reports', COALESCE(s.reports, 0),
+        'high_risk_vendors', COALESCE(s.high_risk_reports, 0)
+    )
+    FROM (SELECT p_org_id AS org_id) o
+    LEFT JOIN public.credits c ON c.org_id = o.org_id
+    LEFT JOIN public.org_stats s ON s.org_id = o.org_id
+    LEFT JOIN public.org_monthly_stats m ON m.org_id = o.org_id AND m.month = public.stats_month(NOW());
+$$ LANGUAGE sql STABLE SECURITY DEFINER;
+
+-- Internal helpers and cross-org reads are for the service role only
+REVOKE ALL ON FUNCTION public.bump_org_stats(UUID, DATE, INTEGER, INTEGER, INTEGER) FROM PUBLIC, anon, authenticated;
+REVOKE ALL ON FUNCTION public.rebuild_org_stats() FROM PUBLIC, anon, authenticated;
+REVOKE ALL ON FUNCTION public.get_dashboard_stats(UUID) FROM PUBLIC, anon, authenticated;
@@ -0,0 +1,18 @@
+-- =============================================
+-- MIGRATION 008: Reports listing indexes
+-- Composite indexes in the listing's (created_at DESC, id DESC) keyset order,
+-- so every page of GET /api/reports is an index range scan whatever the filters
+-- Safe to re-run
+-- =============================================
+
+-- Unfiltered listing, date range and cursor
+CREATE INDEX IF NOT EXISTS idx_reports_org_created
+    ON public.reports(org_id, created_at DESC, id DESC);
+
+-- risk_level filter
+CREATE INDEX IF NOT EXISTS idx_reports_org_risk_created
+    ON public.reports(org_id, risk_level, created_at DESC, id DESC);
+
+-- vendor filter
+CREATE INDEX IF NOT EXISTS idx_reports_vendor_created
+    ON public.reports(vendor_id, created_at DESC, id DESC);
@@ -0,0 +1,45 @@
+-- =============================================
+-- MIGRATION 009: Composite, partial and covering indexes for hot queries
+-- Each index matches one query shape; single-column indexes they make
+-- redundant are dropped. Check the plans with verify_indexes.py.
+-- Safe to re-run
+-- =============================================
+
+-- Jobs page: WHERE org_id = ? ORDER BY created_at DESC
+CREATE INDEX IF NOT EXISTS idx_jobs_org_created
+    ON public.jobs(org_id, created_at DESC);
+
+-- Bulk worker queue: pending jobs oldest first, and processing jobs whose lease expired
+CREATE INDEX IF NOT EXISTS idx_jobs_bulk_pending
+    ON public.jobs(created_at)
+    WHERE type = 'BULK_VERIFY' AND status = 'pending';
+
+CREATE INDEX IF NOT EXISTS idx_jobs_bulk_processing
+    ON public.jobs(updated_at)
+    WHERE type = 'BULK_VERIFY' AND status = 'processing';
+
+DROP INDEX IF EXISTS public.idx_jobs_org_id;
+DROP INDEX IF EXISTS public.idx_jobs_status;
+
+-- send_low_credit_alerts(): NOT EXISTS probe on (org_id, title, sent_at);
+-- every referenced column is in the key, so the probe is index-only
+CREATE INDEX IF NOT EXISTS idx_notifications_org_title_sent
+    ON public.notifications(org_id, title, sent_at DESC);
+
+-- cleanup_expired_reports(): only reports not saved to Drive are ever deleted
+CREATE INDEX IF NOT EXISTS idx_reports_expiring
+    ON public.reports(expires_at)
+    WHERE drive_file_id IS NULL;
+
+DROP INDEX IF EXISTS public.idx_reports_expires_at;
+
+-- Per-org report filters (org_id, risk_level) are served by
+-- idx_reports_org_risk_created (migration 008), which also covers high-risk
+-- counts as an index-only scan; idx_reports_org_created has org_id as its prefix
+DROP INDEX IF EXISTS public.idx_reports_org_id;
+
+-- Vendor report: a vendor's checks oldest first
+CREATE INDEX IF NOT EXISTS idx_verifications_vendor_created
+    ON public.verifications(vendor_id, created_at);
+
+DROP INDEX IF EXISTS public.idx_verifications_vendor_id;
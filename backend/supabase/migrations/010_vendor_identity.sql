@@ -0,0 +1,228 @@
+-- =============================================
+-- MIGRATION 010: Vendor identity
+-- One vendor per registration number per org: existing duplicates are merged
+-- (verifications and reports re-pointed to the oldest vendor), then unique
+-- indexes on the normalized GSTIN, PAN, CIN, TAN and Udyam numbers keep it
+-- that way. upsert_vendor() resolves new verifications onto existing vendors.
+-- Safe to re-run
+-- =============================================
+
+-- Registration numbers compare without case, spaces or punctuation
+CREATE OR REPLACE FUNCTION public.normalize_vendor_identifier(p_value TEXT)
+RETURNS TEXT AS $$
+    SELECT NULLIF(upper(regexp_replace(p_value, '[^A-Za-z0-9]', '', 'g')), '');
+$$ LANGUAGE sql IMMUTABLE;
+
+-- Merge vendors sharing a normalized identifier into the oldest of them.
+-- Repeats until stable, so chains (A~B on GSTIN, B~C on PAN) collapse too;
+-- a dry run only reports the first pass.
+CREATE OR REPLACE FUNCTION public.merge_duplicate_vendors(p_dry_run BOOLEAN DEFAULT FALSE)
+RETURNS TABLE (survivor_id UUID, merged_id UUID, matched_on TEXT) AS $$
+DECLARE
+    v_column TEXT;
+    v_group RECORD;
+    v_dup public.vendors%ROWTYPE;
+    v_merged INTEGER;
+BEGIN
+    LOOP
+        v_merged := 0;
+
+        FOREACH v_column IN ARRAY ARRAY['gstin', 'pan', 'cin', 'tan', 'udyam'] LOOP
+            FOR v_group IN EXECUTE format(
+                'SELECT array_agg(id ORDER BY created_at, id) AS ids
+                 FROM public.vendors
+                 WHERE public.normalize_vendor_identifier(%1$I) IS NOT NULL
+                 GROUP BY org_id, public.normalize_vendor_identifier(%1$I)
+                 HAVING count(*) > 1', v_column)
+            LOOP
+                FOR i IN 2 .. array_length(v_group.ids, 1) LOOP
+                    survivor_id := v_group.ids[1];
+                    merged_id := v_group.ids[i];
+                    matched_on := v_column;
+                    RETURN NEXT;
+
+                    CONTINUE WHEN p_dry_run;
+
+                    UPDATE public.verifications SET vendor_id = survivor_id WHERE vendor_id = merged_id;
+                    UPDATE public.reports SET vendor_id = survivor_id WHERE vendor_id = merged_id;
+
+                    -- Delete first so copying its identifiers can't collide with itself
+                    DELETE FROM public.vendors WHERE id = merged_id RETURNING * INTO v_dup;
+
+                    BEGIN
+                        UPDATE public.vendors SET
+                            gstin = COALESCE(gstin, v_dup.gstin),
+                            pan = COALESCE(pan, v_dup.pan),
+                            cin = COALESCE(cin, v_dup.cin),
+                            din = COALESCE(din, v_dup.din),
+                            tan = COALESCE(tan, v_dup.tan),
+                            tin = COALESCE(tin, v_dup.tin),
+                            udyam = COALESCE(udyam, v_dup.udyam),
+                            rc = COALESCE(rc, v_dup.rc),
+                            upi = COALESCE(upi, v_dup.upi),
+                            dl = COALESCE(dl, v_dup.dl),
+                            aadhaar_masked = COALESCE(aadhaar_masked, v_dup.aadhaar_masked),
+                            bank_account_last4 = COALESCE(bank_account_last4, v_dup.bank_account_last4),
+                            passport_no_masked = COALESCE(passport_no_masked, v_dup.passport_no_masked),
+                            notes = COALESCE(notes, v_dup.notes),
+                            report_pdf_hash = NULL -- Its consolidated report now covers more checks
+                        WHERE id = survivor_id;
+                    EXCEPTION WHEN unique_violation THEN
+                        -- An identifier of the merged vendor belongs to a third vendor; a later pass merges that one
+                        UPDATE public.vendors SET report_pdf_hash = NULL WHERE id = survivor_id;
+                    END;
+
+                    INSERT INTO public.audit_logs (org_id, action, target_type, target_id, details)
+                    VALUES (v_dup.org_id, 'VENDOR_MERGED', 'VENDOR', survivor_id,
+                        jsonb_build_object('merged_vendor_id', merged_id, 'merged_vendor_name', v_dup.name, 'matched_on', v_column));
+
+                    v_merged := v_merged + 1;
+                END LOOP;
+            END LOOP;
+        END LOOP;
+
+        EXIT WHEN p_dry_run OR v_merged = 0;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- Existing data: store identifiers trimmed and upper-cased, then merge
+UPDATE public.vendors SET
+    gstin = NULLIF(upper(btrim(gstin)), ''),
+    pan = NULLIF(upper(btrim(pan)), ''),
+    cin = NULLIF(upper(btrim(cin)), ''),
+    tan = NULLIF(upper(btrim(tan)), ''),
+    udyam = NULLIF(upper(btrim(udyam)), '')
+WHERE gstin IS DISTINCT FROM NULLIF(upper(btrim(gstin)), '')
+    OR pan IS DISTINCT FROM NULLIF(upper(btrim(pan)), '')
+    OR cin IS DISTINCT FROM NULLIF(upper(btrim(cin)), '')
+    OR tan IS DISTINCT FROM NULLIF(upper(btrim(tan)), '')
+    OR udyam IS DISTINCT FROM NULLIF(upper(btrim(udyam)), '');
+
+SELECT count(*) AS merged_vendors FROM public.merge_duplicate_vendors();
+
+CREATE UNIQUE INDEX IF NOT EXISTS uq_vendors_org_gstin
+    ON public.vendors(org_id, public.normalize_vendor_identifier(gstin));
+CREATE UNIQUE INDEX IF NOT EXISTS uq_vendors_org_pan
+    ON public.vendors(org_id, public.normalize_vendor_identifier(pan));
+CREATE UNIQUE INDEX IF NOT EXISTS uq_vendors_org_cin
+    ON public.vendors(org_id, public.normalize_vendor_identifier(cin));
+CREATE UNIQUE INDEX IF NOT EXISTS uq_vendors_org_tan
+    ON public.vendors(org_id, public.normalize_vendor_identifier(tan));
+CREATE UNIQUE INDEX IF NOT EXISTS uq_vendors_org_udyam
+    ON public.vendors(org_id, public.normalize_vendor_identifier(udyam));
+
+-- Find or create the vendor for a set of identifiers. Matches on any of the
+-- unique identifiers (oldest vendor wins), fills in identifiers the vendor was
+-- missing, and inserts a new vendor otherwise. Returns whether it was created.
+CREATE OR REPLACE FUNCTION public.upsert_vendor(
+    p_org_id UUID,
+    p_name TEXT,
+    p_identifiers JSONB DEFAULT '{}'::jsonb
+)
+RETURNS TABLE (vendor_id UUID, created BOOLEAN) AS $$
+DECLARE
+    v_id UUID;
+    v_gstin TEXT := NULLIF(upper(btrim(p_identifiers->>'gstin')), '');
+    v_pan TEXT := NULLIF(upper(btrim(p_identifiers->>'pan')), '');
+    v_cin TEXT := NULLIF(upper(btrim(p_identifiers->>'cin')), '');
+    v_tan TEXT := NULLIF(upper(btrim(p_identifiers->>'tan')), '');
+    v_udyam TEXT := NULLIF(upper(btrim(p_identifiers->>'udyam')), '');
+    v_din TEXT := NULLIF(btrim(p_identifiers->>'din'), '');
+    v_tin TEXT := NULLIF(btrim(p_identifiers->>'tin'), '');
+    v_rc TEXT := NULLIF(btrim(p_identifiers->>'rc'), '');
+    v_upi TEXT := NULLIF(btrim(p_identifiers->>'upi'), '');
+    v_dl TEXT := NULLIF(btrim(p_identifiers->>'dl'), '');
+BEGIN
+    LOOP
+        -- One probe per unique index; a NULL identifier matches nothing
+        SELECT m.id INTO v_id FROM (
+            SELECT id, created_at FROM public.vendors
+                WHERE org_id = p_org_id AND public.normalize_vendor_identifier(gstin) = public.normalize_vendor_identifier(v_gstin)
+            UNION ALL
+            SELECT id, created_at FROM public.vendors
+                WHERE org_id = p_org_id AND public.normalize_vendor_identifier(pan) = public.normalize_vendor_identifier(v_pan)
+            UNION ALL
+            SELECT id, created_at FROM public.vendors
+                WHERE org_id = p_org_id AND public.normalize_vendor_identifier(cin) = public.normalize_vendor_identifier(v_cin)
+            UNION ALL
+            SELECT id, created_at FROM public.vendors
+                WHERE org_id = p_org_id AND public.normalize_vendor_identifier(tan) = public.normalize_vendor_identifier(v_tan)
+            UNION ALL
+            SELECT id, created_at FROM public.vendors
+                WHERE org_id = p_org_id AND public.normalize_vendor_identifier(udyam) = public.normalize_vendor_identifier(v_udyam)
+        ) m
+        ORDER BY m.created_at, m.id
+        LIMIT 1;
+
+        IF v_id IS NOT NULL THEN
+            BEGIN
+                UPDATE public.vendors SET
+                    gstin = COALESCE(gstin, v_gstin),
+                    pan = COALESCE(pan, v_pan),
+                    cin = COALESCE(cin, v_cin),
+                    tan = COALESCE(tan, v_tan),
+                    udyam = COALESCE(udyam, v_udyam),
+                    din = COALESCE(din, v_din),
+                    tin = COALESCE(tin, v_tin),
+                    rc = COALESCE(rc, v_rc),
+                    upi = COALESCE(upi, v_upi),
+                    dl = COALESCE(dl, v_dl)
+                WHERE id = v_id
+                    AND (gstin IS NULL AND v_gstin IS NOT NULL
+                        OR pan IS NULL AND v_pan IS NOT NULL
+                        OR cin IS NULL AND v_cin IS NOT NULL
+                        OR tan IS NULL AND v_tan IS NOT NULL
+                        OR udyam IS NULL AND v_udyam IS NOT NULL
+                        OR din IS NULL AND v_din IS NOT NULL
+                        OR tin IS NULL AND v_tin IS NOT NULL
+                        OR rc IS NULL AND v_rc IS NOT NULL
+                        OR upi IS NULL AND v_upi IS NOT NULL
+                        OR dl IS NULL AND v_dl IS NOT NULL);
+            EXCEPTION WHEN unique_violation THEN
+                -- One of the new identifiers belongs to another vendor; leave both as they are
+                NULL;
+            END;
+
+            RETURN QUERY SELECT v_id, FALSE;
+            RETURN;
+        END IF;
+
+        BEGIN
+            INSERT INTO public.vendors (org_id, name, gstin, pan, cin, tan, udyam, din, tin, rc, upi, dl)
+            VALUES (p_org_id, p_name, v_gstin, v_pan, v_cin, v_tan, v_udyam, v_din, v_tin, v_rc, v_upi, v_dl)
+            RETURNING id INTO v_id;
+
+            RETURN QUERY SELECT v_id, TRUE;
+            RETURN;
+        EXCEPTION WHEN unique_violation THEN
+            -- Created concurrently by another verification; the next probe finds it
+            v_id := NULL;
+        END;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- Undo upsert_vendor() for a vendor whose first verification failed, unless
+-- another verification has attached to it in the meantime
+CREATE OR REPLACE FUNCTION public.discard_new_vendor(p_vendor_id UUID)
+RETURNS BOOLEAN AS $$
+BEGIN
+    -- The row lock conflicts with the FK check of a verification insert in
+    -- flight for this vendor, so one that commits first is seen below. It does
+    -- not protect verifications that resolved the vendor but haven't inserted
+    -- yet: their insert fails with 23503 and run_verification resolves again.
+    PERFORM 1 FROM public.vendors WHERE id = p_vendor_id FOR UPDATE;
+
+    IF EXISTS (SELECT 1 FROM public.verifications WHERE vendor_id = p_vendor_id) THEN
+        RETURN FALSE;
+    END IF;
+
+    DELETE FROM public.vendors WHERE id = p_vendor_id;
+    RETURN FOUND;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+REVOKE ALL ON FUNCTION public.merge_duplicate_vendors(BOOLEAN) FROM PUBLIC, anon, authenticated;
+REVOKE ALL ON FUNCTION public.upsert_vendor(UUID, TEXT, JSONB) FROM PUBLIC, anon, authenticated;
+REVOKE ALL ON FUNCTION public.discard_new_vendor(UUID) FROM PUBLIC, anon, authenticated;
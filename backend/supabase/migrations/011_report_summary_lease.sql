@@ -0,0 +1,18 @@
+-- =============================================
+-- MIGRATION 011: Summary claims
+-- The summary worker claims a report (pending -> processing) before calling
+-- the LLM, so with several processes each summary is computed once. Claims
+-- older than the lease are taken over; reports are marked failed after
+-- AI_SUMMARY_MAX_ATTEMPTS claims.
+-- Safe to re-run
+-- =============================================
+
+ALTER TABLE public.reports
+    ADD COLUMN IF NOT EXISTS summary_attempts INTEGER NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS summary_claimed_at TIMESTAMPTZ;
+
+-- Recovery passes scan pending and claimed reports only
+DROP INDEX IF EXISTS public.idx_reports_summary_pending;
+CREATE INDEX IF NOT EXISTS idx_reports_summary_in_progress
+    ON public.reports(created_at)
+    WHERE summary_status IN ('pending', 'processing');
@@ -0,0 +1,10 @@
+-- =============================================
+-- MIGRATION 012: Bulk job leases
+-- Each claim of a bulk job stores a fresh lease token. The bulk worker only
+-- writes progress where the token still matches, so a worker whose lease
+-- was taken over can't overwrite the new holder's checkpoints.
+-- Safe to re-run
+-- =============================================
+
+ALTER TABLE public.jobs
+    ADD COLUMN IF NOT EXISTS lease_token UUID;
@@ -0,0 +1,13 @@
+-- =============================================
+-- MIGRATION 013: Covering index for the reports listing
+-- Replaces idx_reports_org_created with the same keyset-ordered key plus
+-- every column GET /api/reports projects (REPORT_LIST_COLUMNS), so an
+-- unfiltered page is an index-only scan on an all-visible table.
+-- Safe to re-run
+-- =============================================
+
+CREATE INDEX IF NOT EXISTS idx_reports_org_listing
+    ON public.reports(org_id, created_at DESC, id DESC)
+    INCLUDE (vendor_id, verification_id, risk_level, summary_status, pdf_url, drive_file_id, expires_at);
+
+DROP INDEX IF EXISTS public.idx_reports_org_created;
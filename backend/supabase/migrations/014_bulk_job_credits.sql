@@ -0,0 +1,89 @@
+-- =============================================
+-- MIGRATION 014: Crash-safe bulk job credits
+-- Bulk jobs reserve credits through reserve_job_credits(), which records the
+-- reservation on the job in the same transaction as the deduction. Their
+-- verifications carry job_id and row_number, so the credits a job actually
+-- used are its verifications that got a report. refund_job_credits() returns
+-- whatever is reserved beyond that, so credits stranded by a crashed worker are
+-- refunded when another worker takes the job over, and rows verified before the
+-- crash are skipped on resume instead of being charged again.
+-- Safe to re-run
+-- =============================================
+
+ALTER TABLE public.jobs
+    ADD COLUMN IF NOT EXISTS credits_reserved INTEGER NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS credits_refunded INTEGER NOT NULL DEFAULT 0;
+
+ALTER TABLE public.verifications
+    ADD COLUMN IF NOT EXISTS job_id UUID REFERENCES public.jobs(id) ON DELETE SET NULL,
+    ADD COLUMN IF NOT EXISTS row_number INTEGER;
+
+-- Resume check (a job's rows in a range) and the used-credit count
+CREATE INDEX IF NOT EXISTS idx_verifications_job_row
+    ON public.verifications(job_id, row_number)
+    WHERE job_id IS NOT NULL;
+
+-- Reserve credits for a bulk job. The job row is locked first (as in
+-- refund_job_credits) so concurrent reserves and refunds can't deadlock.
+CREATE OR REPLACE FUNCTION public.reserve_job_credits(
+    p_job_id UUID,
+    p_amount INTEGER,
+    p_reason TEXT DEFAULT NULL
+)
+RETURNS BOOLEAN AS $$
+DECLARE
+    v_job public.jobs%ROWTYPE;
+BEGIN
+    SELECT * INTO v_job FROM public.jobs WHERE id = p_job_id FOR UPDATE;
+    IF NOT FOUND THEN
+        RETURN FALSE;
+    END IF;
+
+    IF NOT public.deduct_credits(v_job.org_id, p_amount, v_job.user_id, COALESCE(p_reason, 'BULK_VERIFY ' || p_job_id)) THEN
+        RETURN FALSE;
+    END IF;
+
+    UPDATE public.jobs SET credits_reserved = credits_reserved + p_amount WHERE id = p_job_id;
+    RETURN TRUE;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- Refund a bulk job's unused credits: at most p_amount (all of them when NULL),
+-- never more than reserved minus refunded minus used. Returns the amount refunded.
+CREATE OR REPLACE FUNCTION public.refund_job_credits(
+    p_job_id UUID,
+    p_amount INTEGER DEFAULT NULL,
+    p_reason TEXT DEFAULT NULL
+)
+RETURNS INTEGER AS $$
+DECLARE
+    v_job public.jobs%ROWTYPE;
+    v_used INTEGER;
+    v_refund INTEGER;
+BEGIN
+    SELECT * INTO v_job FROM public.jobs WHERE id = p_job_id FOR UPDATE;
+    IF NOT FOUND THEN
+        RETURN 0;
+    END IF;
+
+    SELECT count(*) INTO v_used
+    FROM public.verifications v
+    JOIN public.reports r ON r.verification_id = v.id
+    WHERE v.job_id = p_job_id;
+
+    v_refund := GREATEST(0, v_job.credits_reserved - v_job.credits_refunded - v_used);
+    IF p_amount IS NOT NULL THEN
+        v_refund := LEAST(v_refund, p_amount);
+    END IF;
+    IF v_refund = 0 THEN
+        RETURN 0;
+    END IF;
+
+    UPDATE public.jobs SET credits_refunded = credits_refunded + v_refund WHERE id = p_job_id;
+    PERFORM public.refund_credits(v_job.org_id, v_refund, v_job.user_id, COALESCE(p_reason, 'BULK_VERIFY ' || p_job_id || ' (refund)'));
+    RETURN v_refund;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+REVOKE ALL ON FUNCTION public.reserve_job_credits(UUID, INTEGER, TEXT) FROM PUBLIC, anon, authenticated;
+REVOKE ALL ON FUNCTION public.refund_job_credits(UUID, INTEGER, TEXT) FROM PUBLIC, anon, authenticated;
@@ -1,7 +1,7 @@
 -- =============================================
 -- RAVONO VENDOR COMPLIANCE PLATFORM
 -- Complete Database Schema for Supabase
--- 16 Tables with RLS, Triggers, and Indexes
+-- 18 Tables with RLS, Triggers, and Indexes
 -- =============================================
 
 -- Enable necessary extensions
@@ -96,7 +96,7 @@ CREATE TABLE IF NOT EXISTS public.credit_logs (
     id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
     org_id UUID REFERENCES public.orgs(id) ON DELETE CASCADE NOT NULL,
     user_id UUID REFERENCES auth.users(id) ON DELETE SET NULL,
-    type TEXT NOT NULL, -- ADD, DEDUCT, RESET, ADMIN_ADJUSTMENT
+    type TEXT NOT NULL, -- ADD, DEDUCT, REFUND, RESET, ADMIN_ADJUSTMENT
     amount INTEGER NOT NULL,
     balance_after INTEGER NOT NULL,
     reason TEXT,
@@ -124,6 +124,7 @@ CREATE TABLE IF NOT EXISTS public.vendors (
     upi TEXT,
     dl TEXT,
     notes TEXT,
+    report_pdf_hash TEXT, -- Content fingerprint of the stored consolidated vendor report PDF
     created_at TIMESTAMPTZ DEFAULT NOW(),
     updated_at TIMESTAMPTZ DEFAULT NOW()
 );
@@ -140,6 +141,8 @@ CREATE TABLE IF NOT EXISTS public.verifications (
     raw_response JSONB,
     status TEXT DEFAULT 'pending', -- pending, success, failed
     risk_level TEXT, -- LOW, MEDIUM, HIGH
+    cache_hit BOOLEAN DEFAULT FALSE, -- served from the verification result cache
+    upstream_fetched_at TIMESTAMPTZ, -- when the Plan API actually returned raw_response
     performed_by UUID REFERENCES auth.users(id) ON DELETE SET NULL,
     created_at TIMESTAMPTZ DEFAULT NOW()
 );
@@ -154,7 +157,11 @@ CREATE TABLE IF NOT EXISTS public.reports (
     verification_id UUID REFERENCES public.verifications(id) ON DELETE CASCADE,
     summary_text TEXT, -- AI-generated summary from Perplexity
     risk_level TEXT, -- LOW, MEDIUM, HIGH
+    summary_status TEXT DEFAULT 'completed', -- pending, processing, completed, failed
+    summary_attempts INTEGER NOT NULL DEFAULT 0, -- Summary worker claims so far
+    summary_claimed_at TIMESTAMPTZ, -- Lease start of the current claim
     pdf_url TEXT,
+    pdf_hash TEXT, -- Content fingerprint of the stored PDF (re-rendered when it changes)
     drive_file_id TEXT,
     expires_at TIMESTAMPTZ DEFAULT NOW() + INTERVAL '7 days',
     created_at TIMESTAMPTZ DEFAULT NOW()
@@ -193,15 +200,25 @@ CREATE TABLE IF NOT EXISTS public.jobs (
     type TEXT DEFAULT 'BULK_VERIFY',
     job_name TEXT,
     file_url TEXT,
+    file_path TEXT, -- object path in the bulk-uploads bucket
     status TEXT DEFAULT 'pending', -- pending, processing, completed, failed
     total_count INTEGER DEFAULT 0,
+    processed_count INTEGER DEFAULT 0, -- rows checkpointed by the bulk worker (resume point)
     success_count INTEGER DEFAULT 0,
     error_count INTEGER DEFAULT 0,
     error_details JSONB,
+    lease_token UUID, -- Set by each bulk worker claim; progress writes must match it
+    credits_reserved INTEGER NOT NULL DEFAULT 0, -- Deducted through reserve_job_credits()
+    credits_refunded INTEGER NOT NULL DEFAULT 0, -- Returned through refund_job_credits()
     created_at TIMESTAMPTZ DEFAULT NOW(),
-    updated_at TIMESTAMPTZ DEFAULT NOW()
+    updated_at TIMESTAMPTZ DEFAULT NOW() -- Lease heartbeat while processing
 );
 
+-- Bulk verifications point back at their job row (declared here, after jobs)
+ALTER TABLE public.verifications
+    ADD COLUMN IF NOT EXISTS job_id UUID REFERENCES public.jobs(id) ON DELETE SET NULL,
+    ADD COLUMN IF NOT EXISTS row_number INTEGER;
+
 -- =============================================
 -- 12. INTEGRATIONS TABLE
 -- =============================================
@@ -213,6 +230,7 @@ CREATE TABLE IF NOT EXISTS public.integrations (
     google_token_encrypted TEXT,
     google_refresh_token_encrypted TEXT,
     auto_save_reports BOOLEAN DEFAULT FALSE,
+    pregenerate_pdfs BOOLEAN DEFAULT FALSE, -- Render report PDFs in the background right after verification
     created_at TIMESTAMPTZ DEFAULT NOW(),
     updated_at TIMESTAMPTZ DEFAULT NOW()
 );
@@ -276,6 +294,28 @@ CREATE TABLE IF NOT EXISTS public.audit_logs (
     created_at TIMESTAMPTZ DEFAULT NOW()
 );
 
+-- =============================================
+-- 17. ORG_STATS TABLE (Dashboard counters, maintained by triggers)
+-- =============================================
+CREATE TABLE IF NOT EXISTS public.org_stats (
+    org_id UUID PRIMARY KEY REFERENCES public.orgs(id) ON DELETE CASCADE,
+    verifications BIGINT NOT NULL DEFAULT 0,
+    reports BIGINT NOT NULL DEFAULT 0,
+    high_risk_reports BIGINT NOT NULL DEFAULT 0
+);
+
+-- =============================================
+-- 18. ORG_MONTHLY_STATS TABLE (Per-month dashboard counters)
+-- =============================================
+CREATE TABLE IF NOT EXISTS public.org_monthly_stats (
+    org_id UUID REFERENCES public.orgs(id) ON DELETE CASCADE NOT NULL,
+    month DATE NOT NULL, -- First day of the month, IST (credits reset on the same boundary)
+    verifications BIGINT NOT NULL DEFAULT 0,
+    reports BIGINT NOT NULL DEFAULT 0,
+    high_risk_reports BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (org_id, month)
+);
+
 -- =============================================
 -- CREATE INDEXES FOR PERFORMANCE
 -- =============================================
@@ -285,14 +325,35 @@ CREATE INDEX idx_subscriptions_org_id ON public.subscriptions(org_id);
 CREATE INDEX idx_credits_org_id ON public.credits(org_id);
 CREATE INDEX idx_vendors_org_id ON public.vendors(org_id);
 CREATE INDEX idx_verifications_org_id ON public.verifications(org_id);
-CREATE INDEX idx_verifications_vendor_id ON public.verifications(vendor_id);
-CREATE INDEX idx_reports_org_id ON public.reports(org_id);
-CREATE INDEX idx_reports_expires_at ON public.reports(expires_at);
-CREATE INDEX idx_jobs_org_id ON public.jobs(org_id);
-CREATE INDEX idx_jobs_status ON public.jobs(status);
+CREATE INDEX idx_verifications_vendor_created ON public.verifications(vendor_id, created_at);
+CREATE INDEX idx_verifications_job_row ON public.verifications(job_id, row_number) WHERE job_id IS NOT NULL;
+CREATE INDEX idx_reports_expiring ON public.reports(expires_at) WHERE drive_file_id IS NULL;
+CREATE INDEX idx_reports_summary_in_progress ON public.reports(created_at) WHERE summary_status IN ('pending', 'processing');
+-- Covers the reports listing projection (REPORT_LIST_COLUMNS) for index-only pages
+CREATE INDEX idx_reports_org_listing ON public.reports(org_id, created_at DESC, id DESC)
+    INCLUDE (vendor_id, verification_id, risk_level, summary_status, pdf_url, drive_file_id, expires_at);
+CREATE INDEX idx_reports_org_risk_created ON public.reports(org_id, risk_level, created_at DESC, id DESC);
+CREATE INDEX idx_reports_vendor_created ON public.reports(vendor_id, created_at DESC, id DESC);
+CREATE INDEX idx_jobs_org_created ON public.jobs(org_id, created_at DESC);
+CREATE INDEX idx_jobs_bulk_pending ON public.jobs(created_at) WHERE type = 'BULK_VERIFY' AND status = 'pending';
+CREATE INDEX idx_jobs_bulk_processing ON public.jobs(updated_at) WHERE type = 'BULK_VERIFY' AND status = 'processing';
 CREATE INDEX idx_notifications_user_id ON public.notifications(user_id);
+CREATE INDEX idx_notifications_org_title_sent ON public.notifications(org_id, title, sent_at DESC);
 CREATE INDEX idx_audit_logs_org_id ON public.audit_logs(org_id);
 
+-- Vendor identity: one vendor per normalized registration number per org
+-- Registration numbers compare without case, spaces or punctuation
+CREATE OR REPLACE FUNCTION public.normalize_vendor_identifier(p_value TEXT)
+RETURNS TEXT AS $$
+    SELECT NULLIF(upper(regexp_replace(p_value, '[^A-Za-z0-9]', '', 'g')), '');
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE UNIQUE INDEX uq_vendors_org_gstin ON public.vendors(org_id, public.normalize_vendor_identifier(gstin));
+CREATE UNIQUE INDEX uq_vendors_org_pan ON public.vendors(org_id, public.normalize_vendor_identifier(pan));
+CREATE UNIQUE INDEX uq_vendors_org_cin ON public.vendors(org_id, public.normalize_vendor_identifier(cin));
+CREATE UNIQUE INDEX uq_vendors_org_tan ON public.vendors(org_id, public.normalize_vendor_identifier(tan));
+CREATE UNIQUE INDEX uq_vendors_org_udyam ON public.vendors(org_id, public.normalize_vendor_identifier(udyam));
+
 -- =============================================
 -- ROW LEVEL SECURITY (RLS) POLICIES
 -- =============================================
@@ -313,6 +374,8 @@ ALTER TABLE public.suggestions ENABLE ROW LEVEL SECURITY;
 ALTER TABLE public.testimonials ENABLE ROW LEVEL SECURITY;
 ALTER TABLE public.notifications ENABLE ROW LEVEL SECURITY;
 ALTER TABLE public.audit_logs ENABLE ROW LEVEL SECURITY;
+ALTER TABLE public.org_stats ENABLE ROW LEVEL SECURITY;
+ALTER TABLE public.org_monthly_stats ENABLE ROW LEVEL SECURITY;
 
 -- Plans table is public (read-only)
 ALTER TABLE public.plans ENABLE ROW LEVEL SECURITY;
@@ -424,6 +487,14 @@ CREATE POLICY "Org members can view audit logs" ON public.audit_logs FOR SELECT
     org_id IN (SELECT org_id FROM public.profiles WHERE user_id = auth.uid())
 );
 
+-- Org Stats: Org members can view
+CREATE POLICY "Org members can view stats" ON public.org_stats FOR SELECT USING (
+    org_id IN (SELECT org_id FROM public.profiles WHERE user_id = auth.uid())
+);
+CREATE POLICY "Org members can view monthly stats" ON public.org_monthly_stats FOR SELECT USING (
+    org_id IN (SELECT org_id FROM public.profiles WHERE user_id = auth.uid())
+);
+
 -- Admin bypass policies
 CREATE POLICY "Admins can view all profiles" ON public.profiles FOR SELECT USING (
     EXISTS (SELECT 1 FROM public.profiles WHERE user_id = auth.uid() AND is_admin = true)
@@ -489,6 +560,11 @@ CREATE TRIGGER on_auth_user_created
 CREATE OR REPLACE FUNCTION public.log_credit_change()
 RETURNS TRIGGER AS $$
 BEGIN
+    -- deduct_credits/refund_credits log their own entries
+    IF current_setting('ravono.credit_logged', true) = 'on' THEN
+        RETURN NEW;
+    END IF;
+
     IF (TG_OP = 'UPDATE' AND OLD.current_balance != NEW.current_balance) THEN
         INSERT INTO public.credit_logs (org_id, type, amount, balance_after, reason)
         VALUES (
@@ -646,26 +722,464 @@ BEGIN
 END;
 $$ LANGUAGE plpgsql SECURITY DEFINER;
 
--- Function: Deduct credits
-CREATE OR REPLACE FUNCTION public.deduct_credits(p_org_id UUID, p_amount INTEGER DEFAULT 1)
+-- Function: Deduct credits (atomic reservation; logs the change in the same transaction)
+DROP FUNCTION IF EXISTS public.deduct_credits(UUID, INTEGER);
+CREATE OR REPLACE FUNCTION public.deduct_credits(
+    p_org_id UUID,
+    p_amount INTEGER DEFAULT 1,
+    p_user_id UUID DEFAULT NULL,
+    p_reason TEXT DEFAULT NULL
+)
 RETURNS BOOLEAN AS $$
 DECLARE
-    current_credits INTEGER;
+    new_balance INTEGER;
 BEGIN
-    SELECT current_balance INTO current_credits FROM public.credits WHERE org_id = p_org_id FOR UPDATE;
+    -- Skip the generic on_credit_change log; this function writes a richer entry
+    PERFORM set_config('ravono.credit_logged', 'on', true);
+
+    UPDATE public.credits
+    SET current_balance = current_balance - p_amount
+    WHERE org_id = p_org_id
+        AND current_balance >= p_amount
+    RETURNING current_balance INTO new_balance;
     
-    IF current_credits < p_amount THEN
+    IF NOT FOUND THEN
+        PERFORM set_config('ravono.credit_logged', 'off', true);
         RETURN FALSE;
     END IF;
-    
-    UPDATE public.credits 
-    SET current_balance = current_balance - p_amount
-    WHERE org_id = p_org_id;
-    
+
+    INSERT INTO public.credit_logs (org_id, user_id, type, amount, balance_after, reason)
+    VALUES (p_org_id, p_user_id, 'DEDUCT', p_amount, new_balance, COALESCE(p_reason, 'Credit deduction'));
+
+    PERFORM set_config('ravono.credit_logged', 'off', true);
+    RETURN TRUE;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- Function: Refund credits (returns unused reservations)
+CREATE OR REPLACE FUNCTION public.refund_credits(
+    p_org_id UUID,
+    p_amount INTEGER,
+    p_user_id UUID DEFAULT NULL,
+    p_reason TEXT DEFAULT NULL
+)
+RETURNS INTEGER AS $$
+DECLARE
+    new_balance INTEGER;
+BEGIN
+    PERFORM set_config('ravono.credit_logged', 'on', true);
+
+    UPDATE public.credits
+    SET current_balance = current_balance + p_amount
+    WHERE org_id = p_org_id
+    RETURNING current_balance INTO new_balance;
+
+    IF FOUND THEN
+        INSERT INTO public.credit_logs (org_id, user_id, type, amount, balance_after, reason)
+        VALUES (p_org_id, p_user_id, 'REFUND', p_amount, new_balance, COALESCE(p_reason, 'Credit refund'));
+    END IF;
+
+    PERFORM set_config('ravono.credit_logged', 'off', true);
+    RETURN new_balance;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- Balances only change through the backend (service role)
+REVOKE ALL ON FUNCTION public.deduct_credits(UUID, INTEGER, UUID, TEXT) FROM PUBLIC, anon, authenticated;
+REVOKE ALL ON FUNCTION public.refund_credits(UUID, INTEGER, UUID, TEXT) FROM PUBLIC, anon, authenticated;
+
+-- Reserve credits for a bulk job. The job row is locked first (as in
+-- refund_job_credits) so concurrent reserves and refunds can't deadlock.
+CREATE OR REPLACE FUNCTION public.reserve_job_credits(
+    p_job_id UUID,
+    p_amount INTEGER,
+    p_reason TEXT DEFAULT NULL
+)
+RETURNS BOOLEAN AS $$
+DECLARE
+    v_job public.jobs%ROWTYPE;
+BEGIN
+    SELECT * INTO v_job FROM public.jobs WHERE id = p_job_id FOR UPDATE;
+    IF NOT FOUND THEN
+        RETURN FALSE;
+    END IF;
+
+    IF NOT public.deduct_credits(v_job.org_id, p_amount, v_job.user_id, COALESCE(p_reason, 'BULK_VERIFY ' || p_job_id)) THEN
+        RETURN FALSE;
+    END IF;
+
+    UPDATE public.jobs SET credits_reserved = credits_reserved + p_amount WHERE id = p_job_id;
     RETURN TRUE;
 END;
 $$ LANGUAGE plpgsql SECURITY DEFINER;
 
+-- Refund a bulk job's unused credits: at most p_amount (all of them when NULL),
+-- never more than reserved minus refunded minus used. Returns the amount refunded.
+CREATE OR REPLACE FUNCTION public.refund_job_credits(
+    p_job_id UUID,
+    p_amount INTEGER DEFAULT NULL,
+    p_reason TEXT DEFAULT NULL
+)
+RETURNS INTEGER AS $$
+DECLARE
+    v_job public.jobs%ROWTYPE;
+    v_used INTEGER;
+    v_refund INTEGER;
+BEGIN
+    SELECT * INTO v_job FROM public.jobs WHERE id = p_job_id FOR UPDATE;
+    IF NOT FOUND THEN
+        RETURN 0;
+    END IF;
+
+    SELECT count(*) INTO v_used
+    FROM public.verifications v
+    JOIN public.reports r ON r.verification_id = v.id
+    WHERE v.job_id = p_job_id;
+
+    v_refund := GREATEST(0, v_job.credits_reserved - v_job.credits_refunded - v_used);
+    IF p_amount IS NOT NULL THEN
+        v_refund := LEAST(v_refund, p_amount);
+    END IF;
+    IF v_refund = 0 THEN
+        RETURN 0;
+    END IF;
+
+    UPDATE public.jobs SET credits_refunded = credits_refunded + v_refund WHERE id = p_job_id;
+    PERFORM public.refund_credits(v_job.org_id, v_refund, v_job.user_id, COALESCE(p_reason, 'BULK_VERIFY ' || p_job_id || ' (refund)'));
+    RETURN v_refund;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+REVOKE ALL ON FUNCTION public.reserve_job_credits(UUID, INTEGER, TEXT) FROM PUBLIC, anon, authenticated;
+REVOKE ALL ON FUNCTION public.refund_job_credits(UUID, INTEGER, TEXT) FROM PUBLIC, anon, authenticated;
+
+-- =============================================
+-- DASHBOARD COUNTERS
+-- =============================================
+
+-- Month bucket for a timestamp
+CREATE OR REPLACE FUNCTION public.stats_month(p_at TIMESTAMPTZ)
+RETURNS DATE AS $$
+    SELECT date_trunc('month', COALESCE(p_at, NOW()) AT TIME ZONE 'Asia/Kolkata')::date;
+$$ LANGUAGE sql STABLE;
+
+-- Apply deltas to an org's totals and one month
+CREATE OR REPLACE FUNCTION public.bump_org_stats(
+    p_org_id UUID,
+    p_month DATE,
+    p_verifications INTEGER,
+    p_reports INTEGER,
+    p_high_risk INTEGER
+)
+RETURNS void AS $$
+BEGIN
+    -- Rows removed by an org delete cascade; the counters go with the org
+    IF NOT EXISTS (SELECT 1 FROM public.orgs WHERE id = p_org_id) THEN
+        RETURN;
+    END IF;
+
+    INSERT INTO public.org_stats AS s (org_id, verifications, reports, high_risk_reports)
+    VALUES (p_org_id, p_verifications, p_reports, p_high_risk)
+    ON CONFLICT (org_id) DO UPDATE SET
+        verifications = s.verifications + EXCLUDED.verifications,
+        reports = s.reports + EXCLUDED.reports,
+        high_risk_reports = s.high_risk_reports + EXCLUDED.high_risk_reports;
+
+    INSERT INTO public.org_monthly_stats AS s (org_id, month, verifications, reports, high_risk_reports)
+    VALUES (p_org_id, p_month, p_verifications, p_reports, p_high_risk)
+    ON CONFLICT (org_id, month) DO UPDATE SET
+        verifications = s.verifications + EXCLUDED.verifications,
+        reports = s.reports + EXCLUDED.reports,
+        high_risk_reports = s.high_risk_reports + EXCLUDED.high_risk_reports;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+CREATE OR REPLACE FUNCTION public.count_verification()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM public.bump_org_stats(NEW.org_id, public.stats_month(NEW.created_at), 1, 0, 0);
+    ELSE
+        PERFORM public.bump_org_stats(OLD.org_id, public.stats_month(OLD.created_at), -1, 0, 0);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- Reports also move in and out of the high-risk count when a backfilled
+-- summary sets risk_level
+CREATE OR REPLACE FUNCTION public.count_report()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM public.bump_org_stats(NEW.org_id, public.stats_month(NEW.created_at), 0, 1,
+            CASE WHEN NEW.risk_level = 'HIGH' THEN 1 ELSE 0 END);
+    ELSIF TG_OP = 'DELETE' THEN
+        PERFORM public.bump_org_stats(OLD.org_id, public.stats_month(OLD.created_at), 0, -1,
+            CASE WHEN OLD.risk_level = 'HIGH' THEN -1 ELSE 0 END);
+    ELSIF (NEW.risk_level = 'HIGH') IS DISTINCT FROM (OLD.risk_level = 'HIGH') THEN
+        PERFORM public.bump_org_stats(NEW.org_id, public.stats_month(NEW.created_at), 0, 0,
+            CASE WHEN NEW.risk_level = 'HIGH' THEN 1 ELSE -1 END);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+DROP TRIGGER IF EXISTS on_verification_counted ON public.verifications;
+CREATE TRIGGER on_verification_counted
+    AFTER INSERT OR DELETE ON public.verifications
+    FOR EACH ROW EXECUTE FUNCTION public.count_verification();
+
+DROP TRIGGER IF EXISTS on_report_counted ON public.reports;
+CREATE TRIGGER on_report_counted
+    AFTER INSERT OR DELETE OR UPDATE OF risk_level ON public.reports
+    FOR EACH ROW EXECUTE FUNCTION public.count_report();
+
+-- Recompute all counters from the source tables (backfill / drift repair).
+-- Writes are blocked while it runs so no trigger delta is lost or double counted.
+CREATE OR REPLACE FUNCTION public.rebuild_org_stats()
+RETURNS void AS $$
+BEGIN
+    LOCK TABLE public.verifications, public.reports IN SHARE MODE;
+
+    DELETE FROM public.org_monthly_stats;
+    DELETE FROM public.org_stats;
+
+    INSERT INTO public.org_monthly_stats (org_id, month, verifications, reports, high_risk_reports)
+    SELECT org_id, month, SUM(verifications), SUM(reports), SUM(high_risk_reports)
+    FROM (
+        SELECT org_id, public.stats_month(created_at) AS month,
+            1 AS verifications, 0 AS reports, 0 AS high_risk_reports
+        FROM public.verifications
+        UNION ALL
+        SELECT org_id, public.stats_month(created_at),
+            0, 1, CASE WHEN risk_level = 'HIGH' THEN 1 ELSE 0 END
+        FROM public.reports
+    ) counted
+    GROUP BY org_id, month;
+
+    INSERT INTO public.org_stats (org_id, verifications, reports, high_risk_reports)
+    SELECT org_id, SUM(verifications), SUM(reports), SUM(high_risk_reports)
+    FROM public.org_monthly_stats
+    GROUP BY org_id;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- Dashboard stats: credits plus counters, three primary-key lookups
+CREATE OR REPLACE FUNCTION public.get_dashboard_stats(p_org_id UUID)
+RETURNS JSONB AS $$
+    SELECT jsonb_build_object(
+        'credits_remaining', c.current_balance,
+        'credits_total', c.monthly_limit,
+        'verifications_this_month', COALESCE(m.verifications, 0),
+        'total_reports', COALESCE(s.reports, 0),
+        'high_risk_vendors', COALESCE(s.high_risk_reports, 0)
+    )
+    FROM (SELECT p_org_id AS org_id) o
+    LEFT JOIN public.credits c ON c.org_id = o.org_id
+    LEFT JOIN public.org_stats s ON s.org_id = o.org_id
+    LEFT JOIN public.org_monthly_stats m ON m.org_id = o.org_id AND m.month = public.stats_month(NOW());
+$$ LANGUAGE sql STABLE SECURITY DEFINER;
+
+-- Internal helpers and cross-org reads are for the service role only
+REVOKE ALL ON FUNCTION public.bump_org_stats(UUID, DATE, INTEGER, INTEGER, INTEGER) FROM PUBLIC, anon, authenticated;
+REVOKE ALL ON FUNCTION public.rebuild_org_stats() FROM PUBLIC, anon, authenticated;
+REVOKE ALL ON FUNCTION public.get_dashboard_stats(UUID) FROM PUBLIC, anon, authenticated;
+
+-- =============================================
+-- VENDOR IDENTITY
+-- =============================================
+
+-- Find or create the vendor for a set of identifiers. Matches on any of the
+-- unique identifiers (oldest vendor wins), fills in identifiers the vendor was
+-- missing, and inserts a new vendor otherwise. Returns whether it was created.
+CREATE OR REPLACE FUNCTION public.upsert_vendor(
+    p_org_id UUID,
+    p_name TEXT,
+    p_identifiers JSONB DEFAULT '{}'::jsonb
+)
+RETURNS TABLE (vendor_id UUID, created BOOLEAN) AS $$
+DECLARE
+    v_id UUID;
+    v_gstin TEXT := NULLIF(upper(btrim(p_identifiers->>'gstin')), '');
+    v_pan TEXT := NULLIF(upper(btrim(p_identifiers->>'pan')), '');
+    v_cin TEXT := NULLIF(upper(btrim(p_identifiers->>'cin')), '');
+    v_tan TEXT := NULLIF(upper(btrim(p_identifiers->>'tan')), '');
+    v_udyam TEXT := NULLIF(upper(btrim(p_identifiers->>'udyam')), '');
+    v_din TEXT := NULLIF(btrim(p_identifiers->>'din'), '');
+    v_tin TEXT := NULLIF(btrim(p_identifiers->>'tin'), '');
+    v_rc TEXT := NULLIF(btrim(p_identifiers->>'rc'), '');
+    v_upi TEXT := NULLIF(btrim(p_identifiers->>'upi'), '');
+    v_dl TEXT := NULLIF(btrim(p_identifiers->>'dl'), '');
+BEGIN
+    LOOP
+        -- One probe per unique index; a NULL identifier matches nothing
+        SELECT m.id INTO v_id FROM (
+            SELECT id, created_at FROM public.vendors
+                WHERE org_id = p_org_id AND public.normalize_vendor_identifier(gstin) = public.normalize_vendor_identifier(v_gstin)
+            UNION ALL
+            SELECT id, created_at FROM public.vendors
+                WHERE org_id = p_org_id AND public.normalize_vendor_identifier(pan) = public.normalize_vendor_identifier(v_pan)
+            UNION ALL
+            SELECT id, created_at FROM public.vendors
+                WHERE org_id = p_org_id AND public.normalize_vendor_identifier(cin) = public.normalize_vendor_identifier(v_cin)
+            UNION ALL
+            SELECT id, created_at FROM public.vendors
+                WHERE org_id = p_org_id AND public.normalize_vendor_identifier(tan) = public.normalize_vendor_identifier(v_tan)
+            UNION ALL
+            SELECT id, created_at FROM public.vendors
+                WHERE org_id = p_org_id AND public.normalize_vendor_identifier(udyam) = public.normalize_vendor_identifier(v_udyam)
+        ) m
+        ORDER BY m.created_at, m.id
+        LIMIT 1;
+
+        IF v_id IS NOT NULL THEN
+            BEGIN
+                UPDATE public.vendors SET
+                    gstin = COALESCE(gstin, v_gstin),
+                    pan = COALESCE(pan, v_pan),
+                    cin = COALESCE(cin, v_cin),
+                    tan = COALESCE(tan, v_tan),
+                    udyam = COALESCE(udyam, v_udyam),
+                    din = COALESCE(din, v_din),
+                    tin = COALESCE(tin, v_tin),
+                    rc = COALESCE(rc, v_rc),
+                    upi = COALESCE(upi, v_upi),
+                    dl = COALESCE(dl, v_dl)
+                WHERE id = v_id
+                    AND (gstin IS NULL AND v_gstin IS NOT NULL
+                        OR pan IS NULL AND v_pan IS NOT NULL
+                        OR cin IS NULL AND v_cin IS NOT NULL
+                        OR tan IS NULL AND v_tan IS NOT NULL
+                        OR udyam IS NULL AND v_udyam IS NOT NULL
+                        OR din IS NULL AND v_din IS NOT NULL
+                        OR tin IS NULL AND v_tin IS NOT NULL
+                        OR rc IS NULL AND v_rc IS NOT NULL
+                        OR upi IS NULL AND v_upi IS NOT NULL
+                        OR dl IS NULL AND v_dl IS NOT NULL);
+            EXCEPTION WHEN unique_violation THEN
+                -- One of the new identifiers belongs to another vendor; leave both as they are
+                NULL;
+            END;
+
+            RETURN QUERY SELECT v_id, FALSE;
+            RETURN;
+        END IF;
+
+        BEGIN
+            INSERT INTO public.vendors (org_id, name, gstin, pan, cin, tan, udyam, din, tin, rc, upi, dl)
+            VALUES (p_org_id, p_name, v_gstin, v_pan, v_cin, v_tan, v_udyam, v_din, v_tin, v_rc, v_upi, v_dl)
+            RETURNING id INTO v_id;
+
+            RETURN QUERY SELECT v_id, TRUE;
+            RETURN;
+        EXCEPTION WHEN unique_violation THEN
+            -- Created concurrently by another verification; the next probe finds it
+            v_id := NULL;
+        END;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+-- Undo upsert_vendor() for a vendor whose first verification failed, unless
+-- another verification has attached to it in the meantime
+CREATE OR REPLACE FUNCTION public.discard_new_vendor(p_vendor_id UUID)
+RETURNS BOOLEAN AS $$
+BEGIN
+    -- The row lock conflicts with the FK check of a verification insert in
+    -- flight for this vendor, so one that commits first is seen below. It does
+    -- not protect verifications that resolved the vendor but haven't inserted
+    -- yet: their insert fails with 23503 and run_verification resolves again.
+    PERFORM 1 FROM public.vendors WHERE id = p_vendor_id FOR UPDATE;
+
+    IF EXISTS (SELECT 1 FROM public.verifications WHERE vendor_id = p_vendor_id) THEN
+        RETURN FALSE;
+    END IF;
+
+    DELETE FROM public.vendors WHERE id = p_vendor_id;
+    RETURN FOUND;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+REVOKE ALL ON FUNCTION public.upsert_vendor(UUID, TEXT, JSONB) FROM PUBLIC, anon, authenticated;
+REVOKE ALL ON FUNCTION public.discard_new_vendor(UUID) FROM PUBLIC, anon, authenticated;
+
+-- Dedup tool for data from before vendor identity (preview with merge_duplicate_vendors(true))
+-- Merge vendors sharing a normalized identifier into the oldest of them.
+-- Repeats until stable, so chains (A~B on GSTIN, B~C on PAN) collapse too;
+-- a dry run only reports the first pass.
+CREATE OR REPLACE FUNCTION public.merge_duplicate_vendors(p_dry_run BOOLEAN DEFAULT FALSE)
+RETURNS TABLE (survivor_id UUID, merged_id UUID, matched_on TEXT) AS $$
+DECLARE
+    v_column TEXT;
+    v_group RECORD;
+    v_dup public.vendors%ROWTYPE;
+    v_merged INTEGER;
+BEGIN
+    LOOP
+        v_merged := 0;
+
+        FOREACH v_column IN ARRAY ARRAY['gstin', 'pan', 'cin', 'tan', 'udyam'] LOOP
+            FOR v_group IN EXECUTE format(
+                'SELECT array_agg(id ORDER BY created_at, id) AS ids
+                 FROM public.vendors
+                 WHERE public.normalize_vendor_identifier(%1$I) IS NOT NULL
+                 GROUP BY org_id, public.normalize_vendor_identifier(%1$I)
+                 HAVING count(*) > 1', v_column)
+            LOOP
+                FOR i IN 2 .. array_length(v_group.ids, 1) LOOP
+                    survivor_id := v_group.ids[1];
+                    merged_id := v_group.ids[i];
+                    matched_on := v_column;
+                    RETURN NEXT;
+
+                    CONTINUE WHEN p_dry_run;
+
+                    UPDATE public.verifications SET vendor_id = survivor_id WHERE vendor_id = merged_id;
+                    UPDATE public.reports SET vendor_id = survivor_id WHERE vendor_id = merged_id;
+
+                    -- Delete first so copying its identifiers can't collide with itself
+                    DELETE FROM public.vendors WHERE id = merged_id RETURNING * INTO v_dup;
+
+                    BEGIN
+                        UPDATE public.vendors SET
+                            gstin = COALESCE(gstin, v_dup.gstin),
+                            pan = COALESCE(pan, v_dup.pan),
+                            cin = COALESCE(cin, v_dup.cin),
+                            din = COALESCE(din, v_dup.din),
+                            tan = COALESCE(tan, v_dup.tan),
+                            tin = COALESCE(tin, v_dup.tin),
+                            udyam = COALESCE(udyam, v_dup.udyam),
+                            rc = COALESCE(rc, v_dup.rc),
+                            upi = COALESCE(upi, v_dup.upi),
+                            dl = COALESCE(dl, v_dup.dl),
+                            aadhaar_masked = COALESCE(aadhaar_masked, v_dup.aadhaar_masked),
+                            bank_account_last4 = COALESCE(bank_account_last4, v_dup.bank_account_last4),
+                            passport_no_masked = COALESCE(passport_no_masked, v_dup.passport_no_masked),
+                            notes = COALESCE(notes, v_dup.notes),
+                            report_pdf_hash = NULL -- Its consolidated report now covers more checks
+                        WHERE id = survivor_id;
+                    EXCEPTION WHEN unique_violation THEN
+                        -- An identifier of the merged vendor belongs to a third vendor; a later pass merges that one
+                        UPDATE public.vendors SET report_pdf_hash = NULL WHERE id = survivor_id;
+                    END;
+
+                    INSERT INTO public.audit_logs (org_id, action, target_type, target_id, details)
+                    VALUES (v_dup.org_id, 'VENDOR_MERGED', 'VENDOR', survivor_id,
+                        jsonb_build_object('merged_vendor_id', merged_id, 'merged_vendor_name', v_dup.name, 'matched_on', v_column));
+
+                    v_merged := v_merged + 1;
+                END LOOP;
+            END LOOP;
+        END LOOP;
+
+        EXIT WHEN p_dry_run OR v_merged = 0;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER;
+
+REVOKE ALL ON FUNCTION public.merge_duplicate_vendors(BOOLEAN) FROM PUBLIC, anon, authenticated;
+
 -- =============================================
 -- END OF SCHEMA
 -- =============================================
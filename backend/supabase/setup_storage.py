@@ -40,7 +40,7 @@ def setup_storage_buckets():
             "id": "bulk-uploads",
             "name": "bulk-uploads",
             "public": False,
-            "file_size_limit": 5242880,  # 5 MB
+            "file_size_limit": 52428800,  # 50 MB (uploads are streamed, not buffered)
             "allowed_mime_types": ["text/csv", "application/vnd.ms-excel", "application/csv"]
         }
     ]